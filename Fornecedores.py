@@ -2,106 +2,75 @@
 # fornecedores_streamlit.py - versão estilizada (LÓGICA 100% ORIGINAL)
 # =========================
 
+import os
+import time
+from contextlib import suppress
+from functools import partial
+
+INICIO_SCRIPT = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import pdfplumber
-import re
-from difflib import SequenceMatcher
-from io import BytesIO
-import numpy as np
-import fitz  # Biblioteca para processar PDFs escaneados (PyMuPDF)
 
-# =========================
-# Funções auxiliares (mantidas)
-# =========================
-def normalizar_nome_coluna(nome):
-    if not nome:
-        return None
-    nome = nome.upper()
-    if "TRAB" in nome:
-        return "total_trabalhado"
-    if "NOTURNO" in nome:
-        return "total_noturno"
-    if "PREVIST" in nome:
-        return "horas_previstas"
-    if "FALTA" in nome:
-        return "faltas"
-    if "ATRASO" in nome:
-        return "horas_atraso"
-    if "EXTRA" in nome:
-        return "extra_50"
-    if "DSR" in nome:
-        return "desconta_dsr"
-    return None
-
-def padronizar_tempo(valor):
-    if not valor:
-        return "00:00"
-    if isinstance(valor, (int, float)):
-        return "00:00"
-    if re.match(r"^\d{1,3}:\d{2}$", str(valor).strip()):
-        return str(valor).strip()
-    return "00:00"
-
-def limpar_texto(texto):
-    if texto is None:
-        return ""
-    texto = str(texto).upper()
-    texto = re.sub(r'[^A-Z0-9 ÁÀÂÃÉÊÍÓÔÕÚÇ]', ' ', texto)
-    texto = re.sub(r'\s+', ' ', texto)
-    return texto.strip()
-
-def achar_tema_mais_proximo(linha, lista_temas, limiar=0.6):
-    linha = limpar_texto(linha)
-    melhor_tema = None
-    melhor_ratio = 0
-    for tema in lista_temas:
-        ratio = SequenceMatcher(None, linha, limpar_texto(tema)).ratio()
-        if ratio > melhor_ratio:
-            melhor_ratio = ratio
-            melhor_tema = tema
-    if melhor_ratio >= limiar:
-        return melhor_tema
-    return None
-
-def hora_para_minutos(hora):
-    if not hora or str(hora).strip() == "":
-        return 0
-    try:
-        partes = re.findall(r"\d{1,3}:\d{2}", str(hora))
-        if partes:
-            h, m = map(int, partes[0].split(":"))
-            return h*60 + m
-        h_m = re.findall(r"(\d+)", str(hora))
-        if len(h_m) >= 2:
-            h, m = int(h_m[0]), int(h_m[1])
-            return h*60 + m
-        return 0
-    except:
-        return 0
-
-def limpa_valor(v):
-    return str(v or "").strip()
-
-def eh_horario(valor):
-    if not isinstance(valor, str):
-        valor = str(valor or "")
-    if ":" not in valor:
-        return False
-    partes = valor.split(":")
-    if len(partes) != 2:
-        return False
-    h, m = partes
-    if not (h.isdigit() and m.isdigit()):
-        return False
-    h, m = int(h), int(m)
-    return 0 <= h < 24 and 0 <= m < 60
+# Só módulos leves antes da tela inicial; o motor (pandas, pdfplumber, PyMuPDF)
+# é importado depois de "Iniciar 🚀" (ver processamento/inicializacao.py)
+from processamento.configuracoes import (
+    ESCOPO_AMBOS,
+    ESCOPOS,
+    MODOS_VALIDACAO,
+    VALIDACAO_AUTOMATICA,
+    carregar_configuracoes,
+    salvar_configuracoes,
+)
+from processamento.inicializacao import aquecer_em_segundo_plano, registrar_partida, resumo_partida
+from processamento.perfil import Perfil, etapa
+from processamento.tarefas import CONCLUIDA, ERRO, NA_FILA, FilaTarefas
 
 # =========================
 # Configuração inicial e CSS elegante
 # =========================
 st.set_page_config(page_title="Assistente de Custos IMILE", layout="wide")
 
+# Cache de resultados compartilhado entre sessões e reruns (chave = SHA-256 do PDF).
+# IMILE_CACHE_DIR ativa o nível em disco; IMILE_CACHE_MB limita o tamanho dele.
+@st.cache_resource
+def obter_cache_resultados():
+    return CacheResultados(
+        max_itens=int(os.environ.get("IMILE_CACHE_ITENS", "8")),
+        diretorio=os.environ.get("IMILE_CACHE_DIR") or None,
+        limite_disco_mb=float(os.environ.get("IMILE_CACHE_MB", "512")),
+    )
+
+# Texto OCR por página (chave = hash do conteúdo da página), separado dos resultados
+@st.cache_resource
+def obter_cache_ocr():
+    diretorio = os.environ.get("IMILE_CACHE_DIR")
+    return CacheResultados(
+        max_itens=4096,
+        diretorio=os.path.join(diretorio, "ocr") if diretorio else None,
+        limite_disco_mb=float(os.environ.get("IMILE_CACHE_MB", "512")),
+    )
+
+# Resultado por página (hash do conteúdo): PDF reenviado com páginas corrigidas só relê essas páginas
+@st.cache_resource
+def obter_cache_paginas():
+    diretorio = os.environ.get("IMILE_CACHE_DIR")
+    return CacheResultados(
+        max_itens=int(os.environ.get("IMILE_CACHE_PAGINAS", "20000")),
+        diretorio=os.path.join(diretorio, "paginas") if diretorio else None,
+        limite_disco_mb=float(os.environ.get("IMILE_CACHE_MB", "512")),
+    )
+
+# Histórico dos relatórios já processados (consultas entre meses sem reprocessar PDFs)
+@st.cache_resource
+def obter_historico():
+    return HistoricoRelatorios(os.environ.get("IMILE_HISTORICO", "historico_relatorios.sqlite"))
+
+# Fila de processamento em segundo plano, compartilhada por todas as sessões.
+# IMILE_TAREFAS_SIMULTANEAS limita quantos PDFs são processados ao mesmo tempo.
+@st.cache_resource
+def obter_fila_tarefas():
+    return FilaTarefas(max_simultaneas=int(os.environ.get("IMILE_TAREFAS_SIMULTANEAS", "2")))
+
 # =========================
 # CSS Customizado
 # =========================
@@ -185,17 +154,493 @@ st.sidebar.markdown("""
 Esta seção permite ajustar regras de pagamento e preferências de análise.
 """)
 
+# Configurações salvas com "💾 Salvar Configurações" (IMILE_CONFIGURACOES) são o ponto de partida da sessão.
+# O arquivo é um só para o servidor (o app não tem login): salvar vale para todos os usuários.
+CAMINHO_CONFIGURACOES = os.environ.get(
+    "IMILE_CONFIGURACOES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "configuracoes.json")
+)
+if "configuracoes" not in st.session_state:
+    st.session_state.configuracoes = carregar_configuracoes(CAMINHO_CONFIGURACOES)
+configuracoes = st.session_state.configuracoes
+
+
+def indice_salvo(opcoes, chave):
+    # Valor salvo que não existe mais nas opções cai na primeira
+    valor = configuracoes[chave]
+    return opcoes.index(valor) if valor in opcoes else 0
+
+
 tipo_relatorio = st.sidebar.selectbox(
     "Tipo de Relatório",
-    ["Consolidado", "Detalhado", "Ambos"]
+    ESCOPOS,
+    index=indice_salvo(ESCOPOS, "tipo_relatorio"),
+    help="Consolidado é o caminho rápido: lê só o cabeçalho e a linha TOTAIS de cada página, sem as regras das "
+         "linhas diárias (sem as colunas Qtd). Detalhado não monta o consolidado."
 )
 
 modo_validacao = st.sidebar.radio(
     "Modo de Validação",
-    ["Automático", "Manual"]
+    MODOS_VALIDACAO,
+    index=indice_salvo(MODOS_VALIDACAO, "modo_validacao"),
+    help="Manual não aplica as regras (Situação, correção) às linhas diárias: o detalhe sai com os horários do PDF."
+)
+validar_automaticamente = modo_validacao == VALIDACAO_AUTOMATICA
+
+# Com um único núcleo não há o que escolher (e o slider não aceita mínimo igual ao máximo)
+nucleos = os.cpu_count() or 1
+if nucleos > 1:
+    workers_extracao = st.sidebar.slider(
+        "Processos paralelos na extração",
+        min_value=1,
+        max_value=nucleos,
+        value=min(max(1, int(configuracoes["workers_extracao"])), nucleos),
+        help="Divide as páginas do PDF entre vários processos. O resultado é idêntico ao processamento sequencial."
+    )
+else:
+    workers_extracao = 1
+
+opcoes_backend = ["pdfplumber", "pymupdf"]
+backend_extracao = st.sidebar.selectbox(
+    "Biblioteca de extração",
+    opcoes_backend,
+    index=indice_salvo(opcoes_backend, "backend_extracao"),
+    help="pymupdf (PyMuPDF) é mais rápido; páginas em que a tabela não traz a linha TOTAIS são relidas com o pdfplumber."
+)
+
+usar_ocr = st.sidebar.checkbox(
+    "OCR em páginas escaneadas",
+    value=bool(configuracoes["usar_ocr"]),
+    help="Páginas que são só imagem são lidas pelo Tesseract (português) em vez de serem ignoradas."
+)
+opcoes_dpi = [150, 200, 300, 400]
+dpi_ocr = st.sidebar.select_slider(
+    "Resolução do OCR (DPI)",
+    options=opcoes_dpi,
+    value=opcoes_dpi[indice_salvo(opcoes_dpi, "dpi_ocr")],
+    disabled=not usar_ocr
+)
+
+mostrar_desempenho = st.sidebar.checkbox(
+    "⏱️ Painel de desempenho",
+    value=False,
+    help="Mostra o tempo de cada etapa do processamento e as páginas mais lentas."
+)
+perfil_detalhado = st.sidebar.checkbox(
+    "🔬 Perfil detalhado (cProfile)",
+    value=False,
+    disabled=not mostrar_desempenho,
+    help="Reprocessa o arquivo sob cProfile (ignorando o cache) para anexar a um chamado de desempenho."
 )
 
-st.sidebar.button("💾 Salvar Configurações")
+if st.sidebar.button(
+    "💾 Salvar Configurações",
+    help=f"Grava as opções acima em {CAMINHO_CONFIGURACOES}, compartilhado por todos os usuários deste servidor: "
+         "as próximas sessões de todos começam com elas. Para mudar só a sua sessão, basta alterar as opções."
+):
+    try:
+        st.session_state.configuracoes = salvar_configuracoes(CAMINHO_CONFIGURACOES, {
+            "tipo_relatorio": tipo_relatorio,
+            "modo_validacao": modo_validacao,
+            "workers_extracao": workers_extracao,
+            "backend_extracao": backend_extracao,
+            "usar_ocr": usar_ocr,
+            "dpi_ocr": dpi_ocr,
+        })
+        st.sidebar.success("Configurações salvas para todos os usuários: as próximas sessões começam com elas.")
+    except OSError as erro:
+        st.sidebar.error(f"Não foi possível salvar as configurações: {erro}")
+
+partida = resumo_partida()
+if mostrar_desempenho and partida:
+    st.sidebar.caption(
+        f"🚀 Tela inicial em {partida['ultima']:.2f}s nesta execução "
+        f"({partida['frio']:.2f}s na partida a frio do servidor)."
+    )
+
+tarefas_ativas = obter_fila_tarefas().ativas()
+if tarefas_ativas:
+    st.sidebar.caption(f"🔄 {len(tarefas_ativas)} processamento(s) em andamento ou na fila no servidor.")
+
+
+# Orçamento de memória da extração de cada arquivo (MB), medido nos processos da extração
+# desse arquivo: outras sessões e outros arquivos não contam contra ele
+MEMORIA_ARQUIVO_MB = float(os.environ.get("IMILE_MEMORIA_ARQUIVO_MB") or os.environ.get("IMILE_MEMORIA_SESSAO_MB") or 1024)
+
+# Prazo de cada página (segundos, processo isolado); páginas patológicas são refeitas em modos mais baratos.
+# Desligado (extração sem isolamento) a menos que IMILE_TEMPO_MAX_PAGINA seja definido
+TEMPO_MAX_PAGINA = float(os.environ.get("IMILE_TEMPO_MAX_PAGINA") or 0) or None
+
+def para_exibir(df):
+    # O consolidado mistura 0 e texto nas mesmas colunas (fillna(0)); o st.dataframe precisa de um tipo por coluna
+    df = df.copy()
+    for coluna in df.columns[df.dtypes == object]:
+        df[coluna] = df[coluna].map(lambda valor: valor if valor is None else str(valor))
+    return df
+
+
+def exportar_medindo(planilhas, formato, perfil):
+    # Chamado só no clique do download; o tempo entra no perfil da execução
+    with etapa(perfil, "exportacao", formato=formato):
+        return exportar(planilhas, formato)
+
+
+def painel_desempenho(perfil, prefixo, titulo=None):
+    with st.sidebar.expander(f"⏱️ Desempenho da última execução ({titulo or prefixo})", expanded=True):
+        st.caption(f"Total: {perfil.total_segundos:.2f}s")
+        st.dataframe(perfil.etapas, hide_index=True)
+        if perfil.paginas_lentas:
+            st.caption("Páginas mais lentas")
+            st.dataframe(perfil.paginas_lentas, hide_index=True)
+        if perfil.classificacao_paginas:
+            st.caption("Triagem das páginas: " + ", ".join(
+                f"{classe} {quantidade}" for classe, quantidade in perfil.classificacao_paginas.items()
+            ))
+        st.download_button(
+            "⬇️ Baixar perfil (JSON)",
+            data=perfil.json,
+            file_name=f"perfil_{prefixo}.json",
+            mime="application/json",
+            on_click="ignore",
+            key=f"{prefixo}_perfil_json"
+        )
+        if perfil.profundo:
+            st.text(perfil.estatisticas(limite=25))
+            st.download_button(
+                "⬇️ Baixar cProfile (.prof)",
+                data=perfil.dados_cprofile,
+                file_name=f"perfil_{prefixo}.prof",
+                mime="application/octet-stream",
+                on_click="ignore",
+                key=f"{prefixo}_perfil_prof"
+            )
+
+def processar_upload_gravado(caminho, *args, **kwargs):
+    # Executado na tarefa: o PDF é lido do arquivo temporário, removido ao final
+    try:
+        return processar_com_cache(caminho, *args, **kwargs)
+    finally:
+        with suppress(OSError):
+            os.remove(caminho)
+
+
+def cancelar_tarefa(registro):
+    # Tarefa que ainda não começou: sai da fila e leva junto o arquivo temporário
+    _, tarefa, _, caminho = registro
+    if tarefa.cancelar():
+        with suppress(OSError):
+            os.remove(caminho)
+
+
+def tarefa_processamento(uploaded_file, parser, prefixo):
+    """Tarefa (e Perfil) do arquivo com as opções atuais; envia uma nova se o arquivo ou as opções mudaram.
+
+    O upload é gravado num arquivo temporário e processado a partir do caminho,
+    com o orçamento de memória de um arquivo (MEMORIA_ARQUIVO_MB).
+    """
+    tarefas = st.session_state.setdefault(f"{prefixo}_tarefas", {})
+    assinatura = (
+        uploaded_file.file_id, parser.nome, workers_extracao, backend_extracao,
+        usar_ocr, dpi_ocr, mostrar_desempenho, perfil_detalhado, tipo_relatorio, validar_automaticamente
+    )
+    anterior = tarefas.get(uploaded_file.file_id)
+    if anterior is not None and anterior[0] == assinatura:
+        return anterior[1], anterior[2]
+    if anterior is not None:
+        # Opções trocadas: a tarefa antiga sai da fila se ainda não começou
+        cancelar_tarefa(anterior)
+
+    perfil = Perfil(profundo=perfil_detalhado) if mostrar_desempenho else None
+    caminho = gravar_temporario(uploaded_file, os.environ.get("IMILE_SPOOL_DIR") or None)
+    tarefa = obter_fila_tarefas().enviar(
+        f"{parser.nome}: {uploaded_file.name}",
+        processar_upload_gravado,
+        caminho,
+        obter_cache_resultados(),
+        workers=workers_extracao,
+        backend=backend_extracao,
+        ocr=OpcoesOCR(dpi=dpi_ocr, workers=workers_extracao, cache=obter_cache_ocr()) if usar_ocr else None,
+        perfil=perfil,
+        fornecedor=parser.nome,
+        cache_paginas=obter_cache_paginas(),
+        memoria_max_mb=MEMORIA_ARQUIVO_MB,
+        escopo=tipo_relatorio,
+        validar=validar_automaticamente,
+        tempo_max_pagina=TEMPO_MAX_PAGINA
+    )
+    tarefas[uploaded_file.file_id] = (assinatura, tarefa, perfil, caminho)
+    # Arquivo já processado (cache) termina na hora: dispensa a barra de progresso
+    tarefa.aguardar(timeout=0.5)
+    return tarefa, perfil
+
+
+def descartar_tarefas_removidas(prefixo, arquivos):
+    # Arquivos tirados do upload: as tarefas deles saem da sessão (e da fila, se ainda não começaram)
+    tarefas = st.session_state.get(f"{prefixo}_tarefas", {})
+    ids_atuais = {arquivo.file_id for arquivo in arquivos}
+    for file_id in [file_id for file_id in tarefas if file_id not in ids_atuais]:
+        cancelar_tarefa(tarefas.pop(file_id))
+
+
+def arquivos_distintos(uploaded_files):
+    """Descarta uploads com o mesmo conteúdo (mesmo PDF enviado duas vezes, talvez com outro nome)."""
+    vistos = {}
+    distintos = []
+    for arquivo in uploaded_files:
+        conteudo = hash_arquivo(arquivo)
+        if conteudo in vistos:
+            st.warning(f"⚠️ {arquivo.name} tem o mesmo conteúdo de {vistos[conteudo]} e foi ignorado.")
+            continue
+        vistos[conteudo] = arquivo.name
+        distintos.append(arquivo)
+    return distintos
+
+
+@st.fragment(run_every=1.0)
+def acompanhar_tarefas(tarefas):
+    # Só este trecho é reexecutado a cada segundo; quando todas terminam, o app inteiro roda de novo com os resultados
+    if all(tarefa.terminada for tarefa in tarefas):
+        st.rerun()
+    ativas = obter_fila_tarefas().ativas()
+    for tarefa in tarefas:
+        if tarefa.terminada:
+            st.progress(1.0, text=f"✅ {tarefa.descricao}")
+        elif tarefa.estado == NA_FILA:
+            a_frente = sum(1 for outra in ativas if outra.estado == NA_FILA and outra.identificador < tarefa.identificador)
+            st.progress(0.0, text=f"⏳ {tarefa.descricao} — na fila: {a_frente} tarefa(s) à frente (até {obter_fila_tarefas().max_simultaneas} ao mesmo tempo).")
+        elif tarefa.total_paginas and tarefa.paginas_feitas >= tarefa.total_paginas:
+            st.progress(1.0, text=f"⚙️ {tarefa.descricao} — páginas lidas; montando os relatórios... ({tarefa.segundos:.0f}s)")
+        else:
+            st.progress(
+                tarefa.fracao,
+                text=f"📄 {tarefa.descricao} — lendo páginas: {tarefa.paginas_feitas}/{tarefa.total_paginas or '?'} ({tarefa.segundos:.0f}s)"
+            )
+    st.caption("Pode continuar usando o app: o processamento segue em segundo plano.")
+
+
+def relatorio_mesclado(parser, prefixo, concluidos):
+    """Consolidado e detalhe únicos dos arquivos processados, guardados na sessão até a lista mudar."""
+    chave = tuple((arquivo.file_id, tarefa.identificador) for arquivo, tarefa, _ in concluidos)
+    guardado = st.session_state.get(f"{prefixo}_mesclagem")
+    if guardado is None or guardado[0] != chave:
+        perfil = Perfil() if mostrar_desempenho else None
+        df_consolidado_final, df_detalhe, dias_descartados = parser.mesclar(
+            [
+                (arquivo.name, tarefa.resultado[0]["consolidado"], tarefa.resultado[0]["detalhe"])
+                for arquivo, tarefa, _ in concluidos
+            ],
+            perfil=perfil,
+        )
+        guardado = (chave, (df_consolidado_final, df_detalhe, dias_descartados, perfil))
+        st.session_state[f"{prefixo}_mesclagem"] = guardado
+    return guardado[1]
+
+
+def alteracoes_versao(prefixo, arquivo, resultado, fornecedor):
+    """Compara o arquivo com a versão anterior dele guardada no histórico (a que mais compartilha páginas).
+
+    Devolve (nome_da_versão_anterior, DataFrame de funcionários afetados) ou None.
+    """
+    # A comparação de cada upload é feita uma vez; os reruns da sessão reaproveitam
+    comparacoes = st.session_state.setdefault(f"{prefixo}_versoes", {})
+    if arquivo.file_id not in comparacoes:
+        historico = obter_historico()
+        resumo = resumo_versao(resultado)
+        anterior = historico.versao_anterior(resumo, fornecedor=fornecedor)
+        comparacao = None
+        if anterior is not None:
+            nome_anterior, resumo_anterior = anterior
+            comparacao = (nome_anterior, comparar_versoes(resumo_anterior, resumo))
+        historico.gravar_versao(resumo, arquivo.name, fornecedor=fornecedor)
+        comparacoes[arquivo.file_id] = comparacao
+    return comparacoes[arquivo.file_id]
+
+
+def mostrar_alteracoes(prefixo, arquivo, resultado, fornecedor):
+    comparacao = alteracoes_versao(prefixo, arquivo, resultado, fornecedor)
+    if comparacao is None:
+        return
+    nome_anterior, alterados = comparacao
+    with st.expander(f"🔁 {arquivo.name} x {nome_anterior}: {len(alterados)} funcionário(s) com páginas diferentes", expanded=True):
+        if alterados.empty:
+            st.caption("Só mudaram páginas sem funcionário (capa, páginas em branco...).")
+        else:
+            st.dataframe(alterados, hide_index=True)
+
+
+def avisos_extracao(resultado, veio_do_cache, nome=None):
+    origem = f"{nome}: " if nome else ""
+    if veio_do_cache:
+        st.caption(f"⚡ {origem}resultado reaproveitado do cache (arquivo já processado).")
+    elif resultado["paginas_reaproveitadas"]:
+        st.caption(
+            f"♻️ {origem}{len(resultado['paginas_reaproveitadas'])} de {resultado['total_paginas']} páginas iguais "
+            f"às de uma versão já processada; só as demais foram lidas de novo."
+        )
+    if resultado.get("paginas_sem_tabela"):
+        st.caption(
+            f"🗂️ {origem}{len(resultado['paginas_sem_tabela'])} página(s) sem tabela de ponto (capa, resumo, "
+            f"assinaturas) pularam a extração da tabela: {', '.join(map(str, resultado['paginas_sem_tabela']))}"
+        )
+    if resultado.get("paginas_degradadas"):
+        st.caption(
+            f"🐢 {origem}{len(resultado['paginas_degradadas'])} página(s) demoraram mais de {TEMPO_MAX_PAGINA:.0f}s e foram "
+            f"lidas num modo mais barato (confira-as): "
+            + ", ".join(f"{numero} ({modo})" for numero, modo in resultado["paginas_degradadas"].items())
+        )
+    if resultado.get("paginas_com_falha"):
+        st.warning(
+            f"⏱️ {origem}{len(resultado['paginas_com_falha'])} página(s) não puderam ser extraídas no tempo e ficaram "
+            f"fora do relatório: {', '.join(map(str, resultado['paginas_com_falha']))}"
+        )
+    falhas_cabecalho = descrever_falhas(resultado.get("falhas_campos", {}))
+    if falhas_cabecalho:
+        st.warning(f"🪪 {origem}página(s) com nome ou cpf não lidos no cabeçalho (confira no PDF): {falhas_cabecalho}")
+    if resultado["paginas_ocr"]:
+        st.info(f"🔎 {origem}{len(resultado['paginas_ocr'])} página(s) escaneada(s) lida(s) por OCR: {', '.join(map(str, resultado['paginas_ocr']))}")
+    if resultado["paginas_vazias"]:
+        st.warning(f"⚠️ {origem}{len(resultado['paginas_vazias'])} página(s) sem texto nem tabela ficaram fora do relatório: {', '.join(map(str, resultado['paginas_vazias']))}")
+
+
+def aba_fornecedor(parser, prefixo, rotulo_upload):
+    """Upload (um ou vários PDFs), processamento, downloads e histórico de um fornecedor (ver processamento/fornecedores.py)."""
+    uploaded_files = st.file_uploader(
+        rotulo_upload,
+        type=["pdf"],
+        accept_multiple_files=True,
+        key=f"{prefixo}_uploader",
+        help="Vários PDFs (por unidade ou quinzena) são processados ao mesmo tempo e juntados num só relatório."
+    )
+    descartar_tarefas_removidas(prefixo, uploaded_files or [])
+
+    if uploaded_files:
+        arquivos = arquivos_distintos(uploaded_files)
+        if len(arquivos) == 1:
+            st.success(f"Arquivo {arquivos[0].name} carregado com sucesso!")
+        else:
+            st.success(f"{len(arquivos)} arquivos carregados com sucesso! O relatório junta todos eles.")
+
+        # Mesmo motor usado pela linha de comando (python -m processamento): uma
+        # tarefa em segundo plano por arquivo, processadas ao mesmo tempo até o
+        # limite da fila. Reruns acompanham as mesmas tarefas em vez de recomeçar.
+        enviados = [(arquivo, *tarefa_processamento(arquivo, parser, prefixo)) for arquivo in arquivos]
+        if not all(tarefa.terminada for _, tarefa, _ in enviados):
+            acompanhar_tarefas([tarefa for _, tarefa, _ in enviados])
+            return
+        for arquivo, tarefa, _ in enviados:
+            if tarefa.estado == ERRO:
+                dica = " Envie menos arquivos de uma vez ou use menos processos na extração." if isinstance(tarefa.erro, MemoryError) else ""
+                st.error(f"❌ Falha ao processar {arquivo.name}: {tarefa.erro}{dica}")
+        concluidos = [(arquivo, tarefa, perfil) for arquivo, tarefa, perfil in enviados if tarefa.estado == CONCLUIDA]
+        if not concluidos:
+            return
+
+        if len(concluidos) == 1:
+            arquivo, tarefa, perfil = concluidos[0]
+            resultado, veio_do_cache = tarefa.resultado
+            if perfil is not None:
+                painel_desempenho(perfil, prefixo)
+            avisos_extracao(resultado, veio_do_cache)
+            mostrar_alteracoes(prefixo, arquivo, resultado, parser.nome)
+            df_consolidado_final = resultado["consolidado"]
+            df_detalhe = resultado["detalhe"]
+        else:
+            for n, (arquivo, tarefa, perfil_arquivo) in enumerate(concluidos, start=1):
+                if perfil_arquivo is not None:
+                    painel_desempenho(perfil_arquivo, f"{prefixo}_{n}", arquivo.name)
+                avisos_extracao(*tarefa.resultado, nome=arquivo.name)
+                mostrar_alteracoes(prefixo, arquivo, tarefa.resultado[0], parser.nome)
+            df_consolidado_final, df_detalhe, dias_descartados, perfil = relatorio_mesclado(parser, prefixo, concluidos)
+            if perfil is not None:
+                painel_desempenho(perfil, f"{prefixo}_mesclagem", "mesclagem")
+            if dias_descartados:
+                st.warning(
+                    f"🔁 {dias_descartados} dia(s) repetido(s) entre arquivos (mesmo cpf e data) mantido(s) só uma vez no detalhe. "
+                    f"Os totais do consolidado vêm do cabeçalho de cada PDF e contam esses dias em dobro: "
+                    f"confira os funcionários com a coluna dias_sobrepostos maior que zero."
+                )
+            contagens = []
+            if df_consolidado_final is not None:
+                contagens.append(f"{len(df_consolidado_final)} linhas no consolidado")
+            if df_detalhe is not None:
+                contagens.append(f"{len(df_detalhe)} linhas de detalhe")
+            st.caption(
+                f"📎 {len(concluidos)} arquivos juntados: {', '.join(contagens)}; "
+                f"a coluna arquivo_origem indica de onde veio cada linha."
+            )
+        arquivo_historico = ", ".join(arquivo.name for arquivo, _, _ in concluidos)
+
+        # =========================
+        # Botões de Download
+        # =========================
+        st.markdown(
+            """
+            <div class="card">
+                <h3>📥 Baixar Relatórios</h3>
+                <p>Após o processamento, você pode baixar os arquivos consolidados com um clique abaixo:</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+        # Os arquivos só são gerados quando o botão é clicado (data=função),
+        # e o xlsx é escrito em streaming: nada de to_excel a cada rerun.
+        formatos = [f for f in FORMATOS if f != "parquet" or parquet_disponivel()]
+        col_formato, col_combinado = st.columns(2)
+        with col_formato:
+            formato_exportacao = st.radio("Formato", formatos, horizontal=True, key=f"{prefixo}_formato")
+        with col_combinado:
+            arquivo_unico = st.checkbox(
+                "Arquivo único (consolidado + detalhe)",
+                value=False,
+                key=f"{prefixo}_arquivo_unico",
+                disabled=tipo_relatorio != ESCOPO_AMBOS,
+                help="xlsx com duas abas; CSV/Parquet num .zip"
+            )
+
+        downloads = parser.planilhas_exportacao(df_consolidado_final, df_detalhe, arquivo_unico)
+
+        for coluna, (nome_base, planilhas) in zip(st.columns(len(downloads)), downloads):
+            nome_arquivo, mime = descrever_exportacao(planilhas, formato_exportacao, nome_base)
+            with coluna:
+                st.download_button(
+                    label=f"⬇️ Baixar {nome_arquivo}",
+                    data=partial(exportar_medindo, planilhas, formato_exportacao, perfil),
+                    file_name=nome_arquivo,
+                    mime=mime,
+                    on_click="ignore"
+                )
+
+        # =========================
+        # Gravação no histórico
+        # =========================
+        if tipo_relatorio != ESCOPO_AMBOS or not validar_automaticamente:
+            st.caption("📚 O histórico guarda os dois relatórios com as regras aplicadas: use Tipo de Relatório \"Ambos\" e validação automática para gravar.")
+            return
+        col_mes, col_gravar = st.columns([2, 1])
+        with col_mes:
+            mes_historico = st.text_input(
+                "Mês de referência (aaaa-mm)",
+                value=mes_referencia(df_detalhe) or "",
+                key=f"{prefixo}_mes_historico"
+            )
+        gravados = obter_historico().arquivos_gravados(parser.nome, mes_historico) if mes_historico else []
+        if gravados:
+            st.warning(
+                f"Já existe uma gravação de {mes_historico} para {parser.nome} ({', '.join(gravados)}): "
+                f"gravar de novo substitui a anterior."
+            )
+        with col_gravar:
+            st.write("")
+            if st.button("📚 Gravar no histórico", key=f"{prefixo}_gravar_historico"):
+                try:
+                    obter_historico().gravar(
+                        df_consolidado_final, df_detalhe,
+                        mes=mes_historico or None, fornecedor=parser.nome, arquivo=arquivo_historico
+                    )
+                    st.success(f"Relatório de {mes_historico} gravado no histórico.")
+                except ValueError as erro:
+                    st.error(str(erro))
+
 
 # =========================
 # Tela Inicial (antes de iniciar)
@@ -221,7 +666,22 @@ if not st.session_state.iniciado:
             st.session_state.iniciado = True
             st.rerun()
 
+    registrar_partida(time.perf_counter() - INICIO_SCRIPT)
+    # Importa o motor enquanto o usuário lê a tela inicial; IMILE_AQUECER=0 desliga
+    if os.environ.get("IMILE_AQUECER", "1") != "0":
+        aquecer_em_segundo_plano()
+
 else:
+    # Motor do processamento: já está em sys.modules se o aquecimento terminou
+    from processamento import CacheResultados, processar_com_cache
+    from processamento.fornecedores import PARSERS, obter_parser
+    from processamento.extracao import gravar_temporario, hash_arquivo
+    from processamento.exportacao import FORMATOS, descrever_exportacao, exportar, parquet_disponivel
+    from processamento.historico import HistoricoRelatorios, mes_referencia
+    from processamento.ocr import OpcoesOCR
+    from processamento.texto_pagina import descrever_falhas
+    from processamento.versoes import comparar_versoes, resumo_versao
+
     st.success("✅ Aplicação iniciada com sucesso!")
 
 # =========================
@@ -229,7 +689,7 @@ else:
 # =========================
 
     # Nomes das abas com ícones
-    tab1, tab2, tab3 = st.tabs(["🤝 Fornecedor Blitz", "🤝 Fornecedor D0", "🤝 Fornecedor Polly"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🤝 Fornecedor Blitz", "🤝 Fornecedor D0", "🤝 Fornecedor Polly", "📚 Histórico"])
 
     # -------------------------
     # Aba Blitz
@@ -248,330 +708,23 @@ else:
         )
 
         # LÓGICA 100% ORIGINAL AQUI
-        uploaded_file = st.file_uploader(
-            "Selecione o arquivo PDF que evidencia o ponto dos colaboradores blitz.",
-            type=["pdf"],
-            key="blitz_uploader"
+        aba_fornecedor(
+            obter_parser("Blitz"),
+            "blitz",
+            "Selecione o arquivo PDF que evidencia o ponto dos colaboradores blitz."
         )
 
-        if uploaded_file:
-            st.success(f"Arquivo {uploaded_file.name} carregado com sucesso!")
-
-            lista_temas_mestra = [
-                "AJUSTE DE HORAS"
-                
-            ]
-
-            dados_funcionarios = []
-            detalhes = []
-
-            with pdfplumber.open(uploaded_file) as pdf:
-                for i, pagina in enumerate(pdf.pages):
-                    texto = pagina.extract_text() or ""
-                    tabela = pagina.extract_table()
-                    if not texto and not tabela:
-                        continue
-                    linhas = texto.split("\n") if texto else []
-
-                    funcionario = {
-                        "pagina": i + 1,
-                        "nome": None,
-                        "cpf": None,
-                        "matricula": None,
-                        "cargo": None,
-                        "centro_custo": None,
-                        "total_trabalhado": "00:00",
-                        "total_noturno": "00:00",
-                        "horas_previstas": "00:00",
-                        "faltas": 0,
-                        "horas_atraso": "00:00",
-                        "extra_50": "00:00",
-                        "desconta_dsr": 0,
-                        "status": None,
-                    }
-                    for tema in lista_temas_mestra:
-                        funcionario[tema] = 0
-
-                    # =====================
-                    # Cabeçalho por página
-                    # =====================
-                    for linha in linhas:
-                        if "NOME DO FUNCIONÁRIO:" in linha or "NOME DO FUNCIONARIO:" in linha:
-                            try:
-                                funcionario["nome"] = linha.split("NOME DO FUNCIONÁRIO:")[-1].split("CPF")[0].strip()
-                            except:
-                                funcionario["nome"] = linha.split("NOME DO FUNCIONARIO:")[-1].split("CPF")[0].strip() if "CPF" in linha else linha
-                            if "CPF" in linha:
-                                try:
-                                    funcionario["cpf"] = linha.split("CPF DO FUNCIONÁRIO:")[-1].split("SEG")[0].strip()
-                                except:
-                                    funcionario["cpf"] = ""
-                        elif "NÚMERO DE MATRÍCULA:" in linha or "NUMERO DE MATRICULA:" in linha:
-                            parts = linha.split("NÚMERO DE MATRÍCULA:")[-1] if "NÚMERO DE MATRÍCULA:" in linha else linha.split("NUMERO DE MATRICULA:")[-1]
-                            funcionario["matricula"] = parts.split("NOME DO DEPARTAMENTO")[0].strip() if "NOME DO DEPARTAMENTO" in parts else parts.strip()
-                        elif "NOME DO CARGO:" in linha:
-                            funcionario["cargo"] = linha.split("NOME DO CARGO:")[-1].split("QUI")[0].strip() if "NOME DO CARGO:" in linha else linha
-                        elif "NOME DO CENTRO DE CUSTO:" in linha:
-                            funcionario["centro_custo"] = linha.split("NOME DO CENTRO DE CUSTO:")[-1].split("DOM")[0].strip() if "NOME DO CENTRO DE CUSTO:" in linha else linha
-
-                    # Totais tabela
-                    if tabela:
-                        cabecalho = tabela[0]
-                        for linha_tabela in tabela:
-                            if linha_tabela and linha_tabela[0] and "TOTAIS" in str(linha_tabela[0]).upper():
-                                for titulo, valor in zip(cabecalho, linha_tabela):
-                                    chave = normalizar_nome_coluna(titulo)
-                                    if chave:
-                                        if chave in ["faltas", "desconta_dsr"]:
-                                            funcionario[chave] = int(valor) if valor and str(valor).isdigit() else 0
-                                        else:
-                                            funcionario[chave] = padronizar_tempo(valor)
-                        if funcionario.get("extra_50") == funcionario.get("horas_previstas"):
-                            funcionario["extra_50"] = "00:00"
-
-                    # Alterações / justificativas
-                    encontrou_alteracoes = False
-                    for linha_texto in linhas:
-                        linha_clean = limpar_texto(linha_texto)
-                        if not encontrou_alteracoes:
-                            if "ALTERACAO" in linha_clean or "ALTERAÇÃO" in linha_clean:
-                                encontrou_alteracoes = True
-                                continue
-                        if "BLITZ RECURSOS HUMANOS" in linha_clean:
-                            break
-                        linha_final = re.sub(r'\d{2}/\d{2}/\d{4}', '', linha_texto)
-                        linha_final = re.sub(r'\d{1,2}:\d{2}(:\d{2})?', '', linha_final)
-                        linha_final = re.sub(r'\d+', '', linha_final).strip()
-                        if not linha_final:
-                            continue
-                        tema_encontrado = achar_tema_mais_proximo(linha_final, lista_temas_mestra)
-                        if tema_encontrado:
-                            funcionario[tema_encontrado] += 1
-
-                    # Status OK/NOK
-                    if funcionario["faltas"] > 0 or funcionario["desconta_dsr"] > 0:
-                        funcionario["status"] = "NOK"
-                    else:
-                        funcionario["status"] = "OK"
-
-                    dados_funcionarios.append(funcionario)
-
-                    # Detalhe diário
-                    if tabela:
-                        for linha_detalhe in tabela[1:]:
-                            linha_detalhe = [celula for celula in linha_detalhe if celula not in [None, '']]
-                            if not linha_detalhe or (isinstance(linha_detalhe[0], str) and linha_detalhe[0].upper() == "TOTAIS"):
-                                continue
-                            data_split = linha_detalhe[0].split(" - ")
-                            data = data_split[0].strip()
-                            semana = data_split[1].strip() if len(data_split) > 1 else ""
-                            registro = {
-                                "pagina": i + 1,
-                                "nome": funcionario["nome"],
-                                "cpf": funcionario["cpf"],
-                                "data": data,
-                                "semana": semana,
-                                "previsto": linha_detalhe[1] if len(linha_detalhe) > 1 else "",
-                                "ent_1": linha_detalhe[2] if len(linha_detalhe) > 2 else "",
-                                "sai_1": linha_detalhe[3] if len(linha_detalhe) > 3 else "",
-                                "ent_2": linha_detalhe[4] if len(linha_detalhe) > 4 else "",
-                                "sai_2": linha_detalhe[5] if len(linha_detalhe) > 5 else "",
-                                "total_trabalhado": linha_detalhe[6] if len(linha_detalhe) > 6 else "",
-                                "total_noturno": linha_detalhe[7] if len(linha_detalhe) > 7 else "",
-                                "horas_previstas": linha_detalhe[8] if len(linha_detalhe) > 8 else "",
-                                "faltas": linha_detalhe[9] if len(linha_detalhe) > 9 else "",
-                                "horas_atraso": linha_detalhe[10] if len(linha_detalhe) > 10 else "",
-                                "extra_50": linha_detalhe[11] if len(linha_detalhe) > 11 else "",
-                                "desconta_dsr": linha_detalhe[12] if len(linha_detalhe) > 12 else "",
-                            }
-                            detalhes.append(registro)
-
-            # =========================
-            # Criação dos DataFrames
-            # =========================
-            df = pd.DataFrame(dados_funcionarios).fillna(0)
-            df_detalhe = pd.DataFrame(detalhes)
-            colunas_justificativas = lista_temas_mestra
-            try:
-                df_consolidado = df.drop(columns=colunas_justificativas)
-            except Exception:
-                df_consolidado = df.copy()
-
-            # =========================
-            # Validações e regras do df_detalhe
-            # =========================
-            valores_validacao = []
-            for _, row in df_detalhe.iterrows():
-                total_minutos = (
-                    hora_para_minutos(limpa_valor(row.get("sai_1"))) - hora_para_minutos(limpa_valor(row.get("ent_1"))) +
-                    hora_para_minutos(limpa_valor(row.get("sai_2"))) - hora_para_minutos(limpa_valor(row.get("ent_2")))
-                )
-                previsto_minutos = hora_para_minutos(limpa_valor(row.get("horas_previstas")))
-                if total_minutos > previsto_minutos:
-                    status = "Carga Horaria Completa - Fez Hora Extra"
-                elif total_minutos == previsto_minutos:
-                    status = "Carga Horaria Completa"
-                else:
-                    status = "Carga Horaria Incompleta"
-                valores_validacao.append(status)
-            df_detalhe["Validação da hora trabalhada"] = valores_validacao
-            
-            for col in ["ent_1", "sai_1", "ent_2", "sai_2"]:
-                df_detalhe[col + "_valido"] = df_detalhe[col].apply(lambda x: eh_horario(limpa_valor(x)))
-            
-            def determinar_situacao(row):
-                valores = [limpa_valor(row.get("ent_1")), limpa_valor(row.get("sai_1")), limpa_valor(row.get("ent_2")), limpa_valor(row.get("sai_2"))]
-                textos = [v for v in valores if v and not eh_horario(v)]
-                if textos:
-                    return textos[0].upper()
-                horarios_validos = [row.get("ent_1_valido"), row.get("sai_1_valido"), row.get("ent_2_valido"), row.get("sai_2_valido")]
-                if all(horarios_validos):
-                    return "Dia normal de trabalho"
-                if any(horarios_validos):
-                    return "Presença parcial"
-                return "Dia incompleto"
-            
-            df_detalhe["Situação"] = df_detalhe.apply(determinar_situacao, axis=1)
-            df_detalhe.drop(columns=[c for c in ["ent_1_valido", "sai_1_valido", "ent_2_valido", "sai_2_valido"] if c in df_detalhe.columns], inplace=True)
-            
-            df_incompletos = df_detalhe[df_detalhe["Situação"] == "Dia incompleto"].copy()
-            def reavaliar_situacao(row):
-                if eh_horario(limpa_valor(row.get("total_trabalhado"))) and limpa_valor(row.get("total_trabalhado")) != "00:00":
-                    return "Dia normal de trabalho"
-                entradas_saidas = [limpa_valor(row.get("ent_1")), limpa_valor(row.get("sai_1")),
-                                   limpa_valor(row.get("ent_2")), limpa_valor(row.get("sai_2"))]
-                if all(v == "" for v in entradas_saidas):
-                    return "Dia não previsto"
-                textos = [v for v in entradas_saidas if v and not eh_horario(v)]
-                if textos:
-                    return textos[0].upper()
-                return "Presença parcial"
-            if not df_incompletos.empty:
-                df_detalhe.loc[df_incompletos.index, "Situação"] = df_incompletos.apply(reavaliar_situacao, axis=1)
-            
-            df_detalhe.loc[df_detalhe.get("ent_1", "").astype(str).str.contains("-", na=False), "Situação"] = "Dia não previsto"
-            
-            def pegar_correcao(row):
-                for col in ["ent_1", "sai_1", "ent_2", "sai_2"]:
-                    val = limpa_valor(row.get(col))
-                    if val:
-                        return val
-                return ""
-            df_detalhe["correção"] = df_detalhe.apply(pegar_correcao, axis=1)
-            df_detalhe.loc[df_detalhe["Situação"].apply(lambda x: eh_horario(str(x))), "Situação"] = df_detalhe["correção"]
-            
-            def regra_numero_inicio(row):
-                situacao = limpa_valor(row.get("Situação"))
-                if situacao and len(situacao) > 0 and situacao[0].isdigit():
-                    total_trab = limpa_valor(row.get("total_trabalhado"))
-                    if eh_horario(total_trab) and total_trab != "00:00":
-                        return "Dia normal de trabalho"
-                    else:
-                        previsto = limpa_valor(row.get("previsto")).upper()
-                        return previsto if previsto else "Dia não previsto"
-                return situacao
-            df_detalhe["Situação"] = df_detalhe.apply(regra_numero_inicio, axis=1)
-
-            # =========================
-            # Padronizar valores da coluna "Situação"
-            # =========================
-           # Padroniza Situação para MAIÚSCULAS (já no seu código)
-            if "Situação" in df_detalhe.columns:
-                df_detalhe["Situação"] = df_detalhe["Situação"].astype(str).str.strip().str.upper()
-            
-            # Ajuste requerido — faz a substituição só quando Situação == "DIA NÃO PREVISTO"
-            # e previsto não for vazio/traço. Normaliza o valor de 'previsto' para MAIÚSCULAS.
-            if "previsto" in df_detalhe.columns:
-                mask = (
-                    (df_detalhe["Situação"] == "DIA NÃO PREVISTO") &
-                    (df_detalhe["previsto"].astype(str).str.strip().ne("-")) &
-                    (df_detalhe["previsto"].astype(str).str.strip().ne(""))
-                )
-                df_detalhe.loc[mask, "Situação"] = df_detalhe.loc[mask, "previsto"].astype(str).str.strip().str.upper()
-
-
-            # =========================
-            # Contagem final de Situações
-            # =========================
-            if "Situação" in df_detalhe.columns:
-                situacoes_unicas = df_detalhe["Situação"].unique()
-                for sit in situacoes_unicas:
-                    nome_col = f"Qtd - {sit}"
-                    df_detalhe[nome_col] = df_detalhe.groupby("cpf")["Situação"].transform(lambda x: (x == sit).sum())
-            
-                df_situacoes = (
-                    df_detalhe.groupby("cpf")["Situação"]
-                    .value_counts()
-                    .unstack(fill_value=0)
-                    .reset_index()
-                )
-            
-                # Faz o merge primeiro!
-                df_consolidado = pd.merge(df_consolidado, df_situacoes, on="cpf", how="outer")
-            
-            # =========================
-            # Consolidado final (DEPOIS do merge)
-            # =========================
-            colunas_remover = [
-                "AJUSTE DE HORAS"
-            ]
-            
-
-            df_consolidado_final = df_consolidado.drop(
-                columns=[
-                    col for col in colunas_remover
-                    if col in df_consolidado.columns and not col.startswith("Qtd -")
-                ],
-                errors="ignore"
-            )
-
-    
-
-
-
-
-            # =========================
-            # Botões de Download
-            # =========================
-            st.markdown(
-                """
-                <div class="card">
-                    <h3>📥 Baixar Relatórios</h3>
-                    <p>Após o processamento, você pode baixar os arquivos consolidados com um clique abaixo:</p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-
-            output_consolidado = BytesIO()
-            df_consolidado_final.to_excel(output_consolidado, index=False)
-            output_consolidado.seek(0)
-
-            output_detalhe = BytesIO()
-            df_detalhe.to_excel(output_detalhe, index=False)
-            output_detalhe.seek(0)
-
-            col1, col2 = st.columns(2)
-            with col1:
-                st.download_button(
-                    label="⬇️ Baixar consolidado_blitz.xlsx",
-                    data=output_consolidado,
-                    file_name="consolidado_blitz.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            with col2:
-                st.download_button(
-                    label="⬇️ Baixar detalhe_funcionarios.xlsx",
-                    data=output_detalhe,
-                    file_name="detalhe_funcionarios.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-
     # -------------------------
     # Aba D0 (LÓGICA 100% ORIGINAL)
     # -------------------------
     with tab2:
-        st.markdown('<div class="card"><h2>🔍 Aba D0</h2><p>Acesse o notebook do Google Colab clicando no link abaixo:</p><p><a href="https://colab.research.google.com/drive/1dos61MV-4zddHegz8n9tZv4yv-3wLqPq?usp=drive_link" target="_blank">Abrir notebook Colab</a></p></div>', unsafe_allow_html=True)
+        # Ainda não há parser "D0" (layout fora do repositório, ver processamento/fornecedores.py):
+        # a aba fica no Colab até um ser registrado
+        if "D0" in PARSERS:
+            st.markdown('<div class="card"><h2>🔍 Aba D0</h2></div>', unsafe_allow_html=True)
+            aba_fornecedor(obter_parser("D0"), "d0", "Selecione o arquivo PDF de apontamentos da D0.")
+        else:
+            st.markdown('<div class="card"><h2>🔍 Aba D0</h2><p>Acesse o notebook do Google Colab clicando no link abaixo:</p><p><a href="https://colab.research.google.com/drive/1dos61MV-4zddHegz8n9tZv4yv-3wLqPq?usp=drive_link" target="_blank">Abrir notebook Colab</a></p></div>', unsafe_allow_html=True)
     
     # -------------------------
     # Aba Polly (LÓGICA 100% ORIGINAL)
@@ -639,15 +792,66 @@ else:
             '📕 DESLIGADOS / OUTROS - PDF sem total de dias trabalhados': "https://colab.research.google.com/drive/1XuAET4xelIjGibaiSt8L13vpssA6FWIW?usp=drive_link"
         }
     
-        # ======= Exibição do Link =======
-        st.markdown(
-            f"""
-            <p>Clique abaixo para abrir o notebook correspondente:</p>
-            <a class="link-button" href="{links[opcao_link]}" target="_blank">🚀 Abrir {opcao_link} no Colab</a>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        # ======= Parser no app ou link do Colab (sem parsers Polly ainda: layouts fora do repositório) =======
+        parser_polly = "Polly FIXOS" if opcao_link.startswith("📘") else "Polly DESLIGADOS"
+        if parser_polly in PARSERS:
+            st.markdown("</div>", unsafe_allow_html=True)
+            aba_fornecedor(
+                obter_parser(parser_polly),
+                "polly_fixos" if parser_polly == "Polly FIXOS" else "polly_desligados",
+                f"Selecione o arquivo PDF da Polly ({opcao_link[2:].strip()})."
+            )
+        else:
+            st.markdown(
+                f"""
+                <p>Clique abaixo para abrir o notebook correspondente:</p>
+                <a class="link-button" href="{links[opcao_link]}" target="_blank">🚀 Abrir {opcao_link} no Colab</a>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+
+    # -------------------------
+    # Aba Histórico
+    # -------------------------
+    with tab4:
+        st.markdown('<div class="card"><h2>📚 Histórico</h2><p>Relatórios já processados, consultados direto do banco local, sem reenviar os PDFs.</p></div>', unsafe_allow_html=True)
+
+        historico = obter_historico()
+        gravacoes = historico.execucoes()
+        if gravacoes.empty:
+            st.info("Nenhum relatório gravado ainda. Use \"📚 Gravar no histórico\" depois de processar um PDF.")
+        else:
+            st.dataframe(gravacoes, hide_index=True)
+
+            col_fornecedor, col_meses, col_cpf = st.columns(3)
+            with col_fornecedor:
+                fornecedor_historico = st.selectbox("Fornecedor", sorted(gravacoes["fornecedor"].unique()), key="historico_fornecedor")
+            with col_meses:
+                meses_disponiveis = sorted(gravacoes.loc[gravacoes["fornecedor"] == fornecedor_historico, "mes"].unique())
+                meses_historico = st.multiselect("Meses", meses_disponiveis, default=meses_disponiveis, key="historico_meses")
+            with col_cpf:
+                cpf_historico = st.text_input("CPF (opcional)", key="historico_cpf").strip() or None
+
+            filtros = dict(fornecedor=fornecedor_historico, meses=meses_historico, cpf=cpf_historico)
+            if not meses_historico:
+                st.info("Nenhum mês selecionado.")
+
+            st.subheader("Situações por mês")
+            st.dataframe(historico.situacoes_por_mes(**filtros), hide_index=True)
+
+            campo_evolucao = st.selectbox(
+                "Evolução mensal do consolidado",
+                ["faltas", "desconta_dsr", "total_trabalhado", "horas_atraso", "extra_50", "horas_previstas"],
+                key="historico_campo"
+            )
+            st.dataframe(para_exibir(historico.evolucao(campo_evolucao, **filtros)), hide_index=True)
+
+            with st.expander("Consolidado dos meses selecionados"):
+                st.dataframe(para_exibir(historico.consolidado(**filtros)), hide_index=True)
+            if cpf_historico and st.checkbox("Mostrar detalhe diário do CPF", key="historico_detalhe"):
+                st.dataframe(para_exibir(historico.detalhe(**filtros)), hide_index=True)
 
 
 # =========================
@@ -0,0 +1,6 @@
+# =========================
+# Gerador de PDFs sintéticos da Blitz e benchmark por etapa do processamento
+#
+#   python -m benchmarks.gerar_pdf exemplo.pdf --paginas 200
+#   python -m benchmarks.executar --paginas 50 200
+# =========================
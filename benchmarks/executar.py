@@ -0,0 +1,257 @@
+# =========================
+# Benchmark por etapa do processamento da Blitz
+# =========================
+# Mede, para PDFs sintéticos (benchmarks/gerar_pdf.py) ou um PDF informado:
+#   extracao      -> leitura de texto e tabela de cada página (pdfplumber/PyMuPDF)
+#   cabecalho     -> cabeçalho, totais, justificativas e linhas diárias por página
+#   regras        -> validação da hora trabalhada, Situação e correção
+#   situacoes     -> contagem das Situações por cpf
+#   exportacao    -> consolidado + detalhe em xlsx
+# Para cada etapa: tempo (melhor de N repetições), páginas/s e pico de RSS.
+# Com --partida, mede também o import a frio (interpretador novo) do que o app
+# carrega antes da tela inicial e do motor (processamento/inicializacao.py).
+# O resultado vai para benchmarks/resultados/<data>_<commit>.json; com
+# --comparar, as etapas mais lentas que a referência (além da tolerância)
+# fazem o comando terminar com código 1.
+#
+#   python -m benchmarks.executar --paginas 50 200 --repeticoes 3
+#   python -m benchmarks.executar --comparar benchmarks/resultados/anterior.json
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from processamento.blitz import (
+    LISTA_TEMAS_MESTRA,
+    aplicar_regras_detalhe,
+    contar_situacoes,
+    montar_relatorios,
+    processar_pagina,
+)
+from processamento.exportacao import gerar_xlsx
+from processamento.extracao import BACKEND_PADRAO, BACKENDS, abrir_extrator
+from processamento.inicializacao import MODULOS_MOTOR, MODULOS_TELA_INICIAL, medir_importacao
+
+from .gerar_pdf import gerar_pdf
+
+DIRETORIO_RESULTADOS = Path(__file__).parent / "resultados"
+
+
+# =========================
+# Memória
+# =========================
+def zerar_pico_rss():
+    """Zera o pico de RSS do processo (Linux); devolve False se não for possível."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def pico_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for linha in f:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    # Sem /proc: pico do processo inteiro (KB no Linux, bytes no macOS)
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def medir(funcao, repeticoes):
+    """Executa funcao() `repeticoes` vezes. Devolve (último resultado, melhor tempo, pico de RSS em MB)."""
+    melhor = None
+    pico = 0.0
+    for _ in range(repeticoes):
+        # Solta o resultado anterior antes de medir o pico da próxima repetição
+        resultado = None
+        zerar_pico_rss()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        pico = max(pico, pico_rss_mb())
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return resultado, melhor, pico
+
+
+# =========================
+# Etapas
+# =========================
+def _ler_paginas(pdf, backend):
+    with abrir_extrator(pdf, backend) as extrator:
+        return list(extrator.paginas())
+
+
+def _processar_paginas(paginas, lista_temas):
+    dados_funcionarios, detalhes = [], []
+    for i, texto, tabela in paginas:
+        resultado = processar_pagina(texto, tabela, i + 1, lista_temas)
+        if resultado is not None:
+            dados_funcionarios.append(resultado[0])
+            detalhes.extend(resultado[1])
+    return dados_funcionarios, detalhes
+
+
+def medir_pdf(pdf, backend=BACKEND_PADRAO, repeticoes=1, lista_temas=None):
+    """Mede todas as etapas para um PDF. Devolve um dict por etapa."""
+    lista_temas = LISTA_TEMAS_MESTRA if lista_temas is None else lista_temas
+    etapas = {}
+
+    def registrar(nome, funcao, itens):
+        resultado, segundos, pico = medir(funcao, repeticoes)
+        etapas[nome] = {
+            "segundos": round(segundos, 4),
+            "paginas_por_segundo": round(total_paginas / segundos, 2) if segundos else None,
+            "itens": itens if not callable(itens) else itens(resultado),
+            "pico_rss_mb": round(pico, 1),
+        }
+        return resultado
+
+    with abrir_extrator(pdf, backend) as extrator:
+        total_paginas = extrator.total_paginas
+
+    paginas = registrar("extracao", lambda: _ler_paginas(pdf, backend), total_paginas)
+    dados_funcionarios, detalhes = registrar(
+        "cabecalho", lambda: _processar_paginas(paginas, lista_temas), lambda r: len(r[0])
+    )
+    # As regras alteram o DataFrame recebido: cada repetição parte de uma cópia nova
+    df_detalhe = registrar("regras", lambda: aplicar_regras_detalhe(pd.DataFrame(detalhes)), len(detalhes))
+    registrar("situacoes", lambda: contar_situacoes(df_detalhe), len(df_detalhe))
+
+    df_consolidado_final, df_detalhe_final = montar_relatorios(dados_funcionarios, detalhes, lista_temas)
+    planilhas = {"consolidado": df_consolidado_final, "detalhe": df_detalhe_final}
+    registrar("exportacao", lambda: gerar_xlsx(planilhas), len(df_consolidado_final) + len(df_detalhe_final))
+
+    return {"paginas": total_paginas, "etapas": etapas}
+
+
+def medir_partida(repeticoes=1):
+    """Melhor tempo de import a frio da tela inicial do app e do motor, cada um num interpretador novo."""
+    return {
+        nome: round(min(medir_importacao(modulos) for _ in range(repeticoes)), 4)
+        for nome, modulos in (("tela_inicial", MODULOS_TELA_INICIAL), ("motor", MODULOS_MOTOR))
+    }
+
+
+# =========================
+# Resultados
+# =========================
+def versao_codigo():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def salvar_resultados(resultados, diretorio=DIRETORIO_RESULTADOS):
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    arquivo = diretorio / f"{datetime.now():%Y%m%d-%H%M%S}_{resultados['versao']}.json"
+    arquivo.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+    return arquivo
+
+
+def comparar_resultados(atual, referencia, tolerancia=0.2):
+    """Lista (caso, etapa, segundos_ref, segundos_atual) das etapas mais lentas que referência * (1 + tolerancia)."""
+    regressoes = []
+    for caso, medicao in atual["casos"].items():
+        medicao_ref = referencia.get("casos", {}).get(caso)
+        if not medicao_ref:
+            continue
+        for etapa, valores in medicao["etapas"].items():
+            valores_ref = medicao_ref["etapas"].get(etapa)
+            if valores_ref and valores["segundos"] > valores_ref["segundos"] * (1 + tolerancia):
+                regressoes.append((caso, etapa, valores_ref["segundos"], valores["segundos"]))
+    for etapa, segundos in atual.get("partida", {}).items():
+        segundos_ref = referencia.get("partida", {}).get(etapa)
+        if segundos_ref and segundos > segundos_ref * (1 + tolerancia):
+            regressoes.append(("partida", etapa, segundos_ref, segundos))
+    return regressoes
+
+
+def imprimir(caso, medicao):
+    print(f"\n{caso} ({medicao['paginas']} páginas)")
+    print(f"  {'etapa':<12}{'segundos':>10}{'págs/s':>10}{'itens':>8}{'pico RSS':>11}")
+    for etapa, valores in medicao["etapas"].items():
+        print(
+            f"  {etapa:<12}{valores['segundos']:>10.3f}{valores['paginas_por_segundo'] or 0:>10.1f}"
+            f"{valores['itens']:>8}{valores['pico_rss_mb']:>8.1f} MB"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.executar", description="Benchmark por etapa do processamento da Blitz.")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[50, 200], help="Tamanhos dos PDFs sintéticos (padrão: 50 200)")
+    parser.add_argument("--pdf", nargs="+", default=[], help="PDFs existentes a medir no lugar dos sintéticos")
+    parser.add_argument("--semente", type=int, default=1, help="Semente dos PDFs sintéticos (padrão: 1)")
+    parser.add_argument("-b", "--backend", default=BACKEND_PADRAO, choices=list(BACKENDS), help=f"Biblioteca de extração (padrão: {BACKEND_PADRAO})")
+    parser.add_argument("-r", "--repeticoes", type=int, default=1, help="Repetições por etapa; vale o melhor tempo (padrão: 1)")
+    parser.add_argument("--partida", action="store_true", help="Mede também o import a frio da tela inicial do app e do motor")
+    parser.add_argument("--saida", default=str(DIRETORIO_RESULTADOS), help="Diretório dos resultados JSON")
+    parser.add_argument("--nao-salvar", action="store_true", help="Só mostra os números, sem gravar o JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Folga antes de acusar regressão (padrão: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "versao": versao_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "backend": args.backend,
+        "repeticoes": args.repeticoes,
+        "casos": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temporario:
+        if args.pdf:
+            casos = {Path(pdf).name: pdf for pdf in args.pdf}
+        else:
+            casos = {
+                f"sintetico_{paginas}": gerar_pdf(str(Path(temporario) / f"sintetico_{paginas}.pdf"), paginas, args.semente)
+                for paginas in args.paginas
+            }
+        for caso, pdf in casos.items():
+            medicao = medir_pdf(pdf, args.backend, args.repeticoes)
+            resultados["casos"][caso] = medicao
+            imprimir(caso, medicao)
+
+    if args.partida:
+        resultados["partida"] = medir_partida(args.repeticoes)
+        print("\npartida a frio (import num interpretador novo)")
+        for etapa, segundos in resultados["partida"].items():
+            print(f"  {etapa:<12}{segundos:>10.3f}")
+
+    if not args.nao_salvar:
+        print(f"\nResultados gravados em {salvar_resultados(resultados, args.saida)}")
+
+    if args.comparar:
+        referencia = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        regressoes = comparar_resultados(resultados, referencia, args.tolerancia)
+        if regressoes:
+            print(f"\nRegressões em relação a {referencia.get('versao', args.comparar)}:", file=sys.stderr)
+            for caso, etapa, antes, depois in regressoes:
+                print(f"  {caso} / {etapa}: {antes:.3f}s -> {depois:.3f}s", file=sys.stderr)
+            return 1
+        print(f"\nSem regressões em relação a {referencia.get('versao', args.comparar)}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
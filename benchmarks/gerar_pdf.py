@@ -0,0 +1,119 @@
+# =========================
+# PDFs sintéticos no layout do espelho de ponto da Blitz
+# =========================
+# Nenhum dado real: nomes, CPFs e marcações são sorteados a partir da semente.
+# Cada página traz o mesmo que o parser procura nos PDFs reais:
+#   - linhas de cabeçalho "NOME DO FUNCIONÁRIO: ... CPF DO FUNCIONÁRIO:",
+#     "NÚMERO DE MATRÍCULA:", "NOME DO CARGO:" e "NOME DO CENTRO DE CUSTO:";
+#   - a tabela diária (com bordas) terminando na linha TOTAIS;
+#   - a seção "ALTERAÇÃO / JUSTIFICATIVAS" e o rodapé BLITZ RECURSOS HUMANOS.
+# Os dias misturam jornadas completas, parciais, FOLGA, DSR, ATESTADO, FERIAS,
+# traços e horários inválidos, para exercitar todas as regras de Situação.
+import argparse
+import random
+
+import fitz  # PyMuPDF
+
+CABECALHO_TABELA = [
+    "DATA", "PREVISTO", "ENT. 1", "SAÍ. 1", "ENT. 2", "SAÍ. 2", "TOTAL TRAB.", "TOTAL NOTURNO",
+    "HORAS PREVISTAS", "FALTAS", "HORAS ATRASO", "EXTRA 50%", "DESCONTA DSR",
+]
+LARGURAS = [90, 70, 45, 45, 45, 45, 50, 55, 60, 40, 55, 50, 55]
+ALTURA_LINHA = 11
+DIAS_SEMANA = ["SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM"]
+JUSTIFICATIVAS = ["AJUSTE DE HORAS", "AJUSTE DE HORA", "ESQUECIMENTO DE MARCACAO", "ajuste de horas extra"]
+
+# (probabilidade acumulada, marcações do dia a partir da coluna PREVISTO)
+TIPOS_DIA = [
+    (0.55, None),  # jornada completa, saída sorteada
+    (0.62, ["FOLGA", "", "", "", "", "", "", "", "", "", "", ""]),
+    (0.68, ["08:00 - 17:00", "ATESTADO", "ATESTADO", "", "", "", "", "08:00", "", "", "", ""]),
+    (0.73, ["-", "-", "-", "-", "-", "", "", "", "", "", "", ""]),
+    (0.78, ["08:00 - 17:00", "08:00", "12:00", "", "", "04:00", "", "08:00", "", "04:00", "", ""]),
+    (0.83, ["08:00 - 17:00", "08:00", "12:00", "13:00", "", "00:00", "", "08:00", "1", "", "", "1"]),
+    (0.87, ["DSR", "", "", "", "", "", "", "", "", "", "", ""]),
+    (0.90, ["08:00 - 17:00", "25:00", "12:00", "13:00", "17:00", "08:00", "", "08:00", "", "", "", ""]),
+    (0.93, ["08:00 - 17:00", "", "", "", "", "", "", "08:00", "1", "", "", ""]),
+    (0.96, ["", "", "", "", "", "", "", "", "", "", "", ""]),
+    (1.00, ["08:00 - 17:00", "FERIAS", "", "", "", "", "", "", "", "", "", ""]),
+]
+
+
+def linha_dia(rng, dia, mes="10/2025"):
+    data = f"{dia:02d}/{mes} - {DIAS_SEMANA[dia % 7]}"
+    sorteio = rng.random()
+    for limite, marcacoes in TIPOS_DIA:
+        if sorteio < limite:
+            break
+    if marcacoes is None:
+        saida = rng.choice(["17:00", "17:30", "16:45"])
+        marcacoes = ["08:00 - 17:00", "08:00", "12:00", "13:00", saida, "08:00", "00:00", "08:00", "", "00:00", "00:00", ""]
+    return [data] + marcacoes
+
+
+def desenhar_tabela(pagina, linhas, y):
+    for r, linha in enumerate(linhas):
+        x = 20
+        for c, valor in enumerate(linha):
+            pagina.draw_rect(fitz.Rect(x, y + r * ALTURA_LINHA, x + LARGURAS[c], y + (r + 1) * ALTURA_LINHA), color=(0, 0, 0), width=0.5)
+            if valor:
+                pagina.insert_text((x + 2, y + r * ALTURA_LINHA + 8), valor, fontsize=6)
+            x += LARGURAS[c]
+    return y + len(linhas) * ALTURA_LINHA
+
+
+def gerar_pdf(caminho, paginas, semente=1, capa=True):
+    """Grava em `caminho` um PDF da Blitz com `paginas` páginas (a 1ª é uma capa sem dados se capa=True)."""
+    rng = random.Random(semente)
+    documento = fitz.open()
+    # Cerca de duas páginas por funcionário, como nos meses reais
+    funcionarios = max(2, paginas // 2)
+    for numero in range(paginas):
+        pagina = documento.new_page(width=842, height=595)
+        if capa and numero == 0:
+            pagina.insert_text((30, 30), "RELATORIO DE PONTO - CAPA", fontsize=9)
+            continue
+
+        nome = f"FUNCIONARIO {rng.randint(1, funcionarios)}"
+        cpf = f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}"
+        y = 30
+        for texto in [
+            f"NOME DO FUNCIONÁRIO: {nome} CPF DO FUNCIONÁRIO: {cpf} SEG 08:00 17:00",
+            f"NÚMERO DE MATRÍCULA: {1000 + numero} NOME DO DEPARTAMENTO: OPERACOES",
+            "NOME DO CARGO: AUXILIAR LOGISTICA QUI 08:00 17:00",
+            "NOME DO CENTRO DE CUSTO: SP01 DOM FOLGA",
+        ]:
+            pagina.insert_text((30, y), texto, fontsize=8)
+            y += 12
+
+        linhas = [CABECALHO_TABELA] + [linha_dia(rng, dia) for dia in range(1, rng.randint(10, 28))]
+        linhas.append([
+            "TOTAIS", "", "", "", "", "", "176:00", "00:00", "176:00", str(rng.randint(0, 2)), "02:00",
+            rng.choice(["176:00", "03:10"]), str(rng.randint(0, 1)),
+        ])
+        y = desenhar_tabela(pagina, linhas, y + 5) + 15
+
+        pagina.insert_text((30, y), "ALTERAÇÃO / JUSTIFICATIVAS", fontsize=8)
+        y += 11
+        for _ in range(rng.randint(0, 4)):
+            pagina.insert_text((30, y), f"{rng.randint(1, 28):02d}/10/2025 08:00 {rng.choice(JUSTIFICATIVAS)}", fontsize=8)
+            y += 11
+        pagina.insert_text((30, 570), "BLITZ RECURSOS HUMANOS LTDA", fontsize=8)
+    documento.save(caminho)
+    documento.close()
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gerar_pdf", description="Gera um PDF sintético no layout da Blitz.")
+    parser.add_argument("saida", help="Arquivo PDF a gerar")
+    parser.add_argument("-p", "--paginas", type=int, default=50, help="Quantidade de páginas (padrão: 50)")
+    parser.add_argument("--semente", type=int, default=1, help="Semente do sorteio (padrão: 1)")
+    parser.add_argument("--sem-capa", action="store_true", help="Não incluir a página de capa sem dados")
+    args = parser.parse_args(argv)
+    gerar_pdf(args.saida, args.paginas, args.semente, capa=not args.sem_capa)
+    print(f"{args.saida}: {args.paginas} páginas")
+
+
+if __name__ == "__main__":
+    main()
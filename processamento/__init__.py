@@ -0,0 +1,32 @@
+# =========================
+# Motor de processamento dos PDFs de fornecedores (usado pelo app e pela linha de comando)
+# =========================
+# Os nomes abaixo são carregados no primeiro acesso: `import processamento.tarefas`
+# (ou qualquer submódulo leve) não traz pandas, pdfplumber e PyMuPDF junto.
+import importlib
+
+_ORIGENS = {
+    "LISTA_TEMAS_MESTRA": ".blitz",
+    "ResultadoExtracao": ".blitz",
+    "extrair_pdf": ".blitz",
+    "extrair_registros": ".blitz",
+    "montar_relatorios": ".blitz",
+    "parse_blitz_pdf": ".blitz",
+    "CacheResultados": ".cache",
+    "processar_com_cache": ".cache",
+}
+
+__all__ = sorted(_ORIGENS)
+
+
+def __getattr__(nome):
+    if nome not in _ORIGENS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(_ORIGENS[nome], __name__), nome)
+    # Nas próximas vezes o nome já está no módulo e __getattr__ não é chamado
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ORIGENS))
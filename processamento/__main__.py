@@ -0,0 +1,209 @@
+# =========================
+# Linha de comando: processa em lote todos os PDFs da Blitz de um diretório
+#
+#   python -m processamento pdfs_outubro/ --saida relatorios_outubro/ --workers 4
+# =========================
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+from .configuracoes import ESCOPO_AMBOS, ESCOPOS
+from .exportacao import FORMATOS, descrever_exportacao, exportar
+from .extracao import BACKEND_PADRAO, BACKENDS
+from .fornecedores import FORNECEDOR_PADRAO, PARSERS, obter_parser
+from .perfil import Perfil, etapa, execucao
+from .texto_pagina import descrever_falhas
+
+
+def descrever_relatorios(df_consolidado_final, df_detalhe):
+    partes = []
+    if df_consolidado_final is not None:
+        partes.append(f"{len(df_consolidado_final)} funcionários")
+    if df_detalhe is not None:
+        partes.append(f"{len(df_detalhe)} linhas de detalhe")
+    return ", ".join(partes)
+
+
+def gravar_historico(historico, parser, df_consolidado_final, df_detalhe, arquivo):
+    """Grava no histórico, avisando quando a gravação substitui a do mesmo fornecedor e mês."""
+    from .historico import mes_referencia
+
+    mes = mes_referencia(df_detalhe)
+    anteriores = historico.arquivos_gravados(parser.nome, mes) if mes else []
+    try:
+        historico.gravar(df_consolidado_final, df_detalhe, mes=mes, fornecedor=parser.nome, arquivo=arquivo)
+    except ValueError as erro:
+        print(f"    AVISO: não gravado no histórico: {erro}", file=sys.stderr)
+        return
+    if anteriores:
+        print(f"    AVISO: gravação de {mes} substituída no histórico (antes: {', '.join(anteriores)})", file=sys.stderr)
+
+
+def processar_diretorio(entrada, saida, padrao="*.pdf", workers=1, backend=BACKEND_PADRAO, ocr=None,
+                        formato="xlsx", arquivo_unico=False, perfil=False, cprofile=False, historico=None,
+                        fornecedor=FORNECEDOR_PADRAO, mesclar=False, paginas_conhecidas=None, escopo=ESCOPO_AMBOS,
+                        validar=True, tempo_max_pagina=None):
+    """Gera consolidado e detalhe de cada PDF. Devolve a lista de arquivos que falharam.
+
+    Com `perfil`, grava <pdf>_perfil.json com o tempo das etapas; com `cprofile`,
+    também <pdf>.prof com as estatísticas do cProfile. `historico`
+    (HistoricoRelatorios) recebe cada relatório gerado (uma gravação por
+    fornecedor e mês). Com `mesclar`, grava também mesclado_<relatório> juntando
+    todos os PDFs (processamento/mesclagem.py), e o histórico recebe só o mesclado.
+    `paginas_conhecidas` (cache.PaginasConhecidas) evita reextrair páginas já processadas.
+    `escopo` e `validar` escolhem os relatórios e as regras (processamento/configuracoes.py).
+    `tempo_max_pagina` (segundos) isola cada página sob esse prazo (processamento/isolamento.py).
+    """
+    parser = obter_parser(fornecedor)
+    entrada = Path(entrada)
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+
+    arquivos = sorted(p for p in entrada.glob(padrao) if p.is_file())
+    if not arquivos:
+        print(f"Nenhum PDF encontrado em {entrada} ({padrao}).")
+        return []
+
+    falhas = []
+    extraidos = []
+    conteudos = {}
+    for n, arquivo in enumerate(arquivos, start=1):
+        print(f"[{n}/{len(arquivos)}] {arquivo.name}...", flush=True)
+        perfil_arquivo = Perfil(profundo=cprofile) if perfil or cprofile else None
+        try:
+            with execucao(perfil_arquivo):
+                extracao = parser.extrair(
+                    arquivo, workers=workers, backend=backend, ocr=ocr, perfil=perfil_arquivo,
+                    paginas_conhecidas=paginas_conhecidas, escopo=escopo, tempo_max_pagina=tempo_max_pagina,
+                )
+                df_consolidado_final, df_detalhe = parser.relatorios(
+                    extracao, perfil=perfil_arquivo, escopo=escopo, validar=validar
+                )
+        except Exception as erro:
+            print(f"    ERRO: {erro}", file=sys.stderr)
+            falhas.append(arquivo)
+            continue
+        if mesclar:
+            conteudo = hashlib.sha256(arquivo.read_bytes()).hexdigest()
+            if conteudo in conteudos:
+                print(f"    AVISO: mesmo conteúdo de {conteudos[conteudo]}; fica fora da mesclagem", file=sys.stderr)
+            else:
+                conteudos[conteudo] = arquivo.name
+                extraidos.append((arquivo.name, df_consolidado_final, df_detalhe))
+        if extracao.paginas_reaproveitadas:
+            print(f"    {len(extracao.paginas_reaproveitadas)} de {extracao.total_paginas} página(s) reaproveitada(s) de versões já processadas")
+        if extracao.paginas_sem_tabela:
+            print(f"    {len(extracao.paginas_sem_tabela)} página(s) sem tabela de ponto pela triagem: {extracao.paginas_sem_tabela}")
+        if extracao.paginas_degradadas:
+            print(f"    AVISO: {len(extracao.paginas_degradadas)} página(s) lida(s) num modo mais barato por estourar o tempo: "
+                  + ", ".join(f"{numero} ({modo})" for numero, modo in extracao.paginas_degradadas.items()), file=sys.stderr)
+        if extracao.paginas_com_falha:
+            print(f"    AVISO: {len(extracao.paginas_com_falha)} página(s) não extraída(s) no tempo, fora do relatório: {extracao.paginas_com_falha}", file=sys.stderr)
+        falhas_cabecalho = descrever_falhas(extracao.falhas_campos)
+        if falhas_cabecalho:
+            print(f"    AVISO: página(s) com nome ou cpf não lidos no cabeçalho: {falhas_cabecalho}", file=sys.stderr)
+        if extracao.paginas_ocr:
+            print(f"    {len(extracao.paginas_ocr)} página(s) lida(s) por OCR: {extracao.paginas_ocr}")
+        if extracao.paginas_vazias:
+            print(f"    AVISO: {len(extracao.paginas_vazias)} página(s) sem texto nem tabela ignorada(s): {extracao.paginas_vazias}", file=sys.stderr)
+        with execucao(perfil_arquivo), etapa(perfil_arquivo, "exportacao", formato=formato):
+            for nome_base, planilhas in parser.planilhas_exportacao(df_consolidado_final, df_detalhe, arquivo_unico):
+                nome_arquivo, _ = descrever_exportacao(planilhas, formato, f"{arquivo.stem}_{nome_base}")
+                (saida / nome_arquivo).write_bytes(exportar(planilhas, formato))
+        print(f"    {descrever_relatorios(df_consolidado_final, df_detalhe)}")
+        if historico is not None and not mesclar:
+            gravar_historico(historico, parser, df_consolidado_final, df_detalhe, arquivo.name)
+
+        if perfil_arquivo is not None:
+            (saida / f"{arquivo.stem}_perfil.json").write_text(perfil_arquivo.json(), encoding="utf-8")
+            if cprofile:
+                (saida / f"{arquivo.stem}.prof").write_bytes(perfil_arquivo.dados_cprofile())
+            print(f"    perfil: {perfil_arquivo.total_segundos:.2f}s em " + ", ".join(
+                f"{registro['etapa']} {registro['segundos']:.2f}s" for registro in perfil_arquivo.etapas
+            ))
+
+    if mesclar and extraidos:
+        print(f"Mesclando {len(extraidos)} arquivo(s)...", flush=True)
+        df_consolidado_final, df_detalhe, dias_descartados = parser.mesclar(extraidos)
+        for nome_base, planilhas in parser.planilhas_exportacao(df_consolidado_final, df_detalhe, arquivo_unico):
+            nome_arquivo, _ = descrever_exportacao(planilhas, formato, f"mesclado_{nome_base}")
+            (saida / nome_arquivo).write_bytes(exportar(planilhas, formato))
+        print(f"    {descrever_relatorios(df_consolidado_final, df_detalhe)}"
+              + (f" ({dias_descartados} dia(s) repetido(s) entre arquivos descartado(s) do detalhe)" if dias_descartados else ""))
+        if dias_descartados:
+            print("    AVISO: os totais do consolidado contam os dias repetidos em dobro; veja a coluna dias_sobrepostos",
+                  file=sys.stderr)
+        if historico is not None:
+            gravar_historico(historico, parser, df_consolidado_final, df_detalhe, ", ".join(nome for nome, _, _ in extraidos))
+
+    return falhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m processamento",
+        description="Processa em lote os PDFs de ponto de um fornecedor (padrão: Blitz) e gera os relatórios (Excel, CSV ou Parquet).",
+    )
+    parser.add_argument("entrada", help="Diretório com os PDFs mensais")
+    parser.add_argument("-s", "--saida", default="relatorios", help="Diretório onde os relatórios serão gravados (padrão: relatorios)")
+    parser.add_argument("--fornecedor", default=FORNECEDOR_PADRAO, choices=list(PARSERS), help=f"Layout do PDF (padrão: {FORNECEDOR_PADRAO})")
+    parser.add_argument("--padrao", default="*.pdf", help="Padrão de nomes dos PDFs (padrão: *.pdf)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processos para extrair as páginas em paralelo; 0 usa todos os núcleos (padrão: 1)")
+    parser.add_argument("-b", "--backend", default=BACKEND_PADRAO, choices=list(BACKENDS), help=f"Biblioteca de extração (padrão: {BACKEND_PADRAO})")
+    parser.add_argument("--ocr", action="store_true", help="Lê por OCR (Tesseract, português) as páginas escaneadas")
+    parser.add_argument("--ocr-dpi", type=int, default=300, help="Resolução da rasterização para o OCR (padrão: 300)")
+    parser.add_argument("--ocr-cache", help="Diretório para guardar o texto OCR por página entre execuções")
+    parser.add_argument("-f", "--formato", default="xlsx", choices=FORMATOS, help="Formato dos relatórios (padrão: xlsx)")
+    parser.add_argument("--arquivo-unico", action="store_true", help="Consolidado e detalhe no mesmo arquivo (abas do xlsx ou .zip)")
+    parser.add_argument("--perfil", action="store_true", help="Grava <pdf>_perfil.json com o tempo de cada etapa e as páginas mais lentas")
+    parser.add_argument("--cprofile", action="store_true", help="Perfila a execução com cProfile e grava <pdf>.prof (implica --perfil)")
+    parser.add_argument("--relatorio", default=ESCOPO_AMBOS, choices=ESCOPOS, help=f"Relatórios gerados; Consolidado lê só cabeçalho e TOTAIS, sem regras diárias (padrão: {ESCOPO_AMBOS})")
+    parser.add_argument("--validacao-manual", action="store_true", help="Não aplica as regras às linhas diárias (detalhe com os horários do PDF, para conferência)")
+    parser.add_argument("--tempo-max-pagina", type=float, help="Segundos por página; páginas mais lentas são refeitas em modos mais baratos (processo isolado)")
+    parser.add_argument("--mesclar", action="store_true", help="Grava também um relatório único juntando todos os PDFs (cpf somado entre arquivos, coluna arquivo_origem)")
+    parser.add_argument("--cache-paginas", help="Diretório com o resultado por página entre execuções: PDFs reenviados só têm as páginas alteradas reextraídas")
+    parser.add_argument("--historico", help="Banco SQLite do histórico onde gravar cada relatório (mês deduzido das datas; com --mesclar, só o mesclado)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.entrada).is_dir():
+        parser.error(f"diretório não encontrado: {args.entrada}")
+
+    ocr = None
+    if args.ocr:
+        from .cache import CacheResultados
+        from .ocr import OpcoesOCR
+
+        cache_ocr = CacheResultados(max_itens=4096, diretorio=args.ocr_cache) if args.ocr_cache else None
+        ocr = OpcoesOCR(dpi=args.ocr_dpi, workers=args.workers, cache=cache_ocr)
+
+    paginas_conhecidas = None
+    if args.cache_paginas:
+        from .cache import CacheResultados, PaginasConhecidas
+
+        paginas_conhecidas = PaginasConhecidas(
+            CacheResultados(max_itens=4096, diretorio=args.cache_paginas),
+            args.fornecedor, args.backend, escopo=args.relatorio,
+        )
+
+    historico = None
+    if args.historico:
+        from .historico import HistoricoRelatorios
+
+        historico = HistoricoRelatorios(args.historico)
+
+    falhas = processar_diretorio(
+        args.entrada, args.saida, args.padrao, args.workers, args.backend, ocr,
+        formato=args.formato, arquivo_unico=args.arquivo_unico,
+        perfil=args.perfil, cprofile=args.cprofile, historico=historico, fornecedor=args.fornecedor,
+        mesclar=args.mesclar, paginas_conhecidas=paginas_conhecidas,
+        escopo=args.relatorio, validar=not args.validacao_manual, tempo_max_pagina=args.tempo_max_pagina,
+    )
+    if falhas:
+        print(f"{len(falhas)} arquivo(s) com erro: " + ", ".join(f.name for f in falhas), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# =========================
+# Funções auxiliares compartilhadas entre o app Streamlit e o motor de processamento
+# =========================
+import re
+from difflib import SequenceMatcher
+
+
+def normalizar_nome_coluna(nome):
+    if not nome:
+        return None
+    nome = nome.upper()
+    if "TRAB" in nome:
+        return "total_trabalhado"
+    if "NOTURNO" in nome:
+        return "total_noturno"
+    if "PREVIST" in nome:
+        return "horas_previstas"
+    if "FALTA" in nome:
+        return "faltas"
+    if "ATRASO" in nome:
+        return "horas_atraso"
+    if "EXTRA" in nome:
+        return "extra_50"
+    if "DSR" in nome:
+        return "desconta_dsr"
+    return None
+
+def padronizar_tempo(valor):
+    if not valor:
+        return "00:00"
+    if isinstance(valor, (int, float)):
+        return "00:00"
+    if re.match(r"^\d{1,3}:\d{2}$", str(valor).strip()):
+        return str(valor).strip()
+    return "00:00"
+
+def limpar_texto(texto):
+    if texto is None:
+        return ""
+    texto = str(texto).upper()
+    texto = re.sub(r'[^A-Z0-9 ÁÀÂÃÉÊÍÓÔÕÚÇ]', ' ', texto)
+    texto = re.sub(r'\s+', ' ', texto)
+    return texto.strip()
+
+def achar_tema_mais_proximo(linha, lista_temas, limiar=0.6):
+    linha = limpar_texto(linha)
+    melhor_tema = None
+    melhor_ratio = 0
+    for tema in lista_temas:
+        ratio = SequenceMatcher(None, linha, limpar_texto(tema)).ratio()
+        if ratio > melhor_ratio:
+            melhor_ratio = ratio
+            melhor_tema = tema
+    if melhor_ratio >= limiar:
+        return melhor_tema
+    return None
+
+def hora_para_minutos(hora):
+    if not hora or str(hora).strip() == "":
+        return 0
+    try:
+        partes = re.findall(r"\d{1,3}:\d{2}", str(hora))
+        if partes:
+            h, m = map(int, partes[0].split(":"))
+            return h*60 + m
+        h_m = re.findall(r"(\d+)", str(hora))
+        if len(h_m) >= 2:
+            h, m = int(h_m[0]), int(h_m[1])
+            return h*60 + m
+        return 0
+    except:
+        return 0
+
+def limpa_valor(v):
+    return str(v or "").strip()
+
+def eh_horario(valor):
+    if not isinstance(valor, str):
+        valor = str(valor or "")
+    if ":" not in valor:
+        return False
+    partes = valor.split(":")
+    if len(partes) != 2:
+        return False
+    h, m = partes
+    if not (h.isdigit() and m.isdigit()):
+        return False
+    h, m = int(h), int(m)
+    return 0 <= h < 24 and 0 <= m < 60
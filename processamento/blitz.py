@@ -0,0 +1,621 @@
+# =========================
+# Motor de processamento dos PDFs de ponto da Blitz
+# =========================
+# Toda a lógica que antes ficava dentro de `with tab1:` no Fornecedores.py.
+# O app Streamlit e a linha de comando (python -m processamento) chamam
+# as mesmas funções, então os dois caminhos geram relatórios idênticos.
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .auxiliares import (
+    normalizar_nome_coluna,
+    padronizar_tempo,
+)
+from .configuracoes import ESCOPO_AMBOS, ESCOPO_CONSOLIDADO, ESCOPO_DETALHADO
+from .esquema import tipar
+from .extracao import (
+    BACKEND_PADRAO,
+    MODO_COMPLETO,
+    PAGINA_COM_FALHA,
+    PAGINA_PONTO,
+    abrir_documento,
+    abrir_extrator,
+    hashes_paginas,
+    preparar_fonte,
+)
+from .isolamento import extrair_paginas_isoladas
+from .perfil import LimiteMemoria, etapa
+from .regras import calcular_situacao, primeira_marcacao
+from .tempos import adicionar_colunas_tempo, colunas_auxiliares
+from .temas import obter_matcher
+from .texto_pagina import ler_texto_pagina
+
+LISTA_TEMAS_MESTRA = [
+    "AJUSTE DE HORAS"
+]
+
+COLUNAS_REMOVER = [
+    "AJUSTE DE HORAS"
+]
+
+# Colunas de cada linha diária (extrair_detalhe); um PDF sem linhas diárias (só
+# páginas lidas por OCR, que dão apenas o cabeçalho) gera o detalhe vazio com elas
+COLUNAS_DETALHE = [
+    "pagina", "nome", "cpf", "data", "semana", "previsto",
+    "ent_1", "sai_1", "ent_2", "sai_2", "total_trabalhado", "total_noturno",
+    "horas_previstas", "faltas", "horas_atraso", "extra_50", "desconta_dsr",
+]
+
+# Intervalos de páginas por processo no modo paralelo
+PARTES_POR_WORKER = 4
+# Páginas por bloco quando a extração roda num processo só (orçamento de memória com workers=1)
+PAGINAS_POR_BLOCO = 25
+
+# Triagem: sinais no texto de que a página tem a tabela de ponto
+MARCADORES_PAGINA_PONTO = ("NOME DO FUNCION", "TOTAIS")
+_LINHA_DIARIA = re.compile(r"\d{2}/\d{2}/\d{4} - ")
+
+# Falhas de leitura do cabeçalho ({campo: motivo}) que a página devolve junto do
+# funcionário; extrair_pdf as separa em ResultadoExtracao.falhas_campos
+CHAVE_FALHAS_CAMPOS = "falhas_campos"
+
+
+# =========================
+# Extração por página
+# =========================
+def novo_funcionario(numero_pagina, lista_temas):
+    funcionario = {
+        "pagina": numero_pagina,
+        "nome": None,
+        "cpf": None,
+        "matricula": None,
+        "cargo": None,
+        "centro_custo": None,
+        "total_trabalhado": "00:00",
+        "total_noturno": "00:00",
+        "horas_previstas": "00:00",
+        "faltas": 0,
+        "horas_atraso": "00:00",
+        "extra_50": "00:00",
+        "desconta_dsr": 0,
+        "status": None,
+    }
+    for tema in lista_temas:
+        funcionario[tema] = 0
+    return funcionario
+
+
+def extrair_cabecalho(leitura, funcionario):
+    """Copia para o funcionário os campos do cabeçalho lidos (texto_pagina.ler_texto_pagina) e as falhas deles."""
+    funcionario.update(leitura.campos)
+    funcionario[CHAVE_FALHAS_CAMPOS] = leitura.falhas
+
+
+def extrair_totais(tabela, funcionario):
+    if not tabela:
+        return
+    cabecalho = tabela[0]
+    for linha_tabela in tabela:
+        if linha_tabela and linha_tabela[0] and "TOTAIS" in str(linha_tabela[0]).upper():
+            for titulo, valor in zip(cabecalho, linha_tabela):
+                chave = normalizar_nome_coluna(titulo)
+                if chave:
+                    if chave in ["faltas", "desconta_dsr"]:
+                        funcionario[chave] = int(valor) if valor and str(valor).isdigit() else 0
+                    else:
+                        funcionario[chave] = padronizar_tempo(valor)
+    if funcionario.get("extra_50") == funcionario.get("horas_previstas"):
+        funcionario["extra_50"] = "00:00"
+
+
+def contar_justificativas(justificativas, funcionario, lista_temas):
+    matcher = obter_matcher(lista_temas)
+    for linha in justificativas:
+        tema_encontrado = matcher(linha)
+        if tema_encontrado:
+            funcionario[tema_encontrado] += 1
+
+
+def extrair_detalhe(tabela, funcionario, numero_pagina):
+    detalhes = []
+    if not tabela:
+        return detalhes
+    for linha_detalhe in tabela[1:]:
+        linha_detalhe = [celula for celula in linha_detalhe if celula not in [None, '']]
+        if not linha_detalhe or (isinstance(linha_detalhe[0], str) and linha_detalhe[0].upper() == "TOTAIS"):
+            continue
+        data_split = linha_detalhe[0].split(" - ")
+        data = data_split[0].strip()
+        semana = data_split[1].strip() if len(data_split) > 1 else ""
+        registro = {
+            "pagina": numero_pagina,
+            "nome": funcionario["nome"],
+            "cpf": funcionario["cpf"],
+            "data": data,
+            "semana": semana,
+            "previsto": linha_detalhe[1] if len(linha_detalhe) > 1 else "",
+            "ent_1": linha_detalhe[2] if len(linha_detalhe) > 2 else "",
+            "sai_1": linha_detalhe[3] if len(linha_detalhe) > 3 else "",
+            "ent_2": linha_detalhe[4] if len(linha_detalhe) > 4 else "",
+            "sai_2": linha_detalhe[5] if len(linha_detalhe) > 5 else "",
+            "total_trabalhado": linha_detalhe[6] if len(linha_detalhe) > 6 else "",
+            "total_noturno": linha_detalhe[7] if len(linha_detalhe) > 7 else "",
+            "horas_previstas": linha_detalhe[8] if len(linha_detalhe) > 8 else "",
+            "faltas": linha_detalhe[9] if len(linha_detalhe) > 9 else "",
+            "horas_atraso": linha_detalhe[10] if len(linha_detalhe) > 10 else "",
+            "extra_50": linha_detalhe[11] if len(linha_detalhe) > 11 else "",
+            "desconta_dsr": linha_detalhe[12] if len(linha_detalhe) > 12 else "",
+        }
+        detalhes.append(registro)
+    return detalhes
+
+
+def pagina_relevante(texto):
+    """Triagem pelo texto: a página tem cabeçalho de funcionário, TOTAIS ou linhas diárias?
+
+    Páginas reprovadas (capa, assinaturas, resumo) não passam pela extração da tabela.
+    """
+    if not texto:
+        return False
+    texto_maiusculo = texto.upper()
+    return any(marcador in texto_maiusculo for marcador in MARCADORES_PAGINA_PONTO) or bool(_LINHA_DIARIA.search(texto))
+
+
+def definir_status(funcionario):
+    if funcionario["faltas"] > 0 or funcionario["desconta_dsr"] > 0:
+        funcionario["status"] = "NOK"
+    else:
+        funcionario["status"] = "OK"
+
+
+def processar_pagina(texto, tabela, numero_pagina, lista_temas):
+    """Devolve (funcionario, registros_diarios) da página, ou None se ela estiver vazia."""
+    if not texto and not tabela:
+        return None
+    # Cabeçalho e justificativas numa leitura só do texto
+    leitura = ler_texto_pagina(texto)
+
+    funcionario = novo_funcionario(numero_pagina, lista_temas)
+
+    # Cabeçalho por página
+    extrair_cabecalho(leitura, funcionario)
+
+    # Totais tabela
+    extrair_totais(tabela, funcionario)
+
+    # Alterações / justificativas
+    contar_justificativas(leitura.justificativas, funcionario, lista_temas)
+
+    # Status OK/NOK
+    definir_status(funcionario)
+
+    # Detalhe diário
+    return funcionario, extrair_detalhe(tabela, funcionario, numero_pagina)
+
+
+def processar_pagina_consolidado(texto, tabela, numero_pagina, lista_temas):
+    """Caminho rápido do relatório Consolidado: só cabeçalho, linha TOTAIS e status (sem registros diários).
+
+    Lê só o cabeçalho e a linha TOTAIS da tabela: a extração no modo
+    extracao.MODO_TOTAIS entrega só essas duas linhas.
+    """
+    if not texto and not tabela:
+        return None
+    funcionario = novo_funcionario(numero_pagina, lista_temas)
+    extrair_cabecalho(ler_texto_pagina(texto, justificativas=False), funcionario)
+    extrair_totais(tabela, funcionario)
+    definir_status(funcionario)
+    return funcionario, []
+
+
+@dataclass
+class ResultadoExtracao:
+    """Registros extraídos do PDF e informações da execução por página."""
+    dados_funcionarios: list
+    detalhes: list
+    total_paginas: int = 0
+    # Páginas (1-based) sem texto nem tabela, que ficaram fora do relatório
+    paginas_vazias: list = field(default_factory=list)
+    # Páginas escaneadas lidas por OCR
+    paginas_ocr: list = field(default_factory=list)
+    # Tempo de extração de cada página: {numero_pagina: segundos}
+    tempos_paginas: dict = field(default_factory=dict)
+    # Hash do conteúdo de cada página: {numero_pagina: hash} (só com paginas_conhecidas)
+    hashes_paginas: dict = field(default_factory=dict)
+    # Páginas iguais às de uma versão já processada, que não foram reextraídas
+    paginas_reaproveitadas: list = field(default_factory=list)
+    # Classe de cada página na triagem: {numero_pagina: "ponto" | "sem_ponto" | "sem_texto"}
+    classificacao_paginas: dict = field(default_factory=dict)
+    # Páginas em que a triagem dispensou a extração da tabela
+    paginas_sem_tabela: list = field(default_factory=list)
+    # Páginas que estouraram o tempo em todos os modos de extração (fora do relatório)
+    paginas_com_falha: list = field(default_factory=list)
+    # Páginas que só saíram num modo mais barato: {numero_pagina: modo} (ver isolamento.py)
+    paginas_degradadas: dict = field(default_factory=dict)
+    # Campos do cabeçalho não lidos nas páginas de ponto: {numero_pagina: {campo: motivo}} (ver texto_pagina.py)
+    falhas_campos: dict = field(default_factory=dict)
+
+
+def extrair_intervalos(arquivo, lista_temas, intervalos, backend=BACKEND_PADRAO, processar=processar_pagina,
+                       progresso=None, memoria_max_mb=None, triagem=None, modo=MODO_COMPLETO):
+    """Extrai as páginas dos intervalos [inicio, fim) do PDF, abrindo o arquivo uma vez.
+
+    Devolve uma lista de (numero_pagina, resultado, segundos, classe), em que resultado
+    é (funcionario, registros) ou None para páginas sem texto nem tabela, e classe
+    vem da triagem (extracao.PAGINA_PONTO, PAGINA_SEM_PONTO ou PAGINA_SEM_TEXTO).
+    `processar` é o parser de página do fornecedor (padrão: Blitz).
+    `triagem(texto) -> bool` dispensa a extração da tabela das páginas reprovadas.
+    `modo` é o modo de extração das páginas (extracao.extrair_pagina_modo).
+    `progresso(paginas_feitas, total_paginas)` é chamado a cada página.
+    `memoria_max_mb` interrompe com MemoriaExcedida se a memória do processo crescer
+    além disso (só em processos que atendem um arquivo, ver _extrair_paginas).
+    """
+    resultados = []
+    limite = LimiteMemoria(memoria_max_mb)
+    with abrir_extrator(arquivo, backend) as extrator:
+        total = sum(len(range(*slice(inicio, fim).indices(extrator.total_paginas))) for inicio, fim in intervalos)
+        inicio_pagina = time.perf_counter()
+        for inicio, fim in intervalos:
+            for i, texto, tabela in extrator.paginas(inicio, fim, triagem, modo):
+                resultado = processar(texto, tabela, i + 1, lista_temas)
+                agora = time.perf_counter()
+                resultados.append((i + 1, resultado, agora - inicio_pagina, extrator.classificar(i + 1, texto)))
+                inicio_pagina = agora
+                limite.verificar(extrator.liberar)
+                if progresso is not None:
+                    progresso(len(resultados), total)
+    return resultados
+
+
+def _extrair_intervalos_processo(fonte, lista_temas, intervalos, backend, processar, memoria_max_mb, triagem, modo):
+    # Executado no processo filho: cada worker abre o PDF por conta própria
+    return extrair_intervalos(
+        fonte, lista_temas, intervalos, backend, processar, memoria_max_mb=memoria_max_mb, triagem=triagem, modo=modo
+    )
+
+
+def intervalos_contiguos(indices):
+    """Agrupa índices de página (em ordem crescente) em intervalos contíguos [inicio, fim)."""
+    intervalos = []
+    for indice in indices:
+        if intervalos and intervalos[-1][1] == indice:
+            intervalos[-1] = (intervalos[-1][0], indice + 1)
+        else:
+            intervalos.append((indice, indice + 1))
+    return intervalos
+
+
+def dividir_paginas(total_paginas, partes):
+    """Divide range(total_paginas) em até `partes` intervalos contíguos (inicio, fim)."""
+    partes = max(1, min(partes, total_paginas))
+    tamanho, resto = divmod(total_paginas, partes)
+    intervalos = []
+    inicio = 0
+    for n in range(partes):
+        fim = inicio + tamanho + (1 if n < resto else 0)
+        intervalos.append((inicio, fim))
+        inicio = fim
+    return intervalos
+
+
+def resolver_workers(workers):
+    """0 ou None usam todos os núcleos disponíveis."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def _extrair_paginas(fonte, lista_temas, indices, workers, backend, processar, progresso=None, memoria_max_mb=None,
+                     triagem=None, modo=MODO_COMPLETO):
+    """Extrai as páginas de `indices` (0-based, em ordem), em série ou divididas entre processos.
+
+    Com `memoria_max_mb` a extração roda em processos só deste arquivo, mesmo com
+    workers=1: o orçamento é dividido entre eles e cada um mede a própria
+    memória, sem contar outras sessões do servidor.
+    """
+    if workers <= 1 and not memoria_max_mb:
+        return extrair_intervalos(
+            fonte, lista_temas, intervalos_contiguos(indices), backend, processar, progresso, triagem=triagem, modo=modo
+        )
+
+    # Mais blocos que workers para equilibrar páginas lentas entre os processos;
+    # com um processo só, blocos menores para o progresso avançar
+    partes = workers * PARTES_POR_WORKER if workers > 1 else -(-len(indices) // PAGINAS_POR_BLOCO)
+    blocos = [
+        intervalos_contiguos(indices[inicio:fim])
+        for inicio, fim in dividir_paginas(len(indices), partes)
+        if fim > inicio
+    ]
+    if not blocos:
+        return []
+    if len(blocos) == 1 and not memoria_max_mb:
+        return extrair_intervalos(
+            fonte, lista_temas, intervalos_contiguos(indices), backend, processar, progresso, triagem=triagem, modo=modo
+        )
+
+    processos = min(workers, len(blocos))
+    memoria_processo = memoria_max_mb / processos if memoria_max_mb else None
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(
+                _extrair_intervalos_processo, fonte, lista_temas, bloco, backend, processar, memoria_processo, triagem,
+                modo,
+            ): n
+            for n, bloco in enumerate(blocos)
+        }
+        # O progresso avança a cada bloco concluído (a callback não vai aos processos filhos)
+        resultados = [None] * len(blocos)
+        feitas = 0
+        for futuro in as_completed(futuros):
+            bloco = futuro.result()
+            resultados[futuros[futuro]] = bloco
+            feitas += len(bloco)
+            if progresso is not None:
+                progresso(feitas, len(indices))
+        # Remontados na ordem dos blocos, então a ordem das páginas é mantida
+        return [resultado for bloco in resultados for resultado in bloco]
+
+
+def extrair_pdf(arquivo, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None, perfil=None,
+                processar=processar_pagina, progresso=None, paginas_conhecidas=None, memoria_max_mb=None,
+                triagem=pagina_relevante, tempo_max_pagina=None, modo=MODO_COMPLETO):
+    """Percorre o PDF (caminho ou arquivo em memória) e devolve um ResultadoExtracao.
+
+    Com workers > 1 as páginas são divididas entre processos; o resultado é idêntico ao serial.
+    `backend` escolhe a biblioteca de extração ("pdfplumber" ou "pymupdf").
+    `ocr` (OpcoesOCR) ativa a leitura por OCR das páginas escaneadas.
+    `perfil` (Perfil) recebe o tempo das etapas e as páginas mais lentas.
+    `processar` é o parser de página do fornecedor (ver processamento/fornecedores.py);
+    precisa ser uma função de módulo para poder ir aos processos filhos.
+    `progresso(paginas_feitas, total_paginas)` acompanha a leitura das páginas.
+    `paginas_conhecidas` (cache.PaginasConhecidas) guarda o resultado de cada página
+    pelo hash do conteúdo: páginas iguais às de uma versão anterior não são reextraídas.
+    `memoria_max_mb` é o orçamento de memória da extração deste arquivo, medido nos
+    processos da extração (que só atendem este arquivo) e dividido entre eles.
+    `triagem(texto) -> bool` decide pelo texto se vale extrair a tabela da página
+    (padrão: pagina_relevante da Blitz; None extrai a tabela de todas).
+    `tempo_max_pagina` (segundos) extrai cada página num processo isolado com esse
+    prazo, tentando de novo em modos mais baratos (processamento/isolamento.py).
+    `modo` é o modo de extração das páginas (extracao.extrair_pagina_modo); o
+    relatório Consolidado usa extracao.MODO_TOTAIS, só cabeçalho e linha TOTAIS.
+    Para PDFs grandes, passe um caminho: cada worker abre o arquivo em vez de receber uma cópia dos bytes.
+    """
+    lista_temas = LISTA_TEMAS_MESTRA if lista_temas is None else lista_temas
+    workers = resolver_workers(workers)
+    # Caminho ou bytes (upload do Streamlit): os dois podem ir para os workers
+    fonte = preparar_fonte(arquivo)
+
+    hashes = {}
+    reaproveitadas = {}
+    if paginas_conhecidas is not None:
+        hashes = hashes_paginas(fonte)
+        reaproveitadas = paginas_conhecidas.buscar(hashes)
+        total_paginas = len(hashes)
+    else:
+        with abrir_documento(fonte) as documento:
+            total_paginas = documento.page_count
+    indices = [numero - 1 for numero in range(1, total_paginas + 1) if numero not in reaproveitadas]
+
+    progresso_extracao = progresso
+    if progresso is not None and reaproveitadas:
+        progresso(len(reaproveitadas), total_paginas)
+        progresso_extracao = lambda feitas, _: progresso(len(reaproveitadas) + feitas, total_paginas)
+
+    degradadas = {}
+    with etapa(perfil, "extracao", backend=backend, workers=workers) as registro:
+        if tempo_max_pagina:
+            extraidas, degradadas = extrair_paginas_isoladas(
+                fonte, lista_temas, indices, workers, backend, processar, tempo_max_pagina,
+                progresso_extracao, memoria_max_mb, triagem, modo
+            )
+            registro["tempo_max_pagina"] = tempo_max_pagina
+            registro["degradadas"] = len(degradadas)
+        else:
+            extraidas = _extrair_paginas(
+                fonte, lista_temas, indices, workers, backend, processar, progresso_extracao, memoria_max_mb, triagem,
+                modo,
+            )
+        registro["paginas"] = len(extraidas)
+        registro["sem_tabela"] = sum(1 for *_, classe in extraidas if classe not in (PAGINA_PONTO, PAGINA_COM_FALHA))
+        registro["falhas"] = sum(1 for *_, classe in extraidas if classe == PAGINA_COM_FALHA)
+        if paginas_conhecidas is not None:
+            registro["reaproveitadas"] = len(reaproveitadas)
+    tempos_paginas = {numero: segundos for numero, _, segundos, _ in extraidas}
+    if perfil is not None:
+        perfil.registrar_paginas(tempos_paginas)
+    if paginas_conhecidas is not None:
+        # Páginas com falha ou lidas num modo mais barato ficam de fora: numa próxima vez são tentadas de novo
+        paginas_conhecidas.guardar({
+            numero: (hashes[numero], resultado, classe) for numero, resultado, _, classe in extraidas
+            if classe != PAGINA_COM_FALHA and numero not in degradadas
+        })
+
+    paginas = sorted(
+        extraidas + [(numero, resultado, 0.0, classe) for numero, (resultado, classe) in reaproveitadas.items()],
+        key=lambda pagina: pagina[0],
+    )
+    classificacao = {numero: classe for numero, _, _, classe in paginas}
+    if perfil is not None:
+        perfil.registrar_classificacao(classificacao)
+
+    paginas_com_falha = [numero for numero, _, _, classe in paginas if classe == PAGINA_COM_FALHA]
+    paginas_vazias = [
+        numero for numero, resultado, _, classe in paginas if resultado is None and classe != PAGINA_COM_FALHA
+    ]
+    paginas_ocr = []
+    if ocr is not None and paginas_vazias:
+        from .ocr import ler_paginas_escaneadas
+
+        with etapa(perfil, "ocr", paginas=len(paginas_vazias), dpi=ocr.dpi):
+            textos = ler_paginas_escaneadas(fonte, paginas_vazias, ocr)
+            lidas = {}
+            for numero, texto in textos.items():
+                resultado = processar(texto, None, numero, lista_temas)
+                if resultado is not None:
+                    lidas[numero] = resultado
+        paginas = [(numero, lidas.get(numero, resultado), segundos, classe) for numero, resultado, segundos, classe in paginas]
+        paginas_ocr = sorted(lidas)
+        paginas_vazias = [numero for numero in paginas_vazias if numero not in lidas]
+
+    dados_funcionarios = []
+    detalhes = []
+    falhas_campos = {}
+    for numero, resultado, _, classe in paginas:
+        if resultado is None:
+            continue
+        funcionario, registros = resultado
+        if CHAVE_FALHAS_CAMPOS in funcionario:
+            # As falhas não viram coluna do consolidado; capa, resumo e afins não têm cabeçalho a cobrar
+            funcionario = dict(funcionario)
+            falhas = funcionario.pop(CHAVE_FALHAS_CAMPOS)
+            if falhas and classe == PAGINA_PONTO:
+                falhas_campos[numero] = falhas
+        dados_funcionarios.append(funcionario)
+        detalhes.extend(registros)
+
+    return ResultadoExtracao(
+        dados_funcionarios=dados_funcionarios,
+        detalhes=detalhes,
+        total_paginas=len(paginas),
+        paginas_vazias=paginas_vazias,
+        paginas_ocr=paginas_ocr,
+        tempos_paginas=tempos_paginas,
+        hashes_paginas=hashes,
+        paginas_reaproveitadas=sorted(reaproveitadas),
+        classificacao_paginas=classificacao,
+        paginas_sem_tabela=sorted(
+            numero for numero, classe in classificacao.items() if classe not in (PAGINA_PONTO, PAGINA_COM_FALHA)
+        ),
+        paginas_com_falha=paginas_com_falha,
+        paginas_degradadas=degradadas,
+        falhas_campos=falhas_campos,
+    )
+
+
+def extrair_registros(arquivo, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None):
+    """Atalho para extrair_pdf que devolve só (dados_funcionarios, detalhes)."""
+    extracao = extrair_pdf(arquivo, lista_temas, workers, backend, ocr)
+    return extracao.dados_funcionarios, extracao.detalhes
+
+
+# =========================
+# Validações e regras do df_detalhe
+# =========================
+def aplicar_regras_detalhe(df_detalhe):
+    # Horários convertidos uma única vez (colunas <campo>_txt/_min/_valido)
+    adicionar_colunas_tempo(df_detalhe)
+
+    total_minutos = (
+        df_detalhe["sai_1_min"] - df_detalhe["ent_1_min"] +
+        df_detalhe["sai_2_min"] - df_detalhe["ent_2_min"]
+    )
+    previsto_minutos = df_detalhe["horas_previstas_min"]
+    df_detalhe["Validação da hora trabalhada"] = np.select(
+        [total_minutos > previsto_minutos, total_minutos == previsto_minutos],
+        ["Carga Horaria Completa - Fez Hora Extra", "Carga Horaria Completa"],
+        default="Carga Horaria Incompleta",
+    )
+
+    # Situação: tabela de regras em processamento/regras.py, avaliada de uma vez
+    df_detalhe["Situação"] = calcular_situacao(df_detalhe)
+    df_detalhe["correção"] = primeira_marcacao(df_detalhe)
+
+    df_detalhe.drop(columns=colunas_auxiliares(), inplace=True)
+    return df_detalhe
+
+
+# =========================
+# Montagem dos relatórios
+# =========================
+def contar_situacoes(df_detalhe):
+    """Conta as Situações por cpf em uma única passada.
+
+    Devolve o df_detalhe com as colunas "Qtd - <situação>" (contagem do cpf
+    repetida em cada linha dele) e a tabela df_situacoes (uma linha por cpf)
+    que vai para o consolidado.
+    """
+    # Uma tabela cpf x situação; linhas sem cpf ficam de fora. É a mesma expressão
+    # do df_situacoes original, então as colunas do consolidado saem na mesma ordem
+    contagem = df_detalhe.groupby("cpf")["Situação"].value_counts().unstack(fill_value=0)
+
+    # Colunas Qtd na ordem em que as situações aparecem no detalhe. Situação que
+    # só aparece em linhas sem cpf não está no crosstab: a coluna sai com 0 para
+    # os cpfs e NaN (pelo join) nas linhas sem cpf, como no groupby/transform
+    qtd = contagem.reindex(columns=df_detalhe["Situação"].unique(), fill_value=0)
+    qtd.columns = [f"Qtd - {sit}" for sit in qtd.columns]
+    df_detalhe = df_detalhe.join(qtd, on="cpf")
+
+    return df_detalhe, contagem.reset_index()
+
+
+def montar_relatorios(dados_funcionarios, detalhes, lista_temas=None, perfil=None, escopo=ESCOPO_AMBOS, validar=True):
+    """Aplica as regras e devolve (df_consolidado_final, df_detalhe), já tipados (esquema.tipar).
+
+    `escopo` (configuracoes.ESCOPOS) escolhe os relatórios montados; o que fica
+    de fora volta None. Com `validar=False` as regras das linhas diárias não são
+    aplicadas (o consolidado fica sem as colunas Qtd).
+    """
+    lista_temas = LISTA_TEMAS_MESTRA if lista_temas is None else lista_temas
+    df_consolidado = df_detalhe = None
+
+    with etapa(perfil, "regras", linhas=len(detalhes), escopo=escopo, validar=validar):
+        if escopo != ESCOPO_DETALHADO:
+            df = pd.DataFrame(dados_funcionarios).fillna(0)
+            colunas_justificativas = lista_temas
+            try:
+                df_consolidado = df.drop(columns=colunas_justificativas)
+            except Exception:
+                df_consolidado = df.copy()
+            df_consolidado = tipar(df_consolidado)
+
+        if escopo != ESCOPO_CONSOLIDADO:
+            df_detalhe = tipar(pd.DataFrame(detalhes) if detalhes else pd.DataFrame(columns=COLUNAS_DETALHE))
+            if validar:
+                df_detalhe = aplicar_regras_detalhe(df_detalhe)
+
+    return finalizar_relatorios(df_consolidado, df_detalhe, perfil)
+
+
+def finalizar_relatorios(df_consolidado, df_detalhe, perfil=None):
+    """Contagem de Situações (colunas Qtd no detalhe e no consolidado) e limpeza final do consolidado.
+
+    Recebe o consolidado e o detalhe já com as regras, sem contagens (um dos
+    dois pode ser None). Usado por montar_relatorios e pela mesclagem.
+    """
+    if df_detalhe is not None and "Situação" in df_detalhe.columns:
+        funcionarios = len(df_consolidado) if df_consolidado is not None else None
+        with etapa(perfil, "situacoes", linhas=len(df_detalhe), funcionarios=funcionarios):
+            df_detalhe, df_situacoes = contar_situacoes(df_detalhe)
+
+            # Faz o merge primeiro!
+            if df_consolidado is not None:
+                df_consolidado = pd.merge(df_consolidado, df_situacoes, on="cpf", how="outer")
+
+    if df_detalhe is not None:
+        # Colunas das regras (Situação, correção...) e contagens também ficam tipadas
+        df_detalhe = tipar(df_detalhe)
+    if df_consolidado is None:
+        return None, df_detalhe
+
+    # Consolidado final (DEPOIS do merge)
+    df_consolidado_final = df_consolidado.drop(
+        columns=[
+            col for col in COLUNAS_REMOVER
+            if col in df_consolidado.columns and not col.startswith("Qtd -")
+        ],
+        errors="ignore"
+    )
+
+    return tipar(df_consolidado_final), df_detalhe
+
+
+def parse_blitz_pdf(path, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None, perfil=None):
+    """Processa um PDF da Blitz (caminho ou arquivo em memória) e devolve (consolidado, detalhe)."""
+    extracao = extrair_pdf(path, lista_temas, workers, backend, ocr, perfil)
+    return montar_relatorios(extracao.dados_funcionarios, extracao.detalhes, lista_temas, perfil)
@@ -0,0 +1,295 @@
+# =========================
+# Cache de resultados por conteúdo do PDF
+# =========================
+# Cada rerun do Streamlit (trocar opção na sidebar, mudar de aba, clicar em
+# download) executaria o processamento inteiro de novo. Aqui os resultados ficam
+# guardados pela SHA-256 dos bytes do PDF + versão do parser, em dois níveis:
+# memória (LRU) e, opcionalmente, disco (com limite de tamanho).
+#
+# Um segundo nível, por página (PaginasConhecidas), guarda o resultado de cada
+# página pelo hash do conteúdo: quando o fornecedor reenvia o PDF do mês com
+# algumas páginas corrigidas, só essas páginas são lidas de novo.
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .configuracoes import ESCOPO_AMBOS
+from .extracao import BACKEND_PADRAO, atualizar_hash
+from .fornecedores import FORNECEDOR_PADRAO, obter_parser
+from .perfil import etapa, execucao
+
+# Aumente sempre que uma mudança no parser, nas regras ou no formato guardado
+# alterar o resultado, para que entradas antigas do cache deixem de ser usadas.
+VERSAO_PARSER = "6"
+
+
+def chave_cache(dados, lista_temas=None, backend=BACKEND_PADRAO, ocr=None, versao=VERSAO_PARSER,
+                fornecedor=FORNECEDOR_PADRAO, escopo=ESCOPO_AMBOS, validar=True):
+    """SHA-256 do PDF (bytes ou caminho) + fornecedor + versão do parser + opções de extração e dos relatórios + temas de justificativa."""
+    lista_temas = obter_parser(fornecedor).temas(lista_temas)
+    opcoes_ocr = f"{ocr.dpi}/{ocr.idioma}" if ocr is not None else "-"
+    h = atualizar_hash(hashlib.sha256(), dados)
+    h.update(
+        f"|fornecedor={fornecedor}|parser={versao}|backend={backend}|ocr={opcoes_ocr}|temas={'|'.join(lista_temas)}"
+        f"|escopo={escopo}|validar={validar}".encode("utf-8")
+    )
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """Cache LRU em memória com um nível opcional em disco.
+
+    Os valores devolvidos são os próprios objetos guardados: não os altere.
+    """
+
+    # Ao passar do limite, o disco é limpo em lote até esta fração dele
+    FRACAO_APOS_LIMPEZA = 0.8
+
+    def __init__(self, max_itens=8, diretorio=None, limite_disco_mb=512):
+        self.max_itens = max_itens
+        self.diretorio = Path(diretorio) if diretorio else None
+        self.limite_disco = int(limite_disco_mb * 1024 * 1024)
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        # Bytes em disco, somados a cada put; None até a primeira varredura do diretório
+        self._tamanho_disco = None
+        if self.diretorio:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    # ---------- memória ----------
+    def _get_memoria(self, chave):
+        with self._lock:
+            if chave not in self._memoria:
+                return None
+            self._memoria.move_to_end(chave)
+            return self._memoria[chave]
+
+    def _put_memoria(self, chave, valor):
+        with self._lock:
+            self._memoria[chave] = valor
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.max_itens:
+                self._memoria.popitem(last=False)
+
+    # ---------- disco ----------
+    def _arquivo(self, chave):
+        return self.diretorio / f"{chave}.pkl"
+
+    def _get_disco(self, chave):
+        if not self.diretorio:
+            return None
+        arquivo = self._arquivo(chave)
+        try:
+            with open(arquivo, "rb") as f:
+                valor = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # Atualiza o mtime: a remoção por excesso de tamanho descarta os menos usados
+        try:
+            os.utime(arquivo)
+        except OSError:
+            pass
+        return valor
+
+    def _put_disco(self, chave, valor):
+        if not self.diretorio:
+            return
+        arquivo = self._arquivo(chave)
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            novo = os.path.getsize(temporario)
+            try:
+                anterior = arquivo.stat().st_size
+            except OSError:
+                anterior = 0
+            os.replace(temporario, arquivo)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+        with self._lock:
+            if self._tamanho_disco is None:
+                self._tamanho_disco = self._varrer_disco()[0]
+            else:
+                self._tamanho_disco += novo - anterior
+            excedeu = self._tamanho_disco > self.limite_disco
+        # A varredura (glob + stat de cada arquivo) só acontece quando o total passa do limite
+        if excedeu:
+            self._limitar_disco()
+
+    def _varrer_disco(self):
+        """(bytes, [(mtime, tamanho, arquivo)]) dos arquivos do cache em disco."""
+        arquivos = []
+        for arquivo in self.diretorio.glob("*.pkl"):
+            try:
+                info = arquivo.stat()
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, arquivo))
+        return sum(tamanho for _, tamanho, _ in arquivos), arquivos
+
+    def _limitar_disco(self):
+        # Remove os menos usados até FRACAO_APOS_LIMPEZA do limite: a próxima varredura fica para bem depois
+        total, arquivos = self._varrer_disco()
+        alvo = self.limite_disco * self.FRACAO_APOS_LIMPEZA
+        if total > self.limite_disco:
+            for _, tamanho, arquivo in sorted(arquivos):
+                if total <= alvo:
+                    break
+                try:
+                    arquivo.unlink()
+                    total -= tamanho
+                except OSError:
+                    pass
+        with self._lock:
+            self._tamanho_disco = total
+
+    # ---------- interface ----------
+    def get(self, chave):
+        valor = self._get_memoria(chave)
+        if valor is not None:
+            return valor
+        valor = self._get_disco(chave)
+        if valor is not None:
+            self._put_memoria(chave, valor)
+        return valor
+
+    def put(self, chave, valor):
+        self._put_memoria(chave, valor)
+        self._put_disco(chave, valor)
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+        if self.diretorio:
+            for arquivo in self.diretorio.glob("*.pkl"):
+                try:
+                    arquivo.unlink()
+                except OSError:
+                    pass
+            with self._lock:
+                self._tamanho_disco = None
+
+
+def _renumerar(resultado, numero_pagina):
+    # A mesma página pode mudar de posição numa versão nova do PDF (páginas incluídas antes dela)
+    if resultado is None:
+        return None
+    funcionario, registros = resultado
+    return (
+        {**funcionario, "pagina": numero_pagina} if "pagina" in funcionario else funcionario,
+        [{**registro, "pagina": numero_pagina} if "pagina" in registro else registro for registro in registros],
+    )
+
+
+class PaginasConhecidas:
+    """Resultado já extraído de cada página, pela impressão digital (hash) do conteúdo.
+
+    Um PDF reenviado com algumas páginas corrigidas só tem essas páginas
+    reextraídas; as demais vêm daqui. Vale para o mesmo fornecedor, versão do
+    parser, backend, temas e função de página (a do `escopo`, ver
+    ParserFornecedor.processador). `cache` é um CacheResultados (ou objeto com get/put).
+    """
+
+    def __init__(self, cache, fornecedor=FORNECEDOR_PADRAO, backend=BACKEND_PADRAO, lista_temas=None,
+                 versao=VERSAO_PARSER, escopo=ESCOPO_AMBOS):
+        parser = obter_parser(fornecedor)
+        lista_temas = parser.temas(lista_temas)
+        self.cache = cache
+        self._contexto = (
+            f"|fornecedor={fornecedor}|parser={versao}|backend={backend}|temas={'|'.join(lista_temas)}"
+            f"|pagina={parser.processador(escopo).__name__}"
+        )
+
+    def _chave(self, hash_conteudo):
+        return hashlib.sha256(f"pagina|{hash_conteudo}{self._contexto}".encode("utf-8")).hexdigest()
+
+    def buscar(self, hashes):
+        """{numero_pagina: (resultado, classe)} das páginas de `hashes` ({numero_pagina: hash}) já conhecidas."""
+        encontradas = {}
+        for numero, hash_conteudo in hashes.items():
+            guardado = self.cache.get(self._chave(hash_conteudo))
+            if guardado is not None:
+                numero_original, resultado, classe = guardado
+                if numero_original != numero:
+                    resultado = _renumerar(resultado, numero)
+                encontradas[numero] = (resultado, classe)
+        return encontradas
+
+    def guardar(self, paginas):
+        """Guarda {numero_pagina: (hash, resultado, classe)} (classe da triagem, ver extracao.py)."""
+        for numero, (hash_conteudo, resultado, classe) in paginas.items():
+            self.cache.put(self._chave(hash_conteudo), (numero, resultado, classe))
+
+
+def processar_com_cache(dados, cache, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None, perfil=None,
+                        fornecedor=FORNECEDOR_PADRAO, progresso=None, cache_paginas=None, memoria_max_mb=None,
+                        escopo=ESCOPO_AMBOS, validar=True, tempo_max_pagina=None):
+    """Processa um PDF do fornecedor (padrão: Blitz), em bytes ou caminho, reaproveitando o cache.
+
+    Devolve (resultado, veio_do_cache). `resultado` é um dict com os relatórios
+    (consolidado, detalhe, já tipados: esquema.tipar), o funcionário de cada
+    página (funcionarios_paginas: {pagina: (cpf, nome)}) e as informações por
+    página da extração (total_paginas, paginas_vazias, paginas_ocr,
+    classificacao_paginas, paginas_sem_tabela, falhas_campos).
+    Um `perfil` profundo (cProfile) ignora o cache para medir a execução completa.
+    `progresso(paginas_feitas, total_paginas)` acompanha a extração (não é chamado num acerto do cache).
+    `cache_paginas` (CacheResultados) guarda o resultado por página: numa versão
+    corrigida do PDF só as páginas alteradas são reextraídas (ver PaginasConhecidas).
+    `memoria_max_mb` limita a memória da extração deste arquivo, nos processos dela (perfil.LimiteMemoria).
+    `escopo` e `validar` escolhem o que é calculado (ver configuracoes.py); o
+    relatório fora do escopo vem None.
+    `tempo_max_pagina` limita cada página (processamento/isolamento.py); um
+    resultado com páginas que falharam ou saíram num modo mais barato não vai
+    para o cache, para ser tentado de novo no próximo envio.
+    """
+    parser = obter_parser(fornecedor)
+    chave = chave_cache(dados, lista_temas, backend, ocr, fornecedor=fornecedor, escopo=escopo, validar=validar)
+    with execucao(perfil):
+        if perfil is None or not perfil.profundo:
+            with etapa(perfil, "cache") as registro:
+                guardado = cache.get(chave)
+                registro["encontrado"] = guardado is not None
+                if guardado is not None:
+                    return guardado, True
+
+        paginas_conhecidas = (
+            PaginasConhecidas(cache_paginas, fornecedor, backend, lista_temas, escopo=escopo)
+            if cache_paginas is not None else None
+        )
+        extracao = parser.extrair(
+            dados, lista_temas, workers, backend, ocr, perfil, progresso, paginas_conhecidas, memoria_max_mb, escopo,
+            tempo_max_pagina
+        )
+        df_consolidado_final, df_detalhe = parser.relatorios(extracao, lista_temas, perfil, escopo, validar)
+        # Os registros brutos não vão para o resultado: a mesclagem usa os relatórios
+        resultado = {
+            "funcionarios_paginas": {
+                funcionario["pagina"]: (funcionario.get("cpf"), funcionario.get("nome"))
+                for funcionario in extracao.dados_funcionarios
+                if funcionario.get("pagina") is not None
+            },
+            "consolidado": df_consolidado_final,
+            "detalhe": df_detalhe,
+            "total_paginas": extracao.total_paginas,
+            "paginas_vazias": extracao.paginas_vazias,
+            "paginas_ocr": extracao.paginas_ocr,
+            "hashes_paginas": extracao.hashes_paginas,
+            "paginas_reaproveitadas": extracao.paginas_reaproveitadas,
+            "classificacao_paginas": extracao.classificacao_paginas,
+            "paginas_sem_tabela": extracao.paginas_sem_tabela,
+            "paginas_com_falha": extracao.paginas_com_falha,
+            "paginas_degradadas": extracao.paginas_degradadas,
+            "falhas_campos": extracao.falhas_campos,
+        }
+        if extracao.paginas_com_falha or extracao.paginas_degradadas:
+            return resultado, False
+        with etapa(perfil, "gravacao_cache"):
+            cache.put(chave, resultado)
+    return resultado, False
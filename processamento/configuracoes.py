@@ -0,0 +1,64 @@
+# =========================
+# Configurações da barra lateral (tipo de relatório, validação, extração)
+# =========================
+# Tipo de Relatório (escopo) decide o que o motor calcula:
+#   - Consolidado: caminho rápido; das páginas só o cabeçalho e a linha TOTAIS,
+#     sem linhas diárias nem regras (o consolidado sai sem as colunas Qtd);
+#   - Detalhado: linhas diárias e regras, sem montar o consolidado;
+#   - Ambos: os dois relatórios completos.
+# Modo de Validação Manual não aplica as regras das linhas diárias (Situação,
+# correção): o detalhe sai com os horários como estão no PDF, para conferência.
+#
+# "💾 Salvar Configurações" grava os valores num JSON (IMILE_CONFIGURACOES), um
+# só para o servidor, e as sessões seguintes de todos os usuários começam com eles. Módulo leve: o app o usa antes da tela inicial.
+import json
+import os
+import tempfile
+
+ESCOPO_CONSOLIDADO = "Consolidado"
+ESCOPO_DETALHADO = "Detalhado"
+ESCOPO_AMBOS = "Ambos"
+ESCOPOS = (ESCOPO_CONSOLIDADO, ESCOPO_DETALHADO, ESCOPO_AMBOS)
+
+VALIDACAO_AUTOMATICA = "Automático"
+VALIDACAO_MANUAL = "Manual"
+MODOS_VALIDACAO = (VALIDACAO_AUTOMATICA, VALIDACAO_MANUAL)
+
+# Valores usados enquanto não há nada salvo
+PADROES = {
+    "tipo_relatorio": ESCOPO_AMBOS,
+    "modo_validacao": VALIDACAO_AUTOMATICA,
+    "workers_extracao": 4,
+    "backend_extracao": "pdfplumber",
+    "usar_ocr": True,
+    "dpi_ocr": 300,
+}
+
+
+def carregar_configuracoes(caminho):
+    """PADROES com os valores salvos em `caminho` por cima (arquivo ausente ou inválido fica nos padrões)."""
+    configuracoes = dict(PADROES)
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            salvas = json.load(arquivo)
+    except (OSError, ValueError):
+        return configuracoes
+    if isinstance(salvas, dict):
+        configuracoes.update({chave: valor for chave, valor in salvas.items() if chave in PADROES})
+    return configuracoes
+
+
+def salvar_configuracoes(caminho, configuracoes):
+    """Grava as configurações conhecidas (chaves de PADROES) em `caminho`, trocando o arquivo de uma vez."""
+    valores = {chave: configuracoes[chave] for chave in PADROES if chave in configuracoes}
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(suffix=".json", dir=diretorio)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as arquivo:
+            json.dump(valores, arquivo, indent=2, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+    return valores
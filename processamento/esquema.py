@@ -0,0 +1,53 @@
+# =========================
+# Tipos dos relatórios (consolidado e detalhe)
+# =========================
+# O df_detalhe nascia com tudo como texto em objetos Python: horários ("08:00"),
+# nome e cpf repetidos em todas as linhas do funcionário, semana, previsto,
+# Situação... montar_relatorios tipa os dois relatórios logo ao montá-los e as
+# regras, a contagem de Situações, o merge, o cache e a mesclagem trabalham
+# sobre eles já tipados:
+#   - colunas só de texto -> categóricas: cada valor distinto é guardado uma vez
+#     (nome e cpf viram uma tabela de funcionários com um código por linha) e
+#     os horários são interpretados uma vez por valor distinto, não por linha
+#     (ver tempos.por_categoria);
+#   - inteiros e floats -> menor tipo que guarda os mesmos valores.
+# Os horários continuam como o texto do PDF (categórico): é o que o relatório
+# mostra e exporta, e a mesma coluna traz textos como ATESTADO ou FOLGA. Os
+# minutos saem das categorias quando as regras precisam deles.
+# Colunas com tipos misturados (no consolidado, 0 e texto depois do fillna(0))
+# ficam como estão.
+import numpy as np
+import pandas as pd
+
+
+def _so_texto(serie):
+    if not (serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype)):
+        return False
+    return pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty")
+
+
+def _compactar_numero(serie):
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    if pd.api.types.is_integer_dtype(serie.dtype) and not isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        return pd.to_numeric(serie, downcast="integer")
+    if pd.api.types.is_float_dtype(serie.dtype):
+        reduzida = serie.astype("float32")
+        if np.array_equal(reduzida.to_numpy(dtype="float64"), serie.to_numpy(dtype="float64"), equal_nan=True):
+            return reduzida
+    return serie
+
+
+def tipar(df):
+    """DataFrame com os mesmos valores: texto em categóricas e números no menor tipo (colunas já tipadas ficam)."""
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colunas[coluna] = serie
+        elif _so_texto(serie):
+            colunas[coluna] = serie.astype("category")
+        else:
+            colunas[coluna] = _compactar_numero(serie)
+    return pd.DataFrame(colunas, index=df.index)
+
@@ -0,0 +1,134 @@
+# =========================
+# Exportação dos relatórios (xlsx em streaming, CSV e Parquet)
+# =========================
+# O xlsx é escrito com o modo write_only do openpyxl, que grava as linhas em
+# fluxo sem montar a planilha inteira em memória (o to_excel padrão mantém uma
+# cópia célula a célula do detalhe). Várias planilhas podem ir para o mesmo
+# arquivo. CSV e Parquet atendem sistemas que não precisam de Excel; com mais
+# de uma planilha eles saem dentro de um .zip.
+import math
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MIME_CSV = "text/csv"
+MIME_PARQUET = "application/vnd.apache.parquet"
+MIME_ZIP = "application/zip"
+
+FORMATOS = ["xlsx", "csv", "parquet"]
+
+
+def parquet_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _valor_celula(valor):
+    # NaN/NA viram célula vazia; tipos numpy viram tipos Python
+    if valor is None or valor is pd.NA or valor is pd.NaT:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if hasattr(valor, "item"):
+        valor = valor.item()
+        if isinstance(valor, float) and math.isnan(valor):
+            return None
+    return valor
+
+
+def gerar_xlsx(planilhas):
+    """Grava {nome_planilha: DataFrame} num único .xlsx em streaming e devolve os bytes."""
+    workbook = Workbook(write_only=True)
+    negrito = Font(bold=True)
+    for nome, df in planilhas.items():
+        planilha = workbook.create_sheet(title=str(nome)[:31])
+        cabecalho = []
+        for coluna in df.columns:
+            celula = WriteOnlyCell(planilha, value=str(coluna))
+            celula.font = negrito
+            cabecalho.append(celula)
+        planilha.append(cabecalho)
+        for linha in df.itertuples(index=False, name=None):
+            planilha.append([_valor_celula(valor) for valor in linha])
+    saida = BytesIO()
+    workbook.save(saida)
+    return saida.getvalue()
+
+
+def gerar_csv(df):
+    # utf-8-sig para o Excel abrir os acentos corretamente se alguém abrir o CSV nele
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def _preparar_parquet(df):
+    # Colunas de texto com valores misturados (ex.: nome = 0 após o fillna) não
+    # têm tipo único no Parquet: tudo que não é nulo vira texto.
+    df = df.copy()
+    df.columns = [str(coluna) for coluna in df.columns]
+    for coluna in df.columns:
+        if df[coluna].dtype == object:
+            df[coluna] = df[coluna].map(lambda v: v if v is None or (isinstance(v, float) and math.isnan(v)) else str(v))
+    return df
+
+
+def gerar_parquet(df):
+    if not parquet_disponivel():
+        raise RuntimeError("Exportação Parquet requer o pacote pyarrow (pip install pyarrow).")
+    saida = BytesIO()
+    _preparar_parquet(df).to_parquet(saida, index=False)
+    return saida.getvalue()
+
+
+def gerar_zip(arquivos):
+    """Compacta {nome_arquivo: bytes} num .zip."""
+    saida = BytesIO()
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for nome, conteudo in arquivos.items():
+            zf.writestr(nome, conteudo)
+    return saida.getvalue()
+
+
+_GERADORES = {
+    "csv": (gerar_csv, "csv", MIME_CSV),
+    "parquet": (gerar_parquet, "parquet", MIME_PARQUET),
+}
+
+
+def _validar_formato(formato):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato!r} (use {', '.join(FORMATOS)})")
+
+
+def descrever_exportacao(nomes_planilhas, formato, nome_base):
+    """(nome_arquivo, mime) do arquivo que exportar() vai gerar, sem gerar nada.
+
+    Com mais de uma planilha, o xlsx sai com uma aba por planilha e CSV/Parquet
+    saem num .zip.
+    """
+    _validar_formato(formato)
+    if formato == "xlsx":
+        return f"{nome_base}.xlsx", MIME_XLSX
+    _, extensao, mime = _GERADORES[formato]
+    if len(nomes_planilhas) == 1:
+        return f"{nome_base}.{extensao}", mime
+    return f"{nome_base}.zip", MIME_ZIP
+
+
+def exportar(planilhas, formato):
+    """Bytes do arquivo para {nome: DataFrame} no formato pedido (ver descrever_exportacao)."""
+    _validar_formato(formato)
+    if formato == "xlsx":
+        return gerar_xlsx(planilhas)
+    gerar, extensao, _ = _GERADORES[formato]
+    if len(planilhas) == 1:
+        (df,) = planilhas.values()
+        return gerar(df)
+    return gerar_zip({f"{nome}.{extensao}": gerar(df) for nome, df in planilhas.items()})
@@ -0,0 +1,564 @@
+# =========================
+# Backends de extração de texto e tabela por página
+# =========================
+# Cada backend entrega, para cada página, o mesmo par (texto, tabela) que o
+# loop da Blitz sempre recebeu do pdfplumber:
+#   - texto: linhas separadas por "\n" (ou "" se a página não tem texto)
+#   - tabela: lista de linhas (lista de células) da maior tabela, ou None
+#
+# "pdfplumber" é o backend original. "pymupdf" usa o PyMuPDF (fitz), bem mais
+# rápido em páginas com muitos caracteres, e volta ao pdfplumber só nas páginas
+# em que a tabela encontrada não tem a linha TOTAIS esperada.
+#
+# Para PDFs grandes, prefira passar um caminho (uploads são gravados antes num
+# arquivo temporário, ver gravar_temporario): o pdfplumber lê o arquivo mapeado
+# em memória (mmap) e cada página tem o cache de layout liberado logo depois de
+# lida, então a memória não cresce com o número de páginas.
+#
+# Triagem: com triagem(texto) -> bool, páginas reprovadas pelo texto (capa,
+# assinaturas, resumo) não passam pela extração da tabela, a parte mais cara.
+#
+# Modos de extração (extrair_pagina_modo), do completo ao mais barato, para as
+# novas tentativas de páginas que estouram o tempo (ver isolamento.py):
+#   - completo: extrair_pagina do backend;
+#   - tabela_simples: a tabela é procurada sem os objetos vetoriais minúsculos
+#     (milhares deles tornam o extract_table muito lento);
+#   - so_texto: só o texto, sem tabela, lido sempre pelo PyMuPDF (o pdfplumber
+#     interpreta todos os objetos vetoriais da página até para o texto).
+# Fora dessa escada, o modo totais é o do relatório Consolidado, que só lê o
+# cabeçalho e a linha TOTAIS: a tabela sai só com essas duas linhas, montadas
+# pelo modelo de layout ou, na página que não bate com ele, detectadas só nas
+# faixas em volta da palavra TOTAIS (modelo_layout.faixas_totais). Só a
+# primeira página (que ensina o modelo), a página sem a palavra TOTAIS e a que
+# não fecha por nenhum dos dois caminhos passam pela detecção completa.
+#
+# No modo completo, depois da primeira página com a tabela inteira, as tabelas
+# são montadas pelo modelo de layout aprendido (ver modelo_layout.py) e só as
+# páginas que não batem com ele passam pela detecção completa.
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+import fitz  # PyMuPDF
+import pdfplumber
+from pdfplumber.utils import extract_text
+
+from .modelo_layout import (
+    TOLERANCIA,
+    aprender_modelo,
+    faixas_totais,
+    juntar_linhas,
+    tabela_pelo_modelo,
+    totais_pelo_modelo,
+)
+
+BACKEND_PADRAO = "pdfplumber"
+
+# Classificação das páginas na triagem
+PAGINA_PONTO = "ponto"
+PAGINA_SEM_PONTO = "sem_ponto"
+PAGINA_SEM_TEXTO = "sem_texto"
+# Página que nenhum modo conseguiu extrair no tempo (isolamento.py)
+PAGINA_COM_FALHA = "falha"
+
+MODO_COMPLETO = "completo"
+MODO_TABELA_SIMPLES = "tabela_simples"
+MODO_SO_TEXTO = "so_texto"
+MODOS_EXTRACAO = (MODO_COMPLETO, MODO_TABELA_SIMPLES, MODO_SO_TEXTO)
+# Só cabeçalho e linha TOTAIS (relatório Consolidado)
+MODO_TOTAIS = "totais"
+
+# Na tabela simplificada: objetos menores que isto (em pontos, nos dois lados) são descartados
+TAMANHO_MINIMO_OBJETO = 2
+CONFIG_TABELA_SIMPLES = {"edge_min_length": 10}
+
+# Tolerância vertical (em pontos) para juntar palavras na mesma linha,
+# igual ao y_tolerance padrão do pdfplumber.
+TOLERANCIA_LINHA = 3
+
+
+def preparar_fonte(arquivo):
+    """Normaliza a entrada para algo que possa ir para outro processo: caminho (str) ou bytes."""
+    if isinstance(arquivo, (str, os.PathLike)):
+        return os.fspath(arquivo)
+    if isinstance(arquivo, (bytes, bytearray)):
+        return bytes(arquivo)
+    arquivo.seek(0)
+    return arquivo.read()
+
+
+def gravar_temporario(arquivo, diretorio=None, sufixo=".pdf"):
+    """Copia um arquivo em memória (upload) para um arquivo temporário, em blocos. Devolve o caminho.
+
+    Quem chama remove o arquivo quando não precisar mais dele.
+    """
+    fd, caminho = tempfile.mkstemp(suffix=sufixo, dir=diretorio)
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            if isinstance(arquivo, (bytes, bytearray)):
+                destino.write(arquivo)
+            else:
+                arquivo.seek(0)
+                shutil.copyfileobj(arquivo, destino)
+    except BaseException:
+        os.remove(caminho)
+        raise
+    return caminho
+
+
+def atualizar_hash(h, fonte, tamanho_bloco=1024 * 1024):
+    """Passa o conteúdo (caminho, bytes ou arquivo em memória) para o hash `h`, lendo em blocos."""
+    if isinstance(fonte, (bytes, bytearray)):
+        h.update(fonte)
+        return h
+    arquivo = open(fonte, "rb") if isinstance(fonte, (str, os.PathLike)) else fonte
+    try:
+        arquivo.seek(0)
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            h.update(bloco)
+    finally:
+        if arquivo is fonte:
+            fonte.seek(0)
+        else:
+            arquivo.close()
+    return h
+
+
+def hash_arquivo(fonte):
+    """SHA-256 do conteúdo de um PDF (caminho, bytes ou arquivo em memória)."""
+    return atualizar_hash(hashlib.sha256(), fonte).hexdigest()
+
+
+def abrir_documento(fonte):
+    """Documento do PyMuPDF a partir de um caminho ou dos bytes do PDF."""
+    fonte = preparar_fonte(fonte)
+    if isinstance(fonte, bytes):
+        return fitz.open(stream=fonte, filetype="pdf")
+    return fitz.open(fonte)
+
+
+def hash_pagina(documento, pagina):
+    """SHA-256 do fluxo de conteúdo da página e das imagens que ela usa."""
+    h = hashlib.sha256()
+    h.update(pagina.read_contents())
+    for imagem in pagina.get_images():
+        h.update(documento.xref_stream_raw(imagem[0]) or b"")
+    return h.hexdigest()
+
+
+def hashes_paginas(fonte):
+    """Impressão digital de cada página: {numero_pagina (1-based): hash do conteúdo}."""
+    with abrir_documento(fonte) as documento:
+        return {indice + 1: hash_pagina(documento, pagina) for indice, pagina in enumerate(documento)}
+
+
+def objeto_relevante(objeto):
+    """Filtro da tabela simplificada: descarta linhas, retângulos e curvas minúsculos (as bordas da tabela são longas)."""
+    if objeto.get("object_type") in ("rect", "line", "curve"):
+        return max(objeto.get("width", 0), objeto.get("height", 0)) >= TAMANHO_MINIMO_OBJETO
+    return True
+
+
+def tem_linha_totais(tabela):
+    return bool(tabela) and any(
+        linha and linha[0] and "TOTAIS" in str(linha[0]).upper() for linha in tabela
+    )
+
+
+def linha_da_faixa(tabelas, faixa):
+    """Células [(x0, texto)] da linha que atravessa o meio da faixa (top, bottom), ou None.
+
+    `tabelas` são as tabelas detectadas no recorte da faixa (pdfplumber ou PyMuPDF).
+    """
+    meio = (faixa[0] + faixa[1]) / 2
+    for tabela in tabelas:
+        for posicao, linha in enumerate(tabela.rows):
+            if linha.bbox[1] <= meio <= linha.bbox[3]:
+                textos = tabela.extract()[posicao]
+                return [(celula[0], texto) for celula, texto in zip(linha.cells, textos) if celula is not None]
+    return None
+
+
+class Extrator:
+    """Base dos backends: subclasses implementam total_paginas, extrair_pagina, extrair_pagina_simplificada,
+    extrair_pagina_totais, extrair_texto e close."""
+    nome = None
+    # Modelo de layout aprendido (modelo_layout.ModeloLayout)
+    modelo = None
+    # Modo totais: a primeira página com TOTAIS já passou pela detecção completa
+    _detectou_totais = False
+
+    def _tabela_pelo_modelo(self, horizontais, itens, texto_celula):
+        """Tabela da página pelo modelo de layout, ou None (sem modelo ou página que não bate com ele)."""
+        if self.modelo is None:
+            return None
+        return tabela_pelo_modelo(self.modelo, horizontais(), itens(), texto_celula)
+
+    def _aprender(self, celulas, tabela):
+        modelo = aprender_modelo(celulas, tabela)
+        if modelo is not None:
+            self.modelo = modelo
+
+    def liberar(self):
+        """Solta caches internos do backend (chamado quando a memória passa do limite)."""
+
+    def _tabela_totais(self, palavras, horizontais, verticais, itens, texto_celula, linha_recortada, completa):
+        """Tabela [cabeçalho, linha TOTAIS] da página no modo totais.
+
+        A primeira página passa pela detecção completa (`completa()`), que ensina
+        o modelo de layout; nas seguintes as duas linhas saem do modelo ou, se a
+        página não bate com ele, das faixas em volta das `palavras` TOTAIS
+        ((x0, top, x1, bottom); `linha_recortada(esquerda, faixa)` devolve as
+        células da faixa). Sem a palavra TOTAIS, ou se nada disso fecha, a página
+        volta para a detecção completa.
+        """
+        if not palavras:
+            return completa()
+        if not self._detectou_totais:
+            self._detectou_totais = True
+            return completa()
+        horizontais = horizontais()
+        if self.modelo is not None:
+            tabela = totais_pelo_modelo(self.modelo, horizontais, itens(), texto_celula, palavras)
+            if tabela is not None:
+                return tabela
+        verticais = verticais()
+        for palavra in palavras:
+            faixas = faixas_totais(horizontais, verticais, palavra)
+            if faixas is None:
+                continue
+            esquerda, cabecalho, totais = faixas
+            linhas = [linha_recortada(esquerda, cabecalho), linha_recortada(esquerda, totais)]
+            if None in linhas:
+                continue
+            tabela = juntar_linhas(linhas)
+            if tem_linha_totais(tabela[1:]):
+                return tabela
+        return completa()
+
+    def paginas(self, inicio=0, fim=None, triagem=None, modo=MODO_COMPLETO):
+        """Gera (indice, texto, tabela) para as páginas [inicio, fim), extraídas no `modo`.
+
+        Páginas cujo texto é reprovado por `triagem` vêm com tabela None, sem
+        passar pela extração da tabela, e ficam no conjunto self.paginas_sem_tabela
+        (1-based; ResultadoExtracao.paginas_sem_tabela traz a lista ordenada).
+        """
+        for indice in range(*slice(inicio, fim).indices(self.total_paginas)):
+            texto, tabela = self.extrair_pagina_modo(indice, modo, triagem)
+            yield indice, texto, tabela
+
+    def extrair_pagina_modo(self, indice, modo=MODO_COMPLETO, triagem=None):
+        """(texto, tabela) da página no `modo` (MODOS_EXTRACAO ou MODO_TOTAIS)."""
+        if modo == MODO_COMPLETO:
+            return self.extrair_pagina(indice, triagem)
+        if modo == MODO_TABELA_SIMPLES:
+            return self.extrair_pagina_simplificada(indice, triagem)
+        if modo == MODO_SO_TEXTO:
+            return self.extrair_texto(indice), None
+        if modo == MODO_TOTAIS:
+            return self.extrair_pagina_totais(indice, triagem)
+        raise ValueError(
+            f"Modo de extração desconhecido: {modo!r} (use {', '.join(MODOS_EXTRACAO + (MODO_TOTAIS,))})"
+        )
+
+    def classificar(self, numero_pagina, texto):
+        """Classe da página (1-based) já lida: ponto, sem_ponto ou sem_texto."""
+        if not texto.strip():
+            return PAGINA_SEM_TEXTO
+        return PAGINA_SEM_PONTO if numero_pagina in self.paginas_sem_tabela else PAGINA_PONTO
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExtratorPdfplumber(Extrator):
+    nome = "pdfplumber"
+
+    def __init__(self, fonte):
+        fonte = preparar_fonte(fonte)
+        self._fonte = fonte
+        self.paginas_sem_tabela = set()
+        self._arquivo = self._mapa = self._documento = None
+        if isinstance(fonte, bytes):
+            self._pdf = pdfplumber.open(BytesIO(fonte))
+        else:
+            # Arquivo mapeado em memória: as páginas do PDF ficam no cache do sistema, não no heap
+            self._arquivo = open(fonte, "rb")
+            try:
+                self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Arquivo vazio não pode ser mapeado: o pdfplumber dá o erro de PDF inválido
+                self._mapa = None
+            self._pdf = pdfplumber.open(self._mapa if self._mapa is not None else self._arquivo)
+
+    @property
+    def total_paginas(self):
+        return len(self._pdf.pages)
+
+    def extrair_tabela(self, indice):
+        pagina = self._pdf.pages[indice]
+        try:
+            return pagina.extract_table()
+        finally:
+            pagina.close()
+
+    def extrair_tabela_simplificada(self, indice):
+        pagina = self._pdf.pages[indice]
+        try:
+            return pagina.filter(objeto_relevante).extract_table(CONFIG_TABELA_SIMPLES)
+        finally:
+            pagina.close()
+
+    def extrair_texto(self, indice):
+        # Modo só texto: o fitz não interpreta os objetos vetoriais que deixaram a página lenta
+        if self._documento is None:
+            self._documento = abrir_documento(self._fonte)
+        return texto_pymupdf(self._documento[indice])
+
+    def extrair_pagina(self, indice, triagem=None, simplificada=False):
+        pagina = self._pdf.pages[indice]
+        try:
+            texto = pagina.extract_text() or ""
+            if triagem is not None and not triagem(texto):
+                self.paginas_sem_tabela.add(indice + 1)
+                return texto, None
+            if simplificada:
+                tabela = pagina.filter(objeto_relevante).extract_table(CONFIG_TABELA_SIMPLES)
+            else:
+                tabela = self._tabela_completa(indice, pagina)
+        finally:
+            # Sem isso o layout de cada página lida fica em memória até o fim do arquivo
+            pagina.close()
+        return texto, tabela
+
+    def _tabela_completa(self, indice, pagina):
+        tabela = self._tabela_pelo_modelo(
+            lambda: [(borda["x0"], borda["x1"], borda["top"]) for borda in pagina.horizontal_edges],
+            lambda: (((c["x0"] + c["x1"]) / 2, (c["top"] + c["bottom"]) / 2, c) for c in pagina.chars),
+            extract_text,
+        )
+        if tabela is not None:
+            return tabela
+        # O mesmo que pagina.extract_table(), guardando as células para o modelo
+        encontrada = pagina.find_table()
+        if encontrada is None:
+            return None
+        tabela = encontrada.extract()
+        self._aprender(encontrada.cells, tabela)
+        return tabela
+
+    def extrair_pagina_simplificada(self, indice, triagem=None):
+        return self.extrair_pagina(indice, triagem, simplificada=True)
+
+    def extrair_pagina_totais(self, indice, triagem=None):
+        pagina = self._pdf.pages[indice]
+        try:
+            texto = pagina.extract_text() or ""
+            if triagem is not None and not triagem(texto):
+                self.paginas_sem_tabela.add(indice + 1)
+                return texto, None
+            # O search reaproveita o mapa de texto do extract_text
+            achados = pagina.search("TOTAIS", regex=False, case=False)
+            tabela = self._tabela_totais(
+                [(achado["x0"], achado["top"], achado["x1"], achado["bottom"]) for achado in achados],
+                lambda: [(borda["x0"], borda["x1"], borda["top"]) for borda in pagina.horizontal_edges],
+                lambda: [(borda["x0"], borda["top"], borda["bottom"]) for borda in pagina.vertical_edges],
+                lambda: (((c["x0"] + c["x1"]) / 2, (c["top"] + c["bottom"]) / 2, c) for c in pagina.chars),
+                extract_text,
+                lambda esquerda, faixa: self._linha_recortada(pagina, esquerda, faixa),
+                lambda: self._tabela_completa(indice, pagina),
+            )
+        finally:
+            pagina.close()
+        return texto, tabela
+
+    @staticmethod
+    def _linha_recortada(pagina, esquerda, faixa):
+        # Recorte justo na faixa: as bordas dela entram, as linhas vizinhas não
+        recorte = pagina.crop((max(esquerda - TOLERANCIA, 0), faixa[0], pagina.width, faixa[1]))
+        tabela = recorte.find_table()
+        return linha_da_faixa([tabela] if tabela is not None else [], faixa)
+
+    def close(self):
+        self._pdf.close()
+        if self._documento is not None:
+            self._documento.close()
+        if self._mapa is not None:
+            self._mapa.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+
+class ExtratorPyMuPDF(Extrator):
+    nome = "pymupdf"
+
+    def __init__(self, fonte):
+        self._fonte = preparar_fonte(fonte)
+        if isinstance(self._fonte, bytes):
+            self._doc = fitz.open(stream=self._fonte, filetype="pdf")
+        else:
+            self._doc = fitz.open(self._fonte)
+        self._reserva = None
+        self.paginas_sem_tabela = set()
+
+    @property
+    def total_paginas(self):
+        return self._doc.page_count
+
+    def _pdfplumber(self):
+        if self._reserva is None:
+            self._reserva = ExtratorPdfplumber(self._fonte)
+        return self._reserva
+
+    def extrair_pagina(self, indice, triagem=None):
+        pagina = self._doc[indice]
+        palavras = pagina.get_text("words")
+        texto = juntar_palavras(palavras)
+        if triagem is not None and not triagem(texto):
+            self.paginas_sem_tabela.add(indice + 1)
+            return texto, None
+        return texto, self._tabela_completa(indice, pagina, palavras, texto)
+
+    def _tabela_completa(self, indice, pagina, palavras, texto):
+        tabela = self._tabela_pelo_modelo(
+            lambda: horizontais_pymupdf(pagina),
+            lambda: (((p[0] + p[2]) / 2, (p[1] + p[3]) / 2, p) for p in palavras),
+            juntar_palavras,
+        )
+        if tabela is not None:
+            return tabela
+        maior = maior_tabela_pymupdf(pagina)
+        tabela = (maior.extract() or None) if maior is not None else None
+        if tem_linha_totais(tabela):
+            self._aprender(maior.cells, tabela)
+        # Página de funcionário sem TOTAIS na tabela do fitz: confia no pdfplumber
+        tem_cabecalho = "NOME DO FUNCION" in texto
+        if (tabela or tem_cabecalho) and not tem_linha_totais(tabela):
+            tabela_reserva = self._pdfplumber().extrair_tabela(indice)
+            if tabela_reserva:
+                tabela = tabela_reserva
+        return tabela
+
+    def extrair_texto(self, indice):
+        return texto_pymupdf(self._doc[indice])
+
+    def extrair_pagina_totais(self, indice, triagem=None):
+        pagina = self._doc[indice]
+        palavras = pagina.get_text("words")
+        texto = juntar_palavras(palavras)
+        if triagem is not None and not triagem(texto):
+            self.paginas_sem_tabela.add(indice + 1)
+            return texto, None
+        return texto, self._tabela_totais(
+            [tuple(p[:4]) for p in palavras if "TOTAIS" in p[4].upper()],
+            lambda: horizontais_pymupdf(pagina),
+            lambda: verticais_pymupdf(pagina),
+            lambda: (((p[0] + p[2]) / 2, (p[1] + p[3]) / 2, p) for p in palavras),
+            juntar_palavras,
+            lambda esquerda, faixa: linha_recortada_pymupdf(pagina, esquerda, faixa),
+            lambda: self._tabela_completa(indice, pagina, palavras, texto),
+        )
+
+    def extrair_pagina_simplificada(self, indice, triagem=None):
+        # Tabela simplificada do pdfplumber sobre o texto do fitz
+        texto = texto_pymupdf(self._doc[indice])
+        if triagem is not None and not triagem(texto):
+            self.paginas_sem_tabela.add(indice + 1)
+            return texto, None
+        return texto, self._pdfplumber().extrair_tabela_simplificada(indice)
+
+    def liberar(self):
+        # Cache de objetos do MuPDF (fontes, imagens decodificadas) compartilhado pelo documento
+        fitz.TOOLS.store_shrink(100)
+
+    def close(self):
+        self._doc.close()
+        if self._reserva is not None:
+            self._reserva.close()
+
+
+def texto_pymupdf(pagina):
+    """Texto da página em linhas, agrupando palavras pela altura como o extract_text do pdfplumber."""
+    return juntar_palavras(pagina.get_text("words"))
+
+
+def juntar_palavras(palavras):
+    """Texto das palavras do PyMuPDF (x0, y0, x1, y1, texto, ...) em linhas, como o extract_text do pdfplumber."""
+    palavras = sorted(palavras, key=lambda p: (p[1], p[0]))
+    linhas = []
+    atual = []
+    topo_anterior = None
+    for palavra in palavras:
+        topo = palavra[1]
+        if topo_anterior is not None and topo - topo_anterior > TOLERANCIA_LINHA:
+            linhas.append(atual)
+            atual = []
+        atual.append(palavra)
+        topo_anterior = topo
+    if atual:
+        linhas.append(atual)
+    return "\n".join(
+        " ".join(p[4] for p in sorted(linha, key=lambda p: p[0])) for linha in linhas
+    )
+
+
+def maior_tabela_pymupdf(pagina):
+    """Maior tabela encontrada pelo find_tables (mesmo critério do extract_table do pdfplumber), ou None."""
+    tabelas = pagina.find_tables().tables
+    if not tabelas:
+        return None
+    return max(tabelas, key=lambda t: len(t.cells))
+
+
+def horizontais_pymupdf(pagina):
+    """Traços horizontais da página como (x0, x1, y): linhas retas e as bordas de cima e de baixo dos retângulos."""
+    horizontais = []
+    for desenho in pagina.get_drawings():
+        for item in desenho["items"]:
+            if item[0] == "re":
+                retangulo = item[1]
+                horizontais.append((retangulo.x0, retangulo.x1, retangulo.y0))
+                horizontais.append((retangulo.x0, retangulo.x1, retangulo.y1))
+            elif item[0] == "l" and abs(item[1].y - item[2].y) < 1:
+                horizontais.append((min(item[1].x, item[2].x), max(item[1].x, item[2].x), item[1].y))
+    return horizontais
+
+
+def linha_recortada_pymupdf(pagina, esquerda, faixa):
+    """Células [(x0, texto)] da linha da faixa (top, bottom), com o find_tables só no recorte dela."""
+    recorte = fitz.Rect(max(esquerda - TOLERANCIA, 0), faixa[0], pagina.rect.width, faixa[1])
+    return linha_da_faixa(pagina.find_tables(clip=recorte).tables, faixa)
+
+
+def verticais_pymupdf(pagina):
+    """Traços verticais da página como (x, top, bottom): linhas retas e as bordas laterais dos retângulos."""
+    verticais = []
+    for desenho in pagina.get_drawings():
+        for item in desenho["items"]:
+            if item[0] == "re":
+                retangulo = item[1]
+                verticais.append((retangulo.x0, retangulo.y0, retangulo.y1))
+                verticais.append((retangulo.x1, retangulo.y0, retangulo.y1))
+            elif item[0] == "l" and abs(item[1].x - item[2].x) < 1:
+                verticais.append((item[1].x, min(item[1].y, item[2].y), max(item[1].y, item[2].y)))
+    return verticais
+
+
+BACKENDS = {
+    ExtratorPdfplumber.nome: ExtratorPdfplumber,
+    ExtratorPyMuPDF.nome: ExtratorPyMuPDF,
+}
+
+
+def abrir_extrator(arquivo, backend=BACKEND_PADRAO):
+    try:
+        classe = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Backend de extração desconhecido: {backend!r} (use {', '.join(BACKENDS)})")
+    return classe(arquivo)
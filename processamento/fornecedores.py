@@ -0,0 +1,158 @@
+# =========================
+# Registro de parsers por fornecedor
+# =========================
+# Cada fornecedor entra com o que é específico do seu PDF: como ler uma página
+# (cabeçalho, tabela, justificativas) e como montar os relatórios a partir dos
+# registros. O restante é compartilhado: extração paralela (extrair_pdf), OCR,
+# cache de resultados, perfil por etapa, exportação e histórico.
+#
+# Para um fornecedor novo:
+#   1. escreva em processamento/<fornecedor>.py uma função de página com a
+#      assinatura de blitz.processar_pagina -> (funcionario, registros) ou None,
+#      e uma montar_relatorios(dados_funcionarios, detalhes, lista_temas, perfil,
+#      escopo, validar) que devolve None no relatório fora do escopo;
+#      para juntar vários arquivos num relatório, uma finalizar_relatorios(
+#      df_consolidado, df_detalhe, perfil) com as contagens que dependem do
+#      conjunto inteiro;
+#      opcionalmente, uma função de página só com o que o consolidado usa
+#      (caminho rápido do Tipo de Relatório "Consolidado") e o modo de extração
+#      que entrega só a parte da tabela que ela lê (extracao.MODO_TOTAIS);
+#      opcionalmente, uma triagem(texto) -> bool que reconhece pelo texto as
+#      páginas com tabela de ponto (as demais não têm a tabela extraída);
+#   2. registre um ParserFornecedor aqui, no fim do arquivo.
+# As funções precisam ser de módulo (não lambdas): vão por pickle para os
+# processos da extração paralela.
+#
+# Hoje só a Blitz está registrada. Processar D0 e Polly (FIXOS / DESLIGADOS)
+# no app está BLOQUEADO: os layouts desses PDFs (e amostras para conferir) não
+# estão neste repositório, só nos notebooks do Colab, e as abas continuam
+# apontando para eles. Este registro é só a base para quando os layouts
+# chegarem: um parser registrado com o nome da aba ("D0", "Polly FIXOS",
+# "Polly DESLIGADOS") passa a rodar na própria aba, com o mesmo fluxo da Blitz.
+from dataclasses import dataclass
+from typing import Callable
+
+from . import blitz
+from .configuracoes import ESCOPO_AMBOS, ESCOPO_CONSOLIDADO
+from .extracao import BACKEND_PADRAO, MODO_COMPLETO, MODO_TOTAIS
+from .mesclagem import mesclar_relatorios
+from .perfil import etapa
+
+
+@dataclass(frozen=True)
+class ParserFornecedor:
+    nome: str
+    # (texto, tabela, numero_pagina, lista_temas) -> (funcionario, registros) | None
+    processar_pagina: Callable
+    # (dados_funcionarios, detalhes, lista_temas, perfil, escopo, validar) -> (df_consolidado_final, df_detalhe)
+    montar_relatorios: Callable
+    # (df_consolidado, df_detalhe, perfil) -> (df_consolidado_final, df_detalhe): contagens sobre relatórios mesclados
+    finalizar_relatorios: Callable = None
+    lista_temas: tuple = ()
+    # texto -> bool: a página tem tabela de ponto? None extrai a tabela de todas
+    triagem: Callable = None
+    # Como processar_pagina, mas só com cabeçalho e totais; None usa processar_pagina também no Consolidado
+    processar_pagina_consolidado: Callable = None
+    # Modo de extração das páginas (extracao.extrair_pagina_modo) para processar_pagina_consolidado
+    modo_consolidado: str = MODO_COMPLETO
+    # Nomes base dos arquivos exportados
+    nome_consolidado: str = "consolidado"
+    nome_detalhe: str = "detalhe"
+    nome_relatorio: str = "relatorio"
+
+    def temas(self, lista_temas=None):
+        return list(self.lista_temas) if lista_temas is None else lista_temas
+
+    def processador(self, escopo=ESCOPO_AMBOS):
+        """Função de página usada no `escopo`."""
+        if escopo == ESCOPO_CONSOLIDADO and self.processar_pagina_consolidado is not None:
+            return self.processar_pagina_consolidado
+        return self.processar_pagina
+
+    def modo_extracao(self, escopo=ESCOPO_AMBOS):
+        """Modo de extração das páginas no `escopo`."""
+        if escopo == ESCOPO_CONSOLIDADO and self.processar_pagina_consolidado is not None:
+            return self.modo_consolidado
+        return MODO_COMPLETO
+
+    def extrair(self, arquivo, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None, perfil=None,
+                progresso=None, paginas_conhecidas=None, memoria_max_mb=None, escopo=ESCOPO_AMBOS,
+                tempo_max_pagina=None):
+        """ResultadoExtracao do PDF com a extração compartilhada (ver blitz.extrair_pdf)."""
+        return blitz.extrair_pdf(
+            arquivo, self.temas(lista_temas), workers, backend, ocr, perfil,
+            processar=self.processador(escopo), progresso=progresso, paginas_conhecidas=paginas_conhecidas,
+            memoria_max_mb=memoria_max_mb, triagem=self.triagem, tempo_max_pagina=tempo_max_pagina,
+            modo=self.modo_extracao(escopo),
+        )
+
+    def relatorios(self, extracao, lista_temas=None, perfil=None, escopo=ESCOPO_AMBOS, validar=True):
+        return self.montar_relatorios(
+            extracao.dados_funcionarios, extracao.detalhes, self.temas(lista_temas), perfil, escopo, validar
+        )
+
+    def mesclar(self, arquivos, perfil=None):
+        """Um relatório para vários arquivos (processamento/mesclagem.py).
+
+        `arquivos`: [(nome_arquivo, df_consolidado_final, df_detalhe)], os
+        relatórios de cada arquivo montados com o mesmo `escopo` e `validar`
+        (as regras não são aplicadas de novo). Devolve (df_consolidado_final,
+        df_detalhe, dias_descartados).
+        """
+        with etapa(perfil, "mesclagem", arquivos=len(arquivos)) as registro:
+            df_consolidado, df_detalhe, dias_descartados = mesclar_relatorios(arquivos)
+            registro["dias_descartados"] = dias_descartados
+        df_consolidado_final, df_detalhe = self.finalizar_relatorios(df_consolidado, df_detalhe, perfil)
+        return df_consolidado_final, df_detalhe, dias_descartados
+
+    def planilhas_exportacao(self, df_consolidado_final, df_detalhe, arquivo_unico=False):
+        """[(nome_base, {planilha: DataFrame})] a exportar: um arquivo por relatório ou um só com os dois.
+
+        Relatórios None (fora do escopo) ficam de fora.
+        """
+        relatorios = [
+            (self.nome_consolidado, "consolidado", df_consolidado_final),
+            (self.nome_detalhe, "detalhe", df_detalhe),
+        ]
+        relatorios = [(nome_base, planilha, df) for nome_base, planilha, df in relatorios if df is not None]
+        if arquivo_unico and len(relatorios) > 1:
+            return [(self.nome_relatorio, {planilha: df for _, planilha, df in relatorios})]
+        return [(nome_base, {planilha: df}) for nome_base, planilha, df in relatorios]
+
+    def processar(self, arquivo, lista_temas=None, workers=1, backend=BACKEND_PADRAO, ocr=None, perfil=None,
+                  escopo=ESCOPO_AMBOS, validar=True):
+        """Extrai e monta os relatórios: devolve (df_consolidado_final, df_detalhe)."""
+        extracao = self.extrair(arquivo, lista_temas, workers, backend, ocr, perfil, escopo=escopo)
+        return self.relatorios(extracao, lista_temas, perfil, escopo, validar)
+
+
+PARSERS = {}
+
+
+def registrar_parser(parser):
+    PARSERS[parser.nome] = parser
+    return parser
+
+
+def obter_parser(nome):
+    try:
+        return PARSERS[nome]
+    except KeyError:
+        raise ValueError(f"Fornecedor sem parser registrado: {nome!r} (disponíveis: {', '.join(PARSERS)})") from None
+
+
+FORNECEDOR_PADRAO = "Blitz"
+
+registrar_parser(ParserFornecedor(
+    nome="Blitz",
+    processar_pagina=blitz.processar_pagina,
+    montar_relatorios=blitz.montar_relatorios,
+    finalizar_relatorios=blitz.finalizar_relatorios,
+    triagem=blitz.pagina_relevante,
+    processar_pagina_consolidado=blitz.processar_pagina_consolidado,
+    modo_consolidado=MODO_TOTAIS,
+    lista_temas=tuple(blitz.LISTA_TEMAS_MESTRA),
+    nome_consolidado="consolidado_blitz",
+    nome_detalhe="detalhe_funcionarios",
+    nome_relatorio="relatorio_blitz",
+))
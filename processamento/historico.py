@@ -0,0 +1,340 @@
+# =========================
+# Histórico dos relatórios processados (SQLite)
+# =========================
+# Cada relatório processado (consolidado + detalhe) pode ser gravado num banco
+# SQLite local, por fornecedor e mês de referência. As consultas entre meses
+# (faltas de um colaborador, contagem de Situações por mês...) saem direto do
+# banco, sem reenviar nem reprocessar os PDFs.
+#
+# As colunas usadas em filtros ficam em colunas próprias e indexadas
+# (fornecedor, mes, cpf, data, Situação); o restante da linha vai como JSON,
+# porque as colunas dos relatórios variam (temas, "Qtd - <situação>").
+# Um fornecedor tem um relatório por mês: gravar de novo o mesmo fornecedor e
+# mês substitui a gravação anterior, mesmo com outro nome de arquivo (um PDF
+# reenviado não é somado ao antigo). Vários PDFs do mesmo mês são juntados
+# antes (mesclagem) e gravados numa gravação só.
+#
+# As versões de PDF já processadas (hash de cada página e funcionário de cada
+# página, ver versoes.resumo_versao) também ficam no banco: um reenvio é
+# comparado com a versão anterior mesmo depois de outras sessões ou de muitos
+# outros arquivos. Os hashes ficam numa tabela indexada, e a versão anterior
+# (a que mais compartilha páginas) sai de uma consulta só.
+import hashlib
+import json
+import re
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .tempos import hhmm, minutos, texto_limpo
+
+FORNECEDOR_PADRAO = "Blitz"
+_HORA = re.compile(r"^\d{1,3}:\d{2}$")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    fornecedor TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    arquivo TEXT NOT NULL,
+    gravado_em TEXT NOT NULL,
+    UNIQUE (fornecedor, mes)
+);
+CREATE TABLE IF NOT EXISTS consolidado (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id) ON DELETE CASCADE,
+    fornecedor TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    cpf TEXT,
+    nome TEXT,
+    dados TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS detalhe (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id) ON DELETE CASCADE,
+    fornecedor TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    cpf TEXT,
+    data TEXT,
+    situacao TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_consolidado_fornecedor_mes_cpf ON consolidado (fornecedor, mes, cpf);
+CREATE INDEX IF NOT EXISTS ix_consolidado_cpf ON consolidado (cpf, mes);
+CREATE INDEX IF NOT EXISTS ix_detalhe_fornecedor_mes_cpf_data ON detalhe (fornecedor, mes, cpf, data);
+CREATE INDEX IF NOT EXISTS ix_detalhe_cpf_data ON detalhe (cpf, data);
+CREATE INDEX IF NOT EXISTS ix_detalhe_execucao ON detalhe (execucao_id);
+CREATE INDEX IF NOT EXISTS ix_consolidado_execucao ON consolidado (execucao_id);
+CREATE TABLE IF NOT EXISTS versoes (
+    id INTEGER PRIMARY KEY,
+    fornecedor TEXT NOT NULL,
+    assinatura TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    funcionarios TEXT NOT NULL,
+    gravado_em TEXT NOT NULL,
+    UNIQUE (fornecedor, assinatura)
+);
+CREATE TABLE IF NOT EXISTS versoes_paginas (
+    versao_id INTEGER NOT NULL REFERENCES versoes(id) ON DELETE CASCADE,
+    pagina INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_versoes_paginas_hash ON versoes_paginas (hash);
+CREATE INDEX IF NOT EXISTS ix_versoes_paginas_versao ON versoes_paginas (versao_id);
+"""
+
+
+def _valor_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if valor is pd.NA or valor is pd.NaT:
+        return None
+    return str(valor)
+
+
+def _texto_ou_none(valor):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    return str(valor)
+
+
+def _so_horas(serie):
+    presentes = serie.dropna()
+    return not presentes.empty and presentes.map(lambda valor: isinstance(valor, str) and bool(_HORA.match(valor))).all()
+
+
+def data_iso(data):
+    """'dd/mm/aaaa' -> 'aaaa-mm-dd' (ordenável no banco); outros textos ficam como estão."""
+    data = _texto_ou_none(data)
+    if data is None:
+        return None
+    try:
+        return datetime.strptime(data.strip(), "%d/%m/%Y").date().isoformat()
+    except ValueError:
+        return data
+
+
+def assinatura_versao(resumo):
+    """Identifica o conteúdo da versão: o mesmo conjunto de páginas dá a mesma assinatura."""
+    return hashlib.sha256("\n".join(sorted(set(resumo["hashes"].values()))).encode()).hexdigest()
+
+
+def mes_referencia(df_detalhe):
+    """Mês mais frequente nas datas do detalhe, como 'aaaa-mm' (None se não houver datas válidas)."""
+    if df_detalhe is None or "data" not in df_detalhe.columns:
+        return None
+    datas = pd.to_datetime(df_detalhe["data"], format="%d/%m/%Y", errors="coerce").dropna()
+    if datas.empty:
+        return None
+    return datas.dt.strftime("%Y-%m").mode().iloc[0]
+
+
+class HistoricoRelatorios:
+    """Banco SQLite com os relatórios já processados. Uma conexão por operação (seguro entre threads)."""
+
+    def __init__(self, caminho):
+        self.caminho = str(caminho)
+        with self._conexao() as conexao:
+            conexao.executescript(_ESQUEMA)
+
+    @contextmanager
+    def _conexao(self):
+        with closing(sqlite3.connect(self.caminho, timeout=30)) as conexao:
+            conexao.execute("PRAGMA foreign_keys = ON")
+            with conexao:
+                yield conexao
+
+    # ---------- gravação ----------
+    def gravar(self, df_consolidado_final, df_detalhe, mes=None, fornecedor=FORNECEDOR_PADRAO, arquivo=""):
+        """Grava um relatório, substituindo a gravação do mesmo fornecedor e mês. Devolve o id da gravação.
+
+        `mes` ('aaaa-mm') é deduzido das datas do detalhe quando não informado.
+        """
+        if df_consolidado_final is None or df_detalhe is None:
+            # Uma gravação substitui a anterior do mesmo mês: só relatórios completos entram
+            raise ValueError("O histórico guarda consolidado e detalhe: processe com o Tipo de Relatório \"Ambos\".")
+        mes = mes or mes_referencia(df_detalhe)
+        if not mes:
+            raise ValueError("Mês de referência não informado e sem datas válidas no detalhe.")
+
+        with self._conexao() as conexao:
+            conexao.execute("DELETE FROM execucoes WHERE fornecedor = ? AND mes = ?", (fornecedor, mes))
+            execucao_id = conexao.execute(
+                "INSERT INTO execucoes (fornecedor, mes, arquivo, gravado_em) VALUES (?, ?, ?, ?)",
+                (fornecedor, mes, arquivo, datetime.now().isoformat(timespec="seconds")),
+            ).lastrowid
+            conexao.executemany(
+                "INSERT INTO consolidado (execucao_id, fornecedor, mes, cpf, nome, dados) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (execucao_id, fornecedor, mes, _texto_ou_none(registro.get("cpf")), _texto_ou_none(registro.get("nome")),
+                     json.dumps(registro, ensure_ascii=False, default=_valor_json))
+                    for registro in df_consolidado_final.to_dict("records")
+                ),
+            )
+            conexao.executemany(
+                "INSERT INTO detalhe (execucao_id, fornecedor, mes, cpf, data, situacao, dados) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (execucao_id, fornecedor, mes, _texto_ou_none(registro.get("cpf")), data_iso(registro.get("data")),
+                     _texto_ou_none(registro.get("Situação")),
+                     json.dumps(registro, ensure_ascii=False, default=_valor_json))
+                    for registro in df_detalhe.to_dict("records")
+                ),
+            )
+        return execucao_id
+
+    def remover(self, fornecedor, mes, arquivo=None):
+        with self._conexao() as conexao:
+            if arquivo is None:
+                conexao.execute("DELETE FROM execucoes WHERE fornecedor = ? AND mes = ?", (fornecedor, mes))
+            else:
+                conexao.execute(
+                    "DELETE FROM execucoes WHERE fornecedor = ? AND mes = ? AND arquivo = ?", (fornecedor, mes, arquivo)
+                )
+
+    def arquivos_gravados(self, fornecedor, mes):
+        """Arquivos da gravação existente do fornecedor e mês (os que uma nova gravação substitui)."""
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                "SELECT arquivo FROM execucoes WHERE fornecedor = ? AND mes = ? ORDER BY id", (fornecedor, mes)
+            ).fetchall()
+        return [arquivo for (arquivo,) in linhas]
+
+    # ---------- versões de PDF ----------
+    def gravar_versao(self, resumo, nome, fornecedor=FORNECEDOR_PADRAO):
+        """Guarda o resumo de uma versão (versoes.resumo_versao). Conteúdo já guardado só atualiza nome e data."""
+        assinatura = assinatura_versao(resumo)
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._conexao() as conexao:
+            existente = conexao.execute(
+                "SELECT id FROM versoes WHERE fornecedor = ? AND assinatura = ?", (fornecedor, assinatura)
+            ).fetchone()
+            if existente:
+                conexao.execute("UPDATE versoes SET nome = ?, gravado_em = ? WHERE id = ?", (nome, agora, existente[0]))
+                return existente[0]
+            funcionarios = [[pagina, cpf, nome_funcionario] for pagina, (cpf, nome_funcionario) in resumo["funcionarios"].items()]
+            versao_id = conexao.execute(
+                "INSERT INTO versoes (fornecedor, assinatura, nome, funcionarios, gravado_em) VALUES (?, ?, ?, ?, ?)",
+                (fornecedor, assinatura, nome, json.dumps(funcionarios, ensure_ascii=False, default=_valor_json), agora),
+            ).lastrowid
+            conexao.executemany(
+                "INSERT INTO versoes_paginas (versao_id, pagina, hash) VALUES (?, ?, ?)",
+                ((versao_id, int(pagina), h) for pagina, h in resumo["hashes"].items()),
+            )
+        return versao_id
+
+    def versao_anterior(self, resumo, fornecedor=FORNECEDOR_PADRAO):
+        """(nome, resumo) da versão guardada que mais compartilha páginas com `resumo` (e não é idêntica a ele), ou None."""
+        hashes = set(resumo["hashes"].values())
+        if not hashes:
+            return None
+        with self._conexao() as conexao:
+            conexao.execute("CREATE TEMP TABLE IF NOT EXISTS hashes_atuais (hash TEXT PRIMARY KEY)")
+            conexao.execute("DELETE FROM hashes_atuais")
+            conexao.executemany("INSERT INTO hashes_atuais (hash) VALUES (?)", ((h,) for h in hashes))
+            melhor = conexao.execute(
+                """
+                SELECT v.id, v.nome, v.funcionarios
+                FROM versoes_paginas p
+                JOIN hashes_atuais a ON a.hash = p.hash
+                JOIN versoes v ON v.id = p.versao_id
+                WHERE v.fornecedor = ? AND v.assinatura != ?
+                GROUP BY v.id
+                ORDER BY COUNT(DISTINCT p.hash) DESC, v.gravado_em DESC, v.id DESC
+                LIMIT 1
+                """,
+                (fornecedor, assinatura_versao(resumo)),
+            ).fetchone()
+            if melhor is None:
+                return None
+            versao_id, nome, funcionarios = melhor
+            paginas = conexao.execute("SELECT pagina, hash FROM versoes_paginas WHERE versao_id = ?", (versao_id,)).fetchall()
+        return nome, {
+            "hashes": dict(paginas),
+            "funcionarios": {pagina: (cpf, nome_funcionario) for pagina, cpf, nome_funcionario in json.loads(funcionarios)},
+        }
+
+    # ---------- consultas ----------
+    def execucoes(self):
+        """Gravações existentes (fornecedor, mes, arquivo, gravado_em, linhas)."""
+        with self._conexao() as conexao:
+            return pd.read_sql_query(
+                """
+                SELECT e.fornecedor, e.mes, e.arquivo, e.gravado_em,
+                       (SELECT COUNT(*) FROM consolidado c WHERE c.execucao_id = e.id) AS funcionarios,
+                       (SELECT COUNT(*) FROM detalhe d WHERE d.execucao_id = e.id) AS linhas_detalhe
+                FROM execucoes e
+                ORDER BY e.fornecedor, e.mes, e.arquivo
+                """,
+                conexao,
+            )
+
+    def _filtros(self, fornecedor, meses, cpf, extra=()):
+        condicoes, parametros = [], []
+        if fornecedor:
+            condicoes.append("fornecedor = ?")
+            parametros.append(fornecedor)
+        if meses is not None:
+            # None: todos os meses; lista vazia: nenhum (SQLite aceita "IN ()", que não casa nada)
+            condicoes.append(f"mes IN ({', '.join('?' * len(meses))})")
+            parametros.extend(meses)
+        if cpf:
+            condicoes.append("cpf = ?")
+            parametros.append(cpf)
+        for condicao, valor in extra:
+            condicoes.append(condicao)
+            parametros.append(valor)
+        return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), parametros
+
+    def _ler(self, tabela, fornecedor, meses, cpf, extra=(), ordem="mes"):
+        where, parametros = self._filtros(fornecedor, meses, cpf, extra)
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                f"SELECT fornecedor, mes, dados FROM {tabela}{where} ORDER BY {ordem}", parametros
+            ).fetchall()
+        return pd.DataFrame([{"fornecedor": f, "mes": m, **json.loads(dados)} for f, m, dados in linhas])
+
+    def consolidado(self, fornecedor=None, meses=None, cpf=None):
+        """Linhas do consolidado (com fornecedor e mes) para os filtros dados."""
+        return self._ler("consolidado", fornecedor, meses, cpf, ordem="mes, fornecedor, rowid")
+
+    def detalhe(self, fornecedor=None, meses=None, cpf=None, data_inicio=None, data_fim=None):
+        """Linhas do detalhe; data_inicio/data_fim em 'aaaa-mm-dd'."""
+        extra = []
+        if data_inicio:
+            extra.append(("data >= ?", data_inicio))
+        if data_fim:
+            extra.append(("data <= ?", data_fim))
+        return self._ler("detalhe", fornecedor, meses, cpf, extra, ordem="cpf, data, rowid")
+
+    def situacoes_por_mes(self, fornecedor=None, meses=None, cpf=None):
+        """Contagem de Situações por cpf e mês (colunas = situações), calculada no banco."""
+        where, parametros = self._filtros(fornecedor, meses, cpf)
+        with self._conexao() as conexao:
+            contagem = pd.read_sql_query(
+                f"SELECT cpf, mes, situacao, COUNT(*) AS quantidade FROM detalhe{where} GROUP BY cpf, mes, situacao",
+                conexao,
+                params=parametros,
+            )
+        if contagem.empty:
+            return contagem
+        return (
+            contagem.pivot_table(index=["cpf", "mes"], columns="situacao", values="quantidade", aggfunc="sum", fill_value=0)
+            .reset_index()
+            .rename_axis(columns=None)
+        )
+
+    def evolucao(self, campo, fornecedor=None, meses=None, cpf=None):
+        """Um campo do consolidado (ex.: 'faltas') por cpf (linhas) e mês (colunas)."""
+        df = self.consolidado(fornecedor, meses, cpf)
+        if df.empty or campo not in df.columns:
+            return pd.DataFrame()
+        # Um funcionário pode ocupar várias páginas (linhas) no mesmo mês: números e
+        # horas (HH:MM, somadas em minutos) são somados
+        if _so_horas(df[campo]):
+            df = df.dropna(subset=[campo])
+            df[campo] = minutos(texto_limpo(df[campo]))
+            tabela = df.pivot_table(index="cpf", columns="mes", values=campo, aggfunc="sum")
+            return tabela.apply(lambda coluna: coluna.map(hhmm, na_action="ignore")).reset_index().rename_axis(columns=None)
+        agregacao = "sum" if pd.api.types.is_numeric_dtype(df[campo]) else "first"
+        return df.pivot_table(index="cpf", columns="mes", values=campo, aggfunc=agregacao).reset_index().rename_axis(columns=None)
@@ -0,0 +1,98 @@
+# =========================
+# Partida a frio do app
+# =========================
+# A tela inicial do Fornecedores.py só precisa do Streamlit e de módulos leves
+# (tarefas, perfil, este). pandas, numpy, pdfplumber, PyMuPDF e openpyxl, via
+# o motor (blitz, cache, exportação...), são importados quando uma aba precisa
+# deles. Para que o primeiro clique em "Iniciar 🚀" não pague essa conta, o app
+# chama aquecer_em_segundo_plano() depois de desenhar a tela inicial: uma
+# thread importa o motor enquanto o usuário lê a página. Um import que chega
+# durante o aquecimento espera o da thread (o lock de import do Python é por
+# módulo) e não importa nada duas vezes.
+#
+# registrar_partida() guarda o tempo até a tela inicial de cada execução do
+# script; a primeira do processo (depois de um scale-up) vai para o stderr,
+# que é o log do container.
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# Na ordem em que o app usa: bibliotecas primeiro, depois os módulos do motor
+MODULOS_MOTOR = (
+    "numpy",
+    "pandas",
+    "pdfplumber",
+    "fitz",
+    "openpyxl",
+    "processamento.fornecedores",
+    "processamento.cache",
+    "processamento.extracao",
+    "processamento.exportacao",
+    "processamento.historico",
+    "processamento.versoes",
+)
+
+# O que o Fornecedores.py importa antes da tela inicial
+MODULOS_TELA_INICIAL = ("streamlit", "processamento.inicializacao", "processamento.perfil", "processamento.tarefas")
+
+_lock = threading.Lock()
+_aquecimento = None
+_partidas = []
+
+
+def pre_carregar(modulos=MODULOS_MOTOR):
+    """Importa `modulos` e devolve {modulo: segundos} (None para os que não puderam ser importados)."""
+    tempos = {}
+    for modulo in modulos:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(modulo)
+        except ImportError as erro:
+            # A aba que usa o módulo mostra o erro de verdade; o aquecimento só segue adiante
+            print(f"aquecimento: {modulo} não importado ({erro})", file=sys.stderr, flush=True)
+            tempos[modulo] = None
+            continue
+        tempos[modulo] = round(time.perf_counter() - inicio, 4)
+    return tempos
+
+
+def aquecer_em_segundo_plano(modulos=MODULOS_MOTOR):
+    """Importa o motor numa thread daemon, uma vez por processo. Devolve a thread."""
+    global _aquecimento
+    with _lock:
+        if _aquecimento is None:
+            _aquecimento = threading.Thread(target=pre_carregar, args=(modulos,), name="aquecimento", daemon=True)
+            _aquecimento.start()
+        return _aquecimento
+
+
+def registrar_partida(segundos):
+    """Guarda o tempo até a tela inicial de uma execução do script; a primeira do processo é a partida a frio."""
+    with _lock:
+        _partidas.append(segundos)
+        primeira = len(_partidas) == 1
+    if primeira:
+        print(f"partida a frio: tela inicial em {segundos:.3f}s", file=sys.stderr, flush=True)
+
+
+def resumo_partida():
+    """{"frio": segundos da primeira execução, "ultima": da mais recente, "execucoes": quantas}, ou None."""
+    with _lock:
+        if not _partidas:
+            return None
+        return {"frio": round(_partidas[0], 4), "ultima": round(_partidas[-1], 4), "execucoes": len(_partidas)}
+
+
+def medir_importacao(modulos, executavel=sys.executable):
+    """Segundos para importar `modulos` num interpretador novo (sem nada em sys.modules)."""
+    codigo = (
+        "import importlib, time\n"
+        "inicio = time.perf_counter()\n"
+        f"for modulo in {tuple(modulos)!r}:\n"
+        "    importlib.import_module(modulo)\n"
+        "print(time.perf_counter() - inicio)\n"
+    )
+    saida = subprocess.run([executavel, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    return float(saida.strip().splitlines()[-1])
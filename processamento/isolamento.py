@@ -0,0 +1,195 @@
+# =========================
+# Extração com tempo máximo por página, em processos isolados
+# =========================
+# Alguns PDFs têm páginas com milhares de objetos vetoriais minúsculos em que o
+# extract_table leva minutos: uma página dessas trava o relatório inteiro.
+# Aqui cada página é extraída por um processo filho (que mantém o PDF aberto e
+# atende uma página por vez) sob um prazo. Página que estoura o prazo tem o
+# processo encerrado e volta para a fila no modo seguinte, mais barato
+# (extracao.MODOS_EXTRACAO: completo -> tabela_simples -> so_texto). Se nem o
+# último modo couber no prazo (ou todos derem erro), a página fica marcada com
+# extracao.PAGINA_COM_FALHA e o relatório sai sem ela. Cada página custa no
+# máximo len(MODOS_EXTRACAO) x o prazo. Uma extração que começa em outro modo
+# (extracao.MODO_TOTAIS, no relatório Consolidado) desce dele direto para o
+# tabela_simples.
+# Os processos filhos não nascem de um fork do processo atual (no app, o
+# servidor do Streamlit, cheio de threads): saem do forkserver (ou spawn, onde
+# não há forkserver). O filho avisa quando o PDF está aberto, e só então o
+# prazo da primeira página começa a contar.
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from .extracao import MODO_COMPLETO, MODOS_EXTRACAO, PAGINA_COM_FALHA, abrir_extrator
+from .perfil import LimiteMemoria, MemoriaExcedida
+
+METODO_INICIO = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _servir_paginas(conexao, fonte, lista_temas, backend, processar, triagem, memoria_max_mb):
+    # Executado no processo filho: recebe (indice, modo) até receber None
+    limite = LimiteMemoria(memoria_max_mb)
+    with abrir_extrator(fonte, backend) as extrator:
+        conexao.send(("pronto",))
+        while True:
+            pedido = conexao.recv()
+            if pedido is None:
+                return
+            indice, modo = pedido
+            inicio = time.perf_counter()
+            try:
+                texto, tabela = extrator.extrair_pagina_modo(indice, modo, triagem)
+                resultado = processar(texto, tabela, indice + 1, lista_temas)
+                classe = extrator.classificar(indice + 1, texto)
+                limite.verificar(extrator.liberar)
+            except MemoriaExcedida as erro:
+                conexao.send(("memoria", str(erro)))
+                return
+            except Exception as erro:
+                conexao.send(("erro", f"{type(erro).__name__}: {erro}"))
+                continue
+            conexao.send(("ok", resultado, time.perf_counter() - inicio, classe))
+
+
+class _Trabalhador:
+    """Processo filho de extração e a página que ele está atendendo."""
+
+    def __init__(self, contexto, argumentos):
+        self.conexao, conexao_filho = contexto.Pipe()
+        self.processo = contexto.Process(
+            target=_servir_paginas, args=(conexao_filho, *argumentos), name="extracao-isolada", daemon=True
+        )
+        self.processo.start()
+        conexao_filho.close()
+        self.pronto = False
+        self.pedido = None
+        self.enviado = None
+        self.prazo = None
+
+    def enviar(self, pedido, modo, tempo_max):
+        if not self.pronto:
+            # Início do processo (imports, abertura do PDF) fica fora do prazo da página
+            try:
+                self.conexao.recv()
+            except (EOFError, OSError):
+                self.matar()
+                raise RuntimeError("O processo de extração isolada terminou antes de abrir o PDF.") from None
+            self.pronto = True
+        self.pedido = pedido
+        self.enviado = time.monotonic()
+        self.prazo = self.enviado + tempo_max
+        self.conexao.send((pedido[0], modo))
+
+    @property
+    def decorrido(self):
+        return time.monotonic() - self.enviado
+
+    def encerrar(self):
+        try:
+            self.conexao.send(None)
+        except OSError:
+            pass
+        self.processo.join(timeout=5)
+        if self.processo.is_alive():
+            self.matar()
+        self.conexao.close()
+
+    def matar(self):
+        self.processo.kill()
+        self.processo.join()
+        self.conexao.close()
+
+
+def escada_modos(modo=MODO_COMPLETO):
+    """Modos tentados em sequência a partir de `modo`: ele e depois os mais baratos que o completo."""
+    return (modo,) + MODOS_EXTRACAO[1:]
+
+
+def extrair_paginas_isoladas(fonte, lista_temas, indices, workers, backend, processar, tempo_max_pagina,
+                             progresso=None, memoria_max_mb=None, triagem=None, modo=MODO_COMPLETO):
+    """Extrai as páginas de `indices` (0-based) com no máximo `tempo_max_pagina` segundos por tentativa.
+
+    Devolve (paginas, degradadas): `paginas` é a lista de (numero_pagina,
+    resultado, segundos, classe), na ordem das páginas, com as que falharam em
+    todos os modos como (numero, None, segundos, PAGINA_COM_FALHA); `degradadas`
+    é {numero_pagina: modo} das páginas que só saíram num modo mais barato.
+    `segundos` soma todas as tentativas da página. `modo` é o primeiro modo tentado.
+    """
+    modos = escada_modos(modo)
+    contexto = multiprocessing.get_context(METODO_INICIO)
+    # O orçamento do arquivo é dividido entre os processos vivos ao mesmo tempo
+    memoria_processo = memoria_max_mb / max(1, workers) if memoria_max_mb else None
+    argumentos = (fonte, lista_temas, backend, processar, triagem, memoria_processo)
+    # (indice, posição em modos)
+    pendentes = deque((indice, 0) for indice in indices)
+    gastos = {}
+    paginas = []
+    degradadas = {}
+    livres = []
+    ocupados = {}
+    total = len(indices)
+
+    def concluir(indice, resultado, classe):
+        paginas.append((indice + 1, resultado, gastos.pop(indice, 0.0), classe))
+        if progresso is not None:
+            progresso(len(paginas), total)
+
+    def tentar_de_novo(pedido):
+        indice, nivel = pedido
+        if nivel + 1 < len(modos):
+            pendentes.append((indice, nivel + 1))
+        else:
+            concluir(indice, None, PAGINA_COM_FALHA)
+
+    try:
+        while pendentes or ocupados:
+            while pendentes and len(ocupados) < max(1, workers):
+                trabalhador = livres.pop() if livres else _Trabalhador(contexto, argumentos)
+                pedido = pendentes.popleft()
+                trabalhador.enviar(pedido, modos[pedido[1]], tempo_max_pagina)
+                ocupados[trabalhador.conexao] = trabalhador
+
+            espera = max(0.0, min(t.prazo for t in ocupados.values()) - time.monotonic())
+            for conexao in wait(list(ocupados), timeout=espera):
+                trabalhador = ocupados.pop(conexao)
+                indice, nivel = trabalhador.pedido
+                try:
+                    mensagem = conexao.recv()
+                except (EOFError, OSError):
+                    # Processo morreu no meio da página (falta de memória, falha no backend)
+                    gastos[indice] = gastos.get(indice, 0.0) + trabalhador.decorrido
+                    trabalhador.matar()
+                    tentar_de_novo(trabalhador.pedido)
+                    continue
+                if mensagem[0] == "memoria":
+                    trabalhador.matar()
+                    raise MemoriaExcedida(mensagem[1])
+                livres.append(trabalhador)
+                if mensagem[0] == "erro":
+                    gastos[indice] = gastos.get(indice, 0.0) + trabalhador.decorrido
+                    tentar_de_novo(trabalhador.pedido)
+                    continue
+                _, resultado, segundos, classe = mensagem
+                gastos[indice] = gastos.get(indice, 0.0) + segundos
+                if nivel > 0:
+                    degradadas[indice + 1] = modos[nivel]
+                concluir(indice, resultado, classe)
+
+            agora = time.monotonic()
+            for conexao, trabalhador in list(ocupados.items()):
+                if trabalhador.prazo <= agora:
+                    # Estourou o prazo: o processo é descartado com a página no meio
+                    del ocupados[conexao]
+                    trabalhador.matar()
+                    indice = trabalhador.pedido[0]
+                    gastos[indice] = gastos.get(indice, 0.0) + trabalhador.decorrido
+                    tentar_de_novo(trabalhador.pedido)
+    finally:
+        for trabalhador in list(ocupados.values()):
+            trabalhador.matar()
+        for trabalhador in livres:
+            trabalhador.encerrar()
+
+    paginas.sort(key=lambda pagina: pagina[0])
+    return paginas, degradadas
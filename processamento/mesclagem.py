@@ -0,0 +1,154 @@
+# =========================
+# Mesclagem de vários PDFs do mesmo fornecedor num só relatório
+# =========================
+# A Blitz manda um PDF por unidade ou por quinzena. Aqui os relatórios de cada
+# arquivo (montar_relatorios, já com as regras) são juntados sem as contagens
+# de Situação, que são refeitas uma vez sobre o conjunto inteiro
+# (blitz.finalizar_relatorios).
+#
+#   - cada linha ganha a coluna arquivo_origem;
+#   - no consolidado, primeiro as páginas de um mesmo cpf em cada arquivo
+#     viram uma linha, depois as linhas do cpf nos vários arquivos viram uma
+#     só: contagens e horas (HH:MM) são somadas, status fica NOK se alguma
+#     linha for NOK, os demais campos ficam com o primeiro valor e
+#     arquivo_origem lista os arquivos;
+#   - no detalhe, um dia (cpf + data) que já veio de um arquivo anterior é
+#     descartado (períodos sobrepostos).
+# Os totais do consolidado vêm do cabeçalho de cada página e não dá para
+# tirar deles um dia repetido: o dia sai do detalhe, mas continua somado nos
+# totais. A coluna dias_sobrepostos do consolidado conta, por cpf, esses
+# dias, e o app e a linha de comando avisam. Os períodos dos arquivos devem
+# ser disjuntos; arquivos idênticos devem ser descartados antes (mesmo hash).
+import re
+
+import pandas as pd
+
+from .blitz import COLUNAS_DETALHE
+from .tempos import hhmm
+
+COLUNA_ORIGEM = "arquivo_origem"
+# Dias do cpf descartados do detalhe por já virem de outro arquivo (contados em dobro nos totais)
+COLUNA_SOBREPOSTOS = "dias_sobrepostos"
+SEPARADOR_ORIGEM = ", "
+# Posição no PDF: não faz sentido somar, fica a do primeiro arquivo
+CAMPOS_PRIMEIRO_VALOR = {"pagina"}
+# Colunas de contagem do detalhe ("Qtd - <situação>"); no consolidado a contagem é a coluna <situação>
+PREFIXO_QTD = "Qtd - "
+
+_HORA = re.compile(r"^\d{1,3}:\d{2}$")
+
+
+def _eh_hora(valor):
+    return isinstance(valor, str) and bool(_HORA.match(valor))
+
+
+def _somar_horas(valores):
+    total = 0
+    for valor in valores:
+        horas, minutos = valor.split(":")
+        total += int(horas) * 60 + int(minutos)
+    return hhmm(total)
+
+
+def _combinar_campo(campo, valores):
+    presentes = [valor for valor in valores if valor is not None]
+    if not presentes:
+        return None
+    if campo == COLUNA_ORIGEM:
+        return SEPARADOR_ORIGEM.join(dict.fromkeys(presentes))
+    if campo in CAMPOS_PRIMEIRO_VALOR:
+        return presentes[0]
+    if campo == "status":
+        return "NOK" if "NOK" in presentes else presentes[0]
+    if all(isinstance(valor, int) and not isinstance(valor, bool) for valor in presentes):
+        return sum(presentes)
+    if all(_eh_hora(valor) for valor in presentes):
+        return _somar_horas(presentes)
+    return presentes[0]
+
+
+def combinar_funcionarios(registros):
+    """Junta os registros de cabeçalho de um mesmo cpf num só (ver regras no topo do arquivo)."""
+    if len(registros) == 1:
+        return dict(registros[0])
+    campos = list(dict.fromkeys(campo for registro in registros for campo in registro))
+    return {campo: _combinar_campo(campo, [registro.get(campo) for registro in registros]) for campo in campos}
+
+
+def _sem_contagens(df_consolidado, df_detalhe):
+    """Os dois relatórios de um arquivo sem as contagens de Situação (refeitas depois da mesclagem)."""
+    if df_detalhe is None:
+        return df_consolidado, None
+    qtd = [coluna for coluna in df_detalhe.columns if str(coluna).startswith(PREFIXO_QTD)]
+    if df_consolidado is not None:
+        situacoes = {coluna[len(PREFIXO_QTD):] for coluna in qtd} - {"cpf"}
+        df_consolidado = df_consolidado.drop(columns=[coluna for coluna in df_consolidado.columns if coluna in situacoes])
+    return df_consolidado, df_detalhe.drop(columns=qtd)
+
+
+def _mesclar_detalhe(detalhes):
+    """Concatena os detalhes [(nome_arquivo, df)]; um dia (cpf + data) já visto num arquivo anterior sai.
+
+    Devolve (df, {cpf: dias descartados}).
+    """
+    partes = []
+    for nome_arquivo, df in detalhes:
+        # arquivo_origem logo depois das colunas extraídas, antes das colunas das regras
+        posicao = next((i for i, coluna in enumerate(df.columns) if coluna not in COLUNAS_DETALHE), len(df.columns))
+        partes.append(df.copy())
+        partes[-1].insert(posicao, COLUNA_ORIGEM, nome_arquivo)
+    df = pd.concat(partes, ignore_index=True)
+    cpf = df["cpf"].astype(object)
+    data = df["data"].astype(object)
+    # Como no relatório de um arquivo só, linhas sem cpf ou sem data nunca são descartadas
+    com_chave = cpf.notna() & (cpf != "") & data.notna() & (data != "")
+    primeiro = df.loc[com_chave].groupby([cpf[com_chave], data[com_chave]], sort=False)[COLUNA_ORIGEM].transform("first")
+    repetido = pd.Series(False, index=df.index)
+    repetido[com_chave] = (df.loc[com_chave, COLUNA_ORIGEM] != primeiro).to_numpy()
+    return df.loc[~repetido].reset_index(drop=True), cpf[repetido].value_counts().to_dict()
+
+
+def _mesclar_consolidado(consolidados, sobrepostos=None):
+    """Junta os consolidados [(nome_arquivo, df)] pelas regras do topo do arquivo.
+
+    `sobrepostos` ({cpf: dias}, do detalhe) vira a coluna dias_sobrepostos; None: sem detalhe, sem a coluna.
+    """
+    # cpf -> [uma linha por arquivo, já com as páginas do arquivo juntadas]
+    por_cpf = {}
+    sem_cpf = []
+    for nome_arquivo, df in consolidados:
+        paginas = {}
+        for funcionario in df.to_dict("records"):
+            funcionario[COLUNA_ORIGEM] = nome_arquivo
+            if funcionario.get("cpf"):
+                paginas.setdefault(funcionario["cpf"], []).append(funcionario)
+            else:
+                sem_cpf.append(funcionario)
+        for cpf, registros in paginas.items():
+            por_cpf.setdefault(cpf, []).append(combinar_funcionarios(registros))
+
+    df = pd.DataFrame([combinar_funcionarios(registros) for registros in por_cpf.values()] + sem_cpf)
+    if sobrepostos is not None:
+        df[COLUNA_SOBREPOSTOS] = [sobrepostos.get(cpf, 0) if cpf else 0 for cpf in df["cpf"]]
+    return df.fillna(0)
+
+
+def mesclar_relatorios(arquivos):
+    """Junta os relatórios de vários arquivos.
+
+    `arquivos` é uma lista de (nome_arquivo, df_consolidado_final, df_detalhe)
+    de montar_relatorios, na ordem de prioridade (relatório fora do escopo:
+    None). Devolve (df_consolidado, df_detalhe, dias_descartados), sem as
+    contagens de Situação, para blitz.finalizar_relatorios.
+    """
+    consolidados, detalhes = [], []
+    for nome_arquivo, df_consolidado, df_detalhe in arquivos:
+        df_consolidado, df_detalhe = _sem_contagens(df_consolidado, df_detalhe)
+        if df_consolidado is not None:
+            consolidados.append((nome_arquivo, df_consolidado))
+        if df_detalhe is not None:
+            detalhes.append((nome_arquivo, df_detalhe))
+
+    df_detalhe, sobrepostos = _mesclar_detalhe(detalhes) if detalhes else (None, None)
+    df_consolidado = _mesclar_consolidado(consolidados, sobrepostos) if consolidados else None
+    return df_consolidado, df_detalhe, sum(sobrepostos.values()) if sobrepostos else 0
@@ -0,0 +1,249 @@
+# =========================
+# Modelo de layout da tabela de ponto
+# =========================
+# Todas as páginas de um export da Blitz têm a tabela no mesmo lugar: mesmas
+# colunas, mesmo topo, mesmo cabeçalho; só o número de linhas muda. O extrator
+# aprende esse modelo da primeira página em que a detecção completa da tabela
+# (extract_table / find_tables, a parte mais cara da página) encontra a tabela
+# inteira: cabeçalho ... TOTAIS, sem células mescladas. Nas páginas seguintes a
+# tabela é montada direto:
+#   - colunas: as divisas x do modelo;
+#   - linhas: os traços horizontais que cobrem toda a largura da tabela, do topo
+#     do modelo para baixo;
+#   - cada caractere (ou palavra, no PyMuPDF) vai para a célula que contém o seu
+#     centro, o mesmo critério do pdfplumber.
+# Se a tabela montada não bate com o modelo (topo ou cabeçalho diferentes, sem
+# linha TOTAIS), a página volta para a detecção completa, que pode ensinar um
+# modelo novo.
+#
+# O relatório Consolidado só usa o cabeçalho e a linha TOTAIS da tabela
+# (extracao.MODO_TOTAIS): totais_pelo_modelo monta só essas duas linhas. Na
+# página que não bate com o modelo, faixas_totais acha as duas linhas pelos
+# traços em volta da palavra TOTAIS: o extrator detecta a tabela só dentro de
+# cada faixa e juntar_linhas alinha as duas pelas colunas, como no extract_table.
+import bisect
+from dataclasses import dataclass
+
+# Mesma tolerância do snap_tolerance padrão do pdfplumber (em pontos)
+TOLERANCIA = 3
+# Fração da largura da tabela que um traço horizontal precisa cobrir para ser divisa de linha
+COBERTURA_MINIMA = 0.95
+
+
+@dataclass(frozen=True)
+class ModeloLayout:
+    """Tabela de ponto aprendida: x das divisas das colunas, y do topo e textos do cabeçalho."""
+    colunas: tuple
+    topo: float
+    cabecalho: tuple
+
+
+def _agrupar(valores):
+    """Valores ordenados agrupados pela TOLERANCIA; cada grupo vira a sua média."""
+    grupos = []
+    for valor in sorted(valores):
+        if grupos and valor - grupos[-1][-1] <= TOLERANCIA:
+            grupos[-1].append(valor)
+        else:
+            grupos.append([valor])
+    return [sum(grupo) / len(grupo) for grupo in grupos]
+
+
+def _eh_totais(linha):
+    return bool(linha) and bool(linha[0]) and "TOTAIS" in str(linha[0]).upper()
+
+
+def aprender_modelo(celulas, tabela):
+    """ModeloLayout da tabela detectada, ou None se ela não serve de modelo.
+
+    `celulas` são as caixas (x0, top, x1, bottom) da tabela e `tabela` o texto
+    das linhas, como o backend os entregou.
+    """
+    if not tabela or not celulas or not _eh_totais(tabela[-1]) or any(caixa is None for caixa in celulas):
+        return None
+    colunas = _agrupar([caixa[0] for caixa in celulas] + [caixa[2] for caixa in celulas])
+    quantidade = len(colunas) - 1
+    # Grade completa: toda linha com todas as colunas, nenhuma célula mesclada
+    if len(celulas) != len(tabela) * quantidade:
+        return None
+    if any(len(linha) != quantidade or any(celula is None for celula in linha) for linha in tabela):
+        return None
+    return ModeloLayout(tuple(colunas), min(caixa[1] for caixa in celulas), tuple(tabela[0]))
+
+
+def limites_linhas(modelo, horizontais):
+    """y das divisas das linhas: traços horizontais (x0, x1, y) que cobrem a largura da tabela, do topo para baixo."""
+    esquerda, direita = modelo.colunas[0], modelo.colunas[-1]
+    # Traços menores que meia coluna não são borda de célula (e, aos milhares, juntariam todas as alturas num grupo só)
+    minimo = min(b - a for a, b in zip(modelo.colunas, modelo.colunas[1:])) / 2
+    horizontais = [(x0, x1, y) for x0, x1, y in horizontais if x1 - x0 >= minimo and y >= modelo.topo - TOLERANCIA]
+    trechos = {}
+    for y in _agrupar([y for _, _, y in horizontais]):
+        trechos[y] = []
+    if not trechos:
+        return []
+    alturas = sorted(trechos)
+    for x0, x1, y in horizontais:
+        posicao = bisect.bisect_left(alturas, y - TOLERANCIA)
+        if posicao < len(alturas) and abs(alturas[posicao] - y) <= TOLERANCIA:
+            trechos[alturas[posicao]].append((max(x0, esquerda), min(x1, direita)))
+
+    limites = []
+    for y in alturas:
+        coberto = 0.0
+        fim_anterior = esquerda
+        for x0, x1 in sorted(trechos[y]):
+            if x1 > fim_anterior:
+                coberto += x1 - max(x0, fim_anterior)
+                fim_anterior = x1
+        if coberto >= COBERTURA_MINIMA * (direita - esquerda):
+            limites.append(y)
+    return limites
+
+
+def tabela_pelo_modelo(modelo, horizontais, itens, texto_celula):
+    """Tabela montada pelo modelo (lista de linhas, cabeçalho ... TOTAIS), ou None se a página não bate com ele.
+
+    `horizontais` são os traços horizontais da página como (x0, x1, y); `itens`
+    são (x_centro, y_centro, item) na ordem de leitura e `texto_celula(itens)`
+    junta os itens de uma célula no texto dela.
+    """
+    limites = limites_linhas(modelo, horizontais)
+    if len(limites) < 2 or abs(limites[0] - modelo.topo) > TOLERANCIA:
+        return None
+    quantidade = len(modelo.colunas) - 1
+    grade = [[[] for _ in range(quantidade)] for _ in range(len(limites) - 1)]
+    for x, y, item in itens:
+        coluna = bisect.bisect_right(modelo.colunas, x) - 1
+        linha = bisect.bisect_right(limites, y) - 1
+        if 0 <= coluna < quantidade and 0 <= linha < len(grade):
+            grade[linha][coluna].append(item)
+
+    tabela = []
+    for celulas in grade:
+        tabela.append([texto_celula(celula) if celula else "" for celula in celulas])
+        if _eh_totais(tabela[-1]):
+            break
+    else:
+        return None
+    if tuple(tabela[0]) != modelo.cabecalho:
+        return None
+    return tabela
+
+
+def totais_pelo_modelo(modelo, horizontais, itens, texto_celula, palavras):
+    """[cabeçalho, linha TOTAIS] montados pelo modelo, ou None se a página não bate com ele.
+
+    Como tabela_pelo_modelo, mas só as duas linhas recebem os itens: a linha
+    TOTAIS é a da primeira `palavras` (caixas (x0, top, x1, bottom) do TOTAIS)
+    que cai na primeira coluna.
+    """
+    limites = limites_linhas(modelo, horizontais)
+    if len(limites) < 2 or abs(limites[0] - modelo.topo) > TOLERANCIA:
+        return None
+    linha_totais = None
+    for x0, top, x1, bottom in sorted(palavras, key=lambda palavra: palavra[1]):
+        linha = bisect.bisect_right(limites, (top + bottom) / 2) - 1
+        if modelo.colunas[0] <= (x0 + x1) / 2 < modelo.colunas[1] and 0 < linha < len(limites) - 1:
+            linha_totais = linha
+            break
+    if linha_totais is None:
+        return None
+    quantidade = len(modelo.colunas) - 1
+    grade = {0: [[] for _ in range(quantidade)], linha_totais: [[] for _ in range(quantidade)]}
+    for x, y, item in itens:
+        linha = bisect.bisect_right(limites, y) - 1
+        if linha in grade:
+            coluna = bisect.bisect_right(modelo.colunas, x) - 1
+            if 0 <= coluna < quantidade:
+                grade[linha][coluna].append(item)
+
+    tabela = [[texto_celula(celula) if celula else "" for celula in grade[linha]] for linha in (0, linha_totais)]
+    if tuple(tabela[0]) != modelo.cabecalho or not _eh_totais(tabela[1]):
+        return None
+    return tabela
+
+
+def _cobre(trechos, x0, x1):
+    """Os trechos (x0, x1) de um traço, emendados pela TOLERANCIA, cobrem [x0, x1]?"""
+    fim = None
+    for inicio, final in sorted(trechos):
+        if fim is None:
+            if inicio > x0 + TOLERANCIA:
+                return False
+            fim = final
+        elif inicio <= fim + TOLERANCIA:
+            fim = max(fim, final)
+        else:
+            break
+        if fim >= x1 - TOLERANCIA:
+            return True
+    return False
+
+
+def faixas_totais(horizontais, verticais, palavra):
+    """(esquerda, faixa do cabeçalho, faixa da linha TOTAIS) da tabela em volta da palavra, ou None.
+
+    `horizontais` são os traços (x0, x1, y), `verticais` os traços (x, top,
+    bottom) e `palavra` a caixa (x0, top, x1, bottom) do TOTAIS. As faixas são
+    (top, bottom): a linha TOTAIS fica entre os traços que cobrem a palavra logo
+    acima e logo abaixo dela; o cabeçalho é a primeira linha da tabela, cujo topo
+    está no alto da borda esquerda.
+    """
+    x0, top, x1, bottom = palavra
+    meio = (top + bottom) / 2
+    # Só os traços sobre a palavra, e não os minúsculos (aos milhares, juntariam todas as alturas num grupo só)
+    minimo = (x1 - x0) / 2
+    horizontais = [
+        (inicio, fim, y) for inicio, fim, y in horizontais
+        if fim - inicio >= minimo and inicio <= x1 + TOLERANCIA and fim >= x0 - TOLERANCIA
+    ]
+    alturas = _agrupar([y for _, _, y in horizontais])
+    if not alturas:
+        return None
+    trechos = {y: [] for y in alturas}
+    for inicio, fim, y in horizontais:
+        posicao = bisect.bisect_left(alturas, y - TOLERANCIA)
+        if posicao < len(alturas) and abs(alturas[posicao] - y) <= TOLERANCIA:
+            trechos[alturas[posicao]].append((inicio, fim))
+    limites = [y for y in alturas if _cobre(trechos[y], x0, x1)]
+    acima = [y for y in limites if y <= meio]
+    abaixo = [y for y in limites if y > meio]
+    if not acima or not abaixo:
+        return None
+    faixa_totais = (acima[-1], abaixo[0])
+
+    # Borda esquerda: o traço vertical mais próximo à esquerda da palavra que atravessa a linha TOTAIS
+    bordas = [
+        x for x, inicio, fim in verticais
+        if x <= x0 + TOLERANCIA and inicio <= faixa_totais[0] + TOLERANCIA and fim >= faixa_totais[1] - TOLERANCIA
+    ]
+    if not bordas:
+        return None
+    esquerda = max(bordas)
+    # Topo da tabela: sobe pelos trechos emendados da borda esquerda
+    topo = faixa_totais[0]
+    for inicio, fim in sorted(((inicio, fim) for x, inicio, fim in verticais if abs(x - esquerda) <= TOLERANCIA),
+                              key=lambda trecho: -trecho[1]):
+        if inicio < topo - TOLERANCIA and fim >= topo - TOLERANCIA:
+            topo = inicio
+    abaixo_topo = [y for y in limites if y > topo + TOLERANCIA]
+    if not abaixo_topo:
+        return None
+    return esquerda, (topo, abaixo_topo[0]), faixa_totais
+
+
+def juntar_linhas(linhas):
+    """Linhas de células [(x0, texto)] de recortes diferentes numa tabela só, alinhadas pelo x0 das células.
+
+    As colunas são os x0 de todas as células, como no extract_table: a coluna
+    sem célula numa linha fica None.
+    """
+    colunas = _agrupar([x for linha in linhas for x, _ in linha])
+    tabela = []
+    for linha in linhas:
+        textos = [None] * len(colunas)
+        for x, texto in linha:
+            textos[min(range(len(colunas)), key=lambda coluna: abs(colunas[coluna] - x))] = texto
+        tabela.append(textos)
+    return tabela
@@ -0,0 +1,99 @@
+# =========================
+# OCR das páginas escaneadas
+# =========================
+# Páginas só com imagem não têm texto nem tabela para o pdfplumber/PyMuPDF e
+# antes sumiam do relatório. Aqui elas são rasterizadas (pdf2image/poppler),
+# lidas pelo Tesseract em português em processos paralelos e o texto volta para
+# o mesmo parser de cabeçalho e justificativas.
+#
+# O OCR é de longe a etapa mais cara, então o texto de cada página fica em cache
+# pelo hash do conteúdo da página (+ DPI e idioma).
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pytesseract
+from pdf2image import convert_from_bytes, convert_from_path
+
+from .blitz import dividir_paginas, resolver_workers
+from .extracao import abrir_documento, hash_pagina
+
+
+@dataclass
+class OpcoesOCR:
+    dpi: int = 300
+    idioma: str = "por"
+    workers: int = 1
+    # CacheResultados (ou qualquer objeto com get/put) para o texto por página
+    cache: object = None
+
+
+def eh_pagina_imagem(pagina):
+    """Página sem texto extraível, mas com pelo menos uma imagem (página escaneada)."""
+    return not pagina.get_text().strip() and bool(pagina.get_images())
+
+
+def _chave_ocr(hash_conteudo, opcoes):
+    return hashlib.sha256(f"ocr|{hash_conteudo}|{opcoes.dpi}|{opcoes.idioma}".encode("utf-8")).hexdigest()
+
+
+def _rasterizar(fonte, numero_pagina, dpi):
+    if isinstance(fonte, bytes):
+        imagens = convert_from_bytes(fonte, dpi=dpi, first_page=numero_pagina, last_page=numero_pagina)
+    else:
+        imagens = convert_from_path(fonte, dpi=dpi, first_page=numero_pagina, last_page=numero_pagina)
+    return imagens[0]
+
+
+def _ocr_bloco(fonte, numeros_paginas, dpi, idioma):
+    # Executado no processo filho
+    textos = {}
+    for numero in numeros_paginas:
+        imagem = _rasterizar(fonte, numero, dpi)
+        textos[numero] = pytesseract.image_to_string(imagem, lang=idioma)
+    return textos
+
+
+def ler_paginas_escaneadas(fonte, numeros_paginas, opcoes):
+    """OCR das páginas (1-based) que forem só imagem. Devolve {numero_pagina: texto}."""
+    documento = abrir_documento(fonte)
+    try:
+        hashes = {}
+        for numero in numeros_paginas:
+            pagina = documento[numero - 1]
+            if eh_pagina_imagem(pagina):
+                hashes[numero] = hash_pagina(documento, pagina)
+    finally:
+        documento.close()
+
+    textos = {}
+    pendentes = []
+    for numero, hash_conteudo in hashes.items():
+        texto = opcoes.cache.get(_chave_ocr(hash_conteudo, opcoes)) if opcoes.cache is not None else None
+        if texto is None:
+            pendentes.append(numero)
+        else:
+            textos[numero] = texto
+
+    if pendentes:
+        workers = resolver_workers(opcoes.workers)
+        blocos = [pendentes[inicio:fim] for inicio, fim in dividir_paginas(len(pendentes), workers)]
+        if workers > 1 and len(blocos) > 1:
+            with ProcessPoolExecutor(max_workers=len(blocos)) as executor:
+                lidos = executor.map(
+                    _ocr_bloco,
+                    [fonte] * len(blocos),
+                    blocos,
+                    [opcoes.dpi] * len(blocos),
+                    [opcoes.idioma] * len(blocos),
+                )
+                for bloco in lidos:
+                    textos.update(bloco)
+        else:
+            textos.update(_ocr_bloco(fonte, pendentes, opcoes.dpi, opcoes.idioma))
+
+        if opcoes.cache is not None:
+            for numero in pendentes:
+                opcoes.cache.put(_chave_ocr(hashes[numero], opcoes), textos[numero])
+
+    return textos
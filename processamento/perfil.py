@@ -0,0 +1,169 @@
+# =========================
+# Medição de tempo por etapa (e cProfile opcional)
+# =========================
+# Um Perfil acompanha uma execução do fluxo da Blitz: para cada etapa
+# (extração, OCR, regras, contagem de Situações, exportação...) guarda tempo de
+# parede, contagens (páginas, linhas) e variação de memória; da extração guarda
+# também as páginas mais lentas. As funções do motor recebem `perfil=None` e só
+# medem quando um Perfil é passado.
+#
+# Com profundo=True a execução inteira roda sob cProfile, para anexar a
+# evidência a um chamado de desempenho (estatisticas() em texto, dados_cprofile()
+# no formato .prof do pstats/snakeviz). Só o processo principal é perfilado: com
+# workers > 1 as páginas extraídas nos processos filhos aparecem como espera.
+import cProfile
+import gc
+import io
+import json
+import marshal
+import os
+import pstats
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PAGINAS_MAIS_LENTAS = 10
+
+
+def rss_atual_mb():
+    """Memória residente atual do processo, em MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Sem /proc: usa o pico do processo (KB no Linux, bytes no macOS)
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+class MemoriaExcedida(MemoryError):
+    """O processamento passou do orçamento de memória (LimiteMemoria)."""
+
+
+class LimiteMemoria:
+    """Orçamento de memória de uma extração: crescimento máximo da memória do processo desde a criação, em MB.
+
+    verificar() é chamado a cada página: passando do limite, solta caches
+    (liberar + coleta de lixo) e, se ainda assim não couber, interrompe com
+    MemoriaExcedida. A memória medida é a do processo inteiro, então o limite
+    só é criado nos processos da extração, que atendem um arquivo só (pool da
+    extração, processos isolados), nunca no servidor compartilhado pelas
+    sessões. tracemalloc contaria por alocação, mas deixa a extração algumas
+    vezes mais lenta.
+    """
+
+    def __init__(self, limite_mb=None):
+        self.limite_mb = limite_mb
+        self.base_mb = rss_atual_mb() if limite_mb else 0.0
+
+    def crescimento_mb(self):
+        return rss_atual_mb() - self.base_mb
+
+    def verificar(self, liberar=None):
+        if not self.limite_mb or self.crescimento_mb() <= self.limite_mb:
+            return
+        if liberar is not None:
+            liberar()
+        gc.collect()
+        crescimento = self.crescimento_mb()
+        if crescimento > self.limite_mb:
+            raise MemoriaExcedida(
+                f"Memória do processamento passou do limite: +{crescimento:.0f} MB (limite {self.limite_mb:.0f} MB)."
+            )
+
+
+class Perfil:
+    def __init__(self, profundo=False):
+        self.inicio = datetime.now()
+        self.etapas = []
+        self.paginas_lentas = []
+        self.classificacao_paginas = {}
+        self.profundo = profundo
+        self._cprofile = cProfile.Profile() if profundo else None
+        self._ativo = False
+
+    @contextmanager
+    def etapa(self, nome, **contagens):
+        """Mede o bloco como uma etapa. O dict devolvido aceita contagens calculadas dentro do bloco."""
+        registro = {"etapa": nome, **contagens}
+        memoria_antes = rss_atual_mb()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["segundos"] = round(time.perf_counter() - inicio, 4)
+            registro["memoria_delta_mb"] = round(rss_atual_mb() - memoria_antes, 1)
+            self.etapas.append(registro)
+
+    def registrar_paginas(self, tempos_paginas, quantidade=PAGINAS_MAIS_LENTAS):
+        """Guarda as páginas mais lentas a partir de {numero_pagina: segundos}."""
+        mais_lentas = sorted(tempos_paginas.items(), key=lambda item: item[1], reverse=True)[:quantidade]
+        self.paginas_lentas = [{"pagina": numero, "segundos": round(segundos, 4)} for numero, segundos in mais_lentas]
+
+    def registrar_classificacao(self, classificacao):
+        """Guarda quantas páginas ficaram em cada classe da triagem ({numero_pagina: classe})."""
+        contagem = {}
+        for classe in classificacao.values():
+            contagem[classe] = contagem.get(classe, 0) + 1
+        self.classificacao_paginas = contagem
+
+    @contextmanager
+    def execucao(self):
+        """Envolve a execução inteira; no modo profundo, liga o cProfile durante o bloco."""
+        if self._cprofile is None or self._ativo:
+            yield self
+            return
+        self._ativo = True
+        self._cprofile.enable()
+        try:
+            yield self
+        finally:
+            self._cprofile.disable()
+            self._ativo = False
+
+    @property
+    def total_segundos(self):
+        return round(sum(registro["segundos"] for registro in self.etapas), 4)
+
+    def resumo(self):
+        return {
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "total_segundos": self.total_segundos,
+            "etapas": self.etapas,
+            "paginas_mais_lentas": self.paginas_lentas,
+            "classificacao_paginas": self.classificacao_paginas,
+            "cprofile": self.profundo,
+        }
+
+    def json(self):
+        return json.dumps(self.resumo(), indent=2, ensure_ascii=False)
+
+    def estatisticas(self, ordenar_por="cumulative", limite=40):
+        """Relatório do cProfile em texto (vazio fora do modo profundo)."""
+        if self._cprofile is None:
+            return ""
+        saida = io.StringIO()
+        pstats.Stats(self._cprofile, stream=saida).strip_dirs().sort_stats(ordenar_por).print_stats(limite)
+        return saida.getvalue()
+
+    def dados_cprofile(self):
+        """Estatísticas brutas do cProfile no formato .prof (abrir com pstats ou snakeviz)."""
+        if self._cprofile is None:
+            raise RuntimeError("Perfil criado sem profundo=True: não há dados do cProfile.")
+        self._cprofile.create_stats()
+        return marshal.dumps(self._cprofile.stats)
+
+
+def etapa(perfil, nome, **contagens):
+    """perfil.etapa(...) quando há um Perfil; senão um bloco que não mede nada."""
+    if perfil is None:
+        return nullcontext(dict(contagens))
+    return perfil.etapa(nome, **contagens)
+
+
+def execucao(perfil):
+    if perfil is None:
+        return nullcontext()
+    return perfil.execucao()
@@ -0,0 +1,130 @@
+# =========================
+# Regras da coluna "Situação" em forma de tabela
+# =========================
+# Antes a Situação saía de uma cadeia de DataFrame.apply(axis=1)
+# (determinar_situacao -> reavaliar_situacao -> "-" em ent_1 -> pegar_correcao
+# -> regra_numero_inicio -> maiúsculas -> previsto). Aqui a mesma lógica é uma
+# tabela ordenada de regras avaliada de uma vez com np.select: vale a primeira
+# regra cuja condição é verdadeira na linha. Os ajustes finais (maiúsculas e
+# troca de "DIA NÃO PREVISTO" pelo previsto) ficam numa segunda tabela curta.
+#
+# Para uma regra nova de fornecedor, acrescente uma Regra na posição certa de
+# REGRAS_SITUACAO; as condições e resultados recebem o contexto abaixo.
+#
+# Obs.: a antiga troca "Situação com cara de horário -> correção" nunca dispara:
+# o primeiro texto das marcações é, por definição, um texto que não é horário
+# válido, e os demais rótulos são fixos. Por isso ela não aparece na tabela.
+from dataclasses import dataclass
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+from .tempos import CAMPOS_MARCACAO, por_categoria, texto_limpo
+
+
+@dataclass(frozen=True)
+class Regra:
+    nome: str
+    condicao: Callable[[dict], pd.Series]
+    # Texto fixo ou função do contexto que devolve uma série
+    resultado: Union[str, Callable[[dict], pd.Series]]
+
+
+def contexto_situacao(df_detalhe):
+    """Séries usadas pelas regras, calculadas uma vez a partir das colunas <campo>_txt/_valido."""
+    textos = [df_detalhe[col + "_txt"] for col in CAMPOS_MARCACAO]
+    validos = [df_detalhe[col + "_valido"] for col in CAMPOS_MARCACAO]
+    eh_texto = [(t != "") & ~v for t, v in zip(textos, validos)]
+
+    # Primeira marcação que é texto livre (ex.: ATESTADO, FOLGA), em maiúsculas
+    primeiro_texto = np.select(eh_texto, [t.str.upper() for t in textos], default="")
+    primeiro_texto = pd.Series(primeiro_texto, index=df_detalhe.index, dtype=object)
+
+    previsto = texto_limpo(df_detalhe["previsto"]) if "previsto" in df_detalhe.columns else pd.Series("", index=df_detalhe.index)
+
+    return {
+        "traco_ent_1": por_categoria(df_detalhe["ent_1"], lambda valores: valores.astype(str).str.contains("-", na=False)),
+        "tem_texto": np.logical_or.reduce(eh_texto),
+        "primeiro_texto": primeiro_texto,
+        "texto_comeca_com_numero": primeiro_texto.str[:1].str.isdigit().fillna(False).astype(bool),
+        "todos_validos": np.logical_and.reduce(validos),
+        "algum_valido": np.logical_or.reduce(validos),
+        "total_trabalhado_ok": df_detalhe["total_trabalhado_valido"] & (df_detalhe["total_trabalhado_txt"] != "00:00"),
+        "previsto": previsto,
+        "previsto_maiusculo": previsto.str.upper(),
+    }
+
+
+REGRAS_SITUACAO = [
+    Regra("traço em ent_1",
+          lambda c: c["traco_ent_1"],
+          "Dia não previsto"),
+    Regra("texto começando com número, com horas trabalhadas",
+          lambda c: c["tem_texto"] & c["texto_comeca_com_numero"] & c["total_trabalhado_ok"],
+          "Dia normal de trabalho"),
+    Regra("texto começando com número, usa o previsto",
+          lambda c: c["tem_texto"] & c["texto_comeca_com_numero"] & (c["previsto"] != ""),
+          lambda c: c["previsto_maiusculo"]),
+    Regra("texto começando com número, sem previsto",
+          lambda c: c["tem_texto"] & c["texto_comeca_com_numero"],
+          "Dia não previsto"),
+    Regra("justificativa em texto nas marcações",
+          lambda c: c["tem_texto"],
+          lambda c: c["primeiro_texto"]),
+    Regra("todas as marcações válidas",
+          lambda c: c["todos_validos"],
+          "Dia normal de trabalho"),
+    Regra("marcações parciais",
+          lambda c: c["algum_valido"],
+          "Presença parcial"),
+    Regra("sem marcações, com total trabalhado",
+          lambda c: c["total_trabalhado_ok"],
+          "Dia normal de trabalho"),
+]
+
+SITUACAO_PADRAO = "Dia não previsto"
+
+# Aplicados em ordem sobre o resultado da tabela principal
+AJUSTES_SITUACAO = [
+    Regra("padroniza em maiúsculas",
+          lambda c: pd.Series(True, index=c["situacao"].index),
+          lambda c: c["situacao"].astype(str).str.strip().str.upper()),
+    Regra("dia não previsto com previsto preenchido usa o previsto",
+          lambda c: (c["situacao"] == "DIA NÃO PREVISTO") & ~c["previsto"].isin(["", "-"]),
+          lambda c: c["previsto_maiusculo"]),
+]
+
+
+def _valores(resultado, contexto, tamanho):
+    if callable(resultado):
+        return np.asarray(resultado(contexto), dtype=object)
+    return np.full(tamanho, resultado, dtype=object)
+
+
+def avaliar_regras(contexto, regras, padrao, tamanho):
+    """Primeira regra verdadeira vence (np.select)."""
+    condicoes = [np.asarray(regra.condicao(contexto), dtype=bool) for regra in regras]
+    escolhas = [_valores(regra.resultado, contexto, tamanho) for regra in regras]
+    return np.select(condicoes, escolhas, default=np.full(tamanho, padrao, dtype=object))
+
+
+def calcular_situacao(df_detalhe, regras=REGRAS_SITUACAO, ajustes=AJUSTES_SITUACAO, padrao=SITUACAO_PADRAO):
+    """Coluna "Situação" completa. Exige as colunas de adicionar_colunas_tempo."""
+    contexto = contexto_situacao(df_detalhe)
+    tamanho = len(df_detalhe)
+    situacao = pd.Series(avaliar_regras(contexto, regras, padrao, tamanho), index=df_detalhe.index, dtype=object)
+    for ajuste in ajustes:
+        contexto["situacao"] = situacao
+        mascara = np.asarray(ajuste.condicao(contexto), dtype=bool)
+        situacao = situacao.mask(mascara, pd.Series(_valores(ajuste.resultado, contexto, tamanho), index=df_detalhe.index))
+    return situacao.astype(str)
+
+
+def primeira_marcacao(df_detalhe):
+    """Coluna "correção": primeira marcação preenchida (texto ou horário)."""
+    textos = [df_detalhe[col + "_txt"] for col in CAMPOS_MARCACAO]
+    return pd.Series(
+        np.select([t != "" for t in textos], textos, default=""),
+        index=df_detalhe.index,
+    )
@@ -0,0 +1,129 @@
+# =========================
+# Tarefas em segundo plano (PDFs grandes sem travar a sessão do Streamlit)
+# =========================
+# O processamento de um upload vira uma Tarefa executada numa fila de threads
+# compartilhada entre as sessões. O script do Streamlit só envia a tarefa e
+# acompanha o progresso (páginas lidas / total); um rerun no meio do caminho
+# não recomeça o trabalho, e o resultado fica na Tarefa até a sessão buscá-lo.
+#
+# O limite de tarefas simultâneas vale para o servidor inteiro (todas as
+# sessões); as que passarem do limite esperam na fila. Cada tarefa ainda pode
+# usar vários processos na extração (workers), então o limite deve considerar
+# os núcleos da máquina.
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+ERRO = "erro"
+CANCELADA = "cancelada"
+
+
+class Tarefa:
+    """Um processamento enviado à FilaTarefas. Atributos lidos pela interface enquanto a tarefa roda."""
+
+    def __init__(self, identificador, descricao):
+        self.identificador = identificador
+        self.descricao = descricao
+        self.estado = NA_FILA
+        self.paginas_feitas = 0
+        self.total_paginas = 0
+        self.resultado = None
+        self.erro = None
+        self.enviada_em = time.time()
+        self.inicio = None
+        self.fim = None
+        self._futuro = None
+
+    def atualizar(self, paginas_feitas, total_paginas):
+        """Callback de progresso(paginas_feitas, total_paginas) do motor."""
+        self.paginas_feitas = paginas_feitas
+        self.total_paginas = total_paginas
+
+    @property
+    def terminada(self):
+        return self.estado in (CONCLUIDA, ERRO, CANCELADA)
+
+    @property
+    def fracao(self):
+        """Progresso entre 0 e 1 (páginas lidas; as etapas depois da extração ficam no fim da barra)."""
+        if self.estado == CONCLUIDA:
+            return 1.0
+        if not self.total_paginas:
+            return 0.0
+        return min(self.paginas_feitas / self.total_paginas, 1.0)
+
+    @property
+    def segundos(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.time()) - self.inicio
+
+    def aguardar(self, timeout=None):
+        """Espera a tarefa terminar (até `timeout` segundos). Devolve True se terminou."""
+        if self._futuro is None:
+            return self.terminada
+        try:
+            self._futuro.exception(timeout=timeout)
+        except TimeoutError:
+            return False
+        except Exception:
+            # CancelledError
+            pass
+        return True
+
+    def cancelar(self):
+        """Cancela a tarefa se ela ainda estiver na fila (uma tarefa em execução vai até o fim)."""
+        if self._futuro is not None and self._futuro.cancel():
+            self.estado = CANCELADA
+            self.fim = time.time()
+            return True
+        return False
+
+
+class FilaTarefas:
+    """Fila de threads com limite de tarefas simultâneas, compartilhada entre sessões."""
+
+    def __init__(self, max_simultaneas=2):
+        self.max_simultaneas = max(1, int(max_simultaneas))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_simultaneas, thread_name_prefix="tarefa")
+        self._ativas = {}
+        self._lock = threading.Lock()
+        self._contador = itertools.count(1)
+
+    def enviar(self, descricao, funcao, *args, **kwargs):
+        """Agenda funcao(*args, progresso=tarefa.atualizar, **kwargs). Devolve a Tarefa."""
+        tarefa = Tarefa(next(self._contador), descricao)
+        with self._lock:
+            self._ativas[tarefa.identificador] = tarefa
+        tarefa._futuro = self._executor.submit(self._executar, tarefa, funcao, args, kwargs)
+        return tarefa
+
+    def _executar(self, tarefa, funcao, args, kwargs):
+        tarefa.estado = EXECUTANDO
+        tarefa.inicio = time.time()
+        try:
+            tarefa.resultado = funcao(*args, progresso=tarefa.atualizar, **kwargs)
+            tarefa.estado = CONCLUIDA
+        except Exception as erro:
+            # Guardado na tarefa para a sessão mostrar; a fila segue atendendo as outras
+            tarefa.erro = erro
+            tarefa.estado = ERRO
+        finally:
+            tarefa.fim = time.time()
+            with self._lock:
+                self._ativas.pop(tarefa.identificador, None)
+
+    def ativas(self):
+        """Tarefas na fila ou em execução (de todas as sessões), na ordem de envio."""
+        with self._lock:
+            # Tarefas canceladas na fila nunca chegam a _executar: saem daqui
+            for identificador in [i for i, tarefa in self._ativas.items() if tarefa.terminada]:
+                del self._ativas[identificador]
+            return list(self._ativas.values())
+
+    def encerrar(self, aguardar=True):
+        self._executor.shutdown(wait=aguardar, cancel_futures=True)
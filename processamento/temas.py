@@ -0,0 +1,82 @@
+# =========================
+# Classificação das justificativas por tema (busca aproximada indexada)
+# =========================
+# Mesmo resultado de achar_tema_mais_proximo, mas preparado para centenas de
+# temas e milhares de páginas:
+#   - os temas são normalizados (limpar_texto) uma única vez;
+#   - texto idêntico a um tema é resolvido por dicionário, sem SequenceMatcher;
+#   - antes do ratio() completo, real_quick_ratio()/quick_ratio() (limites
+#     superiores do ratio) descartam temas que não podem vencer;
+#   - linhas já classificadas ficam num memo, pois a mesma justificativa se
+#     repete em muitas páginas.
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from .auxiliares import limpar_texto
+
+LIMIAR_PADRAO = 0.6
+
+
+class MatcherTemas:
+    def __init__(self, lista_temas, limiar=LIMIAR_PADRAO, tamanho_memo=50000):
+        self.temas = list(lista_temas)
+        self.limiar = limiar
+        self.tamanho_memo = tamanho_memo
+        # O SequenceMatcher guarda o índice da 2ª sequência (o tema): criado uma
+        # vez por tema e reaproveitado trocando só a 1ª sequência (a linha).
+        self._comparadores = [SequenceMatcher(None, "", limpar_texto(tema)) for tema in self.temas]
+        self._exatos = {}
+        for tema, comparador in zip(self.temas, self._comparadores):
+            self._exatos.setdefault(comparador.b, tema)
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pode_vencer(self, limite_superior, melhor_ratio):
+        return limite_superior >= self.limiar and limite_superior > melhor_ratio
+
+    def _classificar(self, linha):
+        linha = limpar_texto(linha)
+        if linha in self._exatos:
+            return self._exatos[linha]
+
+        melhor_tema = None
+        melhor_ratio = 0
+        for tema, comparador in zip(self.temas, self._comparadores):
+            comparador.set_seq1(linha)
+            # Só interessa um tema que atinja o limiar e supere o melhor até aqui
+            # (empate mantém o primeiro tema, como na busca original).
+            if not self._pode_vencer(comparador.real_quick_ratio(), melhor_ratio):
+                continue
+            if not self._pode_vencer(comparador.quick_ratio(), melhor_ratio):
+                continue
+            ratio = comparador.ratio()
+            if ratio > melhor_ratio:
+                melhor_ratio = ratio
+                melhor_tema = tema
+        if melhor_ratio >= self.limiar:
+            return melhor_tema
+        return None
+
+    def __call__(self, linha):
+        """Tema mais próximo da linha (ou None abaixo do limiar)."""
+        with self._lock:
+            if linha in self._memo:
+                self._memo.move_to_end(linha)
+                return self._memo[linha]
+            tema = self._classificar(linha)
+            self._memo[linha] = tema
+            if len(self._memo) > self.tamanho_memo:
+                self._memo.popitem(last=False)
+            return tema
+
+
+@lru_cache(maxsize=32)
+def _matcher_em_cache(temas, limiar):
+    return MatcherTemas(temas, limiar)
+
+
+def obter_matcher(lista_temas, limiar=LIMIAR_PADRAO):
+    """Matcher compartilhado por processo para a mesma lista de temas."""
+    return _matcher_em_cache(tuple(lista_temas), limiar)
@@ -0,0 +1,77 @@
+# =========================
+# Conversão vetorizada dos campos de horário do df_detalhe
+# =========================
+# Cada campo de horário é lido uma única vez, com str.extract sobre a coluna
+# inteira, gerando duas colunas auxiliares:
+#   <campo>_min    -> minutos inteiros (mesma regra de hora_para_minutos)
+#   <campo>_valido -> True se o texto é um horário HH:MM válido (mesma regra de eh_horario)
+# As regras de validação e de "Situação" leem essas colunas em vez de
+# reinterpretar as strings linha a linha. Nas colunas categóricas (esquema.tipar)
+# cada horário distinto é interpretado uma vez só.
+import numpy as np
+import pandas as pd
+
+CAMPOS_TEMPO = ["ent_1", "sai_1", "ent_2", "sai_2", "total_trabalhado", "horas_previstas"]
+CAMPOS_MARCACAO = ["ent_1", "sai_1", "ent_2", "sai_2"]
+
+_PADRAO_HORA = r"(\d{1,3}):(\d{2})"
+_PADRAO_DOIS_NUMEROS = r"(\d+)\D+(\d+)"
+_PADRAO_HORARIO = r"^(\d+):(\d+)\Z"
+
+
+def por_categoria(serie, funcao):
+    """funcao(série de textos) aplicada à série; numa categórica, só às categorias (e ao nulo), depois espalhada pelas linhas."""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return funcao(serie)
+    # O nulo vai por último: o código -1 das linhas nulas aponta para ele
+    valores = pd.Series(list(serie.cat.categories) + [None], dtype=object)
+    return pd.Series(np.asarray(funcao(valores))[serie.cat.codes.to_numpy()], index=serie.index)
+
+
+def texto_limpo(serie):
+    """Equivalente vetorizado de limpa_valor: texto sem espaços nas pontas, vazio para nulos."""
+    return por_categoria(serie, lambda valores: valores.fillna("").astype(str).str.strip())
+
+
+def minutos(texto):
+    """Equivalente vetorizado de hora_para_minutos sobre uma série de textos limpos."""
+    hora = texto.str.extract(_PADRAO_HORA)
+    # Sem "H:MM" no texto, hora_para_minutos usa os dois primeiros números encontrados
+    numeros = texto.str.extract(_PADRAO_DOIS_NUMEROS)
+    tem_hora = hora[0].notna()
+    h = pd.to_numeric(hora[0].where(tem_hora, numeros[0])).fillna(0)
+    m = pd.to_numeric(hora[1].where(tem_hora, numeros[1])).fillna(0)
+    return (h * 60 + m).astype("int64")
+
+
+def hhmm(total_minutos):
+    """Minutos -> 'HH:MM' (horas podem passar de 24)."""
+    total_minutos = int(total_minutos)
+    return f"{total_minutos // 60:02d}:{total_minutos % 60:02d}"
+
+
+def mascara_horario(texto):
+    """Equivalente vetorizado de eh_horario sobre uma série de textos limpos."""
+    partes = texto.str.extract(_PADRAO_HORARIO)
+    h = pd.to_numeric(partes[0])
+    m = pd.to_numeric(partes[1])
+    return (partes[0].notna() & (h < 24) & (m < 60)).astype(bool)
+
+
+def adicionar_colunas_tempo(df_detalhe, campos=CAMPOS_TEMPO):
+    """Acrescenta <campo>_txt, <campo>_min e <campo>_valido para cada campo de horário."""
+    for campo in campos:
+        serie = df_detalhe[campo] if campo in df_detalhe.columns else pd.Series("", index=df_detalhe.index)
+        texto = texto_limpo(serie)
+        df_detalhe[campo + "_txt"] = texto
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            df_detalhe[campo + "_min"] = por_categoria(serie, lambda valores: minutos(texto_limpo(valores)))
+            df_detalhe[campo + "_valido"] = por_categoria(serie, lambda valores: mascara_horario(texto_limpo(valores)))
+        else:
+            df_detalhe[campo + "_min"] = minutos(texto)
+            df_detalhe[campo + "_valido"] = mascara_horario(texto)
+    return df_detalhe
+
+
+def colunas_auxiliares(campos=CAMPOS_TEMPO):
+    return [campo + sufixo for campo in campos for sufixo in ("_txt", "_min", "_valido")]
@@ -0,0 +1,146 @@
+# =========================
+# Leitura do texto da página da Blitz: cabeçalho e justificativas numa passada
+# =========================
+# Em vez de testar cada linha com vários `in` e `split`, o texto inteiro da
+# página passa por poucas expressões compiladas uma única vez:
+#   - cabeçalho: uma busca acha as linhas com rótulos (NOME DO FUNCIONÁRIO:, CPF
+#     DO FUNCIONÁRIO:, NÚMERO DE MATRÍCULA:, NOME DO CARGO:, NOME DO CENTRO DE
+#     CUSTO:). Cada campo vai da última ocorrência do seu rótulo na linha até a
+#     primeira ocorrência da mesma parada do parser original: CPF (nome), SEG
+#     (cpf), NOME DO DEPARTAMENTO (matrícula), QUI (cargo) e DOM (centro de
+#     custo). Uma linha com mais de um rótulo é lida pelo primeiro, na ordem do
+#     original (nome e cpf, matrícula, cargo, centro de custo); o cpf é lido na
+#     linha do nome ou numa linha só dele. A escala da semana que o PDF imprime à direita
+#     ("SEG 08:00 17:00", "DOM DESCANSO SEMANAL") fica fora dos campos nos
+#     mesmos pontos em que ficava no original;
+#   - justificativas: toda linha até "BLITZ RECURSOS HUMANOS" (menos a primeira
+#     que fala em "Alteração") sai sem datas, horas e números, pronta para o
+#     matcher de temas; linhas que ficam vazias são descartadas.
+# Campo que não aparece, vem vazio ou (no cpf) fora do formato fica em
+# `falhas` como {campo: motivo}, em vez de só sair None no relatório.
+import re
+from dataclasses import dataclass, field
+
+CAMPOS_CABECALHO = ("nome", "cpf", "matricula", "cargo", "centro_custo")
+# Sem eles a linha do consolidado não identifica o funcionário
+CAMPOS_OBRIGATORIOS = ("nome", "cpf")
+
+FALHA_SEM_ROTULO = "rótulo não encontrado"
+FALHA_VAZIO = "valor vazio"
+FALHA_FORMATO = "formato inválido"
+
+_ROTULOS = re.compile(r"NOME DO FUNCION[ÁA]RIO:|CPF DO FUNCION[ÁA]RIO:|N[ÚU]MERO DE MATR[ÍI]CULA:|NOME DO C")
+# (campo, rótulo, parada), na ordem do parser original
+_CAMPOS_LINHA = (
+    ("nome", re.compile(r"NOME DO FUNCION[ÁA]RIO:"), "CPF"),
+    ("matricula", re.compile(r"N[ÚU]MERO DE MATR[ÍI]CULA:"), "NOME DO DEPARTAMENTO"),
+    ("cargo", re.compile(r"NOME DO CARGO:"), "QUI"),
+    ("centro_custo", re.compile(r"NOME DO CENTRO DE CUSTO:"), "DOM"),
+)
+_ROTULO_CPF = re.compile(r"CPF DO FUNCION[ÁA]RIO:")
+_PARADA_CPF = "SEG"
+# Os mesmos sinais que limpar_texto(linha) mostrava, sem limpar a linha toda
+_INICIO_ALTERACOES = re.compile(r"ALTERACAO|ALTERAÇÃO", re.IGNORECASE)
+_SEPARADOR = r"[^A-Z0-9ÁÀÂÃÉÊÍÓÔÕÚÇ\n]+"
+_FIM_JUSTIFICATIVAS = re.compile(rf"BLITZ{_SEPARADOR}RECURSOS{_SEPARADOR}HUMANOS", re.IGNORECASE)
+# Datas, horas e números que saem da linha antes do matcher
+_NUMEROS = re.compile(r"\d{2}/\d{2}/\d{4}|\d+:\d{2}(?::\d{2})?|\d+")
+_CPF = re.compile(r"\d{3}\.?\d{3}\.?\d{3}-?\d{2}")
+
+
+@dataclass
+class LeituraPagina:
+    """Resultado de ler_texto_pagina: campos do cabeçalho, linhas de justificativa e falhas por campo."""
+    campos: dict = field(default_factory=dict)
+    justificativas: list = field(default_factory=list)
+    falhas: dict = field(default_factory=dict)
+
+
+def _linhas_cabecalho(texto):
+    """Linhas do texto que têm algum rótulo do cabeçalho, na ordem."""
+    vistas = set()
+    for rotulo in _ROTULOS.finditer(texto):
+        inicio = texto.rfind("\n", 0, rotulo.start()) + 1
+        if inicio in vistas:
+            continue
+        vistas.add(inicio)
+        fim = texto.find("\n", rotulo.end())
+        yield texto[inicio:fim if fim >= 0 else len(texto)]
+
+
+def _apos_ultimo_rotulo(rotulo, linha, parada):
+    """Texto depois da última ocorrência de `rotulo` na linha, até a primeira `parada`."""
+    ultimo = None
+    for ultimo in rotulo.finditer(linha):
+        pass
+    return linha[ultimo.end():].split(parada, 1)[0].strip()
+
+
+def _ler_cabecalho(linha, campos):
+    for campo, rotulo, parada in _CAMPOS_LINHA:
+        if rotulo.search(linha):
+            campos[campo] = _apos_ultimo_rotulo(rotulo, linha, parada)
+            if campo == "nome" and _ROTULO_CPF.search(linha):
+                campos["cpf"] = _apos_ultimo_rotulo(_ROTULO_CPF, linha, _PARADA_CPF)
+            return
+    if _ROTULO_CPF.search(linha):
+        # cpf numa linha só dele (comum no OCR): o original não lia, ficava sem cpf
+        campos["cpf"] = _apos_ultimo_rotulo(_ROTULO_CPF, linha, _PARADA_CPF)
+
+
+def _numero_linha(texto, posicao):
+    return texto.count("\n", 0, posicao)
+
+
+def _linhas_justificativas(texto):
+    """Linhas sem datas, horas e números até "BLITZ RECURSOS HUMANOS", sem a linha que abre as alterações."""
+    alteracoes = _INICIO_ALTERACOES.search(texto)
+    abertura = _numero_linha(texto, alteracoes.start()) if alteracoes else None
+    fim = None
+    for marcador in _FIM_JUSTIFICATIVAS.finditer(texto):
+        # Na linha que abre as alterações o fim não vale (ela é pulada antes de ser testada)
+        numero = _numero_linha(texto, marcador.start())
+        if numero != abertura:
+            fim = numero
+            break
+    linhas = _NUMEROS.sub("", texto).split("\n")[:fim]
+    if abertura is not None and abertura < len(linhas):
+        del linhas[abertura]
+    return [restante for restante in (linha.strip() for linha in linhas) if restante]
+
+
+def falhas_campos(campos):
+    """{campo: motivo} dos campos do cabeçalho ausentes, vazios ou (cpf) fora do formato."""
+    falhas = {}
+    for campo in CAMPOS_CABECALHO:
+        valor = campos.get(campo)
+        if valor is None:
+            falhas[campo] = FALHA_SEM_ROTULO
+        elif not valor:
+            falhas[campo] = FALHA_VAZIO
+    cpf = campos.get("cpf")
+    if cpf and not _CPF.fullmatch(cpf):
+        falhas["cpf"] = FALHA_FORMATO
+    return falhas
+
+
+def ler_texto_pagina(texto, justificativas=True):
+    """Lê cabeçalho e (se `justificativas`) as linhas de justificativa do texto da página."""
+    leitura = LeituraPagina()
+    if texto:
+        for linha in _linhas_cabecalho(texto):
+            _ler_cabecalho(linha, leitura.campos)
+        if justificativas:
+            leitura.justificativas = _linhas_justificativas(texto)
+    leitura.falhas = falhas_campos(leitura.campos)
+    return leitura
+
+
+def descrever_falhas(falhas_por_pagina, campos=CAMPOS_OBRIGATORIOS):
+    """Texto curto das páginas com falha nos `campos`: "3 (cpf: formato inválido), 7 (nome: valor vazio)"; "" se nenhuma."""
+    descricoes = []
+    for numero, falhas in sorted(falhas_por_pagina.items()):
+        itens = [f"{campo}: {falhas[campo]}" for campo in campos if campo in falhas]
+        if itens:
+            descricoes.append(f"{numero} ({'; '.join(itens)})")
+    return ", ".join(descricoes)
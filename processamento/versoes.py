@@ -0,0 +1,61 @@
+# =========================
+# Comparação entre versões do mesmo PDF
+# =========================
+# Quando o fornecedor reenvia o PDF do mês com páginas corrigidas, a impressão
+# digital de cada página (hash do conteúdo, ver extracao.hashes_paginas) mostra
+# quais páginas mudaram e, pelas páginas, de quais funcionários. A comparação é
+# pelo conteúdo e não pela posição: páginas incluídas ou removidas no meio do
+# arquivo não marcam como alteradas as que só mudaram de lugar.
+import pandas as pd
+
+ALTERADO = "alterado"
+INCLUIDO = "incluído"
+REMOVIDO = "removido"
+
+
+def resumo_versao(resultado):
+    """O que a comparação precisa de um resultado de processar_com_cache (leve para guardar no histórico)."""
+    return {
+        "hashes": dict(resultado.get("hashes_paginas") or {}),
+        "funcionarios": dict(resultado["funcionarios_paginas"]),
+    }
+
+
+def comparar_versoes(anterior, atual):
+    """Funcionários com páginas diferentes entre duas versões (resumos de resumo_versao).
+
+    Uma linha por cpf: situação (alterado, incluído, removido) e as páginas de
+    cada versão que não existem na outra.
+    """
+    hashes_anteriores = set(anterior["hashes"].values())
+    hashes_atuais = set(atual["hashes"].values())
+    novas = sorted(numero for numero, h in atual["hashes"].items() if h not in hashes_anteriores)
+    saidas = sorted(numero for numero, h in anterior["hashes"].items() if h not in hashes_atuais)
+
+    cpfs_anteriores = {cpf for cpf, _ in anterior["funcionarios"].values()}
+    cpfs_atuais = {cpf for cpf, _ in atual["funcionarios"].values()}
+
+    afetados = {}
+    for versao, paginas, coluna in ((atual, novas, "paginas_atuais"), (anterior, saidas, "paginas_anteriores")):
+        for numero in paginas:
+            if numero not in versao["funcionarios"]:
+                continue
+            cpf, nome = versao["funcionarios"][numero]
+            linha = afetados.setdefault(cpf, {"cpf": cpf, "nome": nome, "paginas_anteriores": [], "paginas_atuais": []})
+            linha[coluna].append(numero)
+
+    linhas = []
+    for cpf, linha in afetados.items():
+        if cpf in cpfs_anteriores and cpf in cpfs_atuais:
+            situacao = ALTERADO
+        elif cpf in cpfs_atuais:
+            situacao = INCLUIDO
+        else:
+            situacao = REMOVIDO
+        linhas.append({
+            **linha,
+            "situacao": situacao,
+            "paginas_anteriores": ", ".join(map(str, linha["paginas_anteriores"])),
+            "paginas_atuais": ", ".join(map(str, linha["paginas_atuais"])),
+        })
+    return pd.DataFrame(linhas, columns=["cpf", "nome", "situacao", "paginas_anteriores", "paginas_atuais"])
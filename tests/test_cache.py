@@ -0,0 +1,17 @@
+from processamento.cache import CacheResultados
+
+
+def test_disco_limpo_em_lote_ao_passar_do_limite(tmp_path, monkeypatch):
+    cache = CacheResultados(max_itens=1, diretorio=tmp_path, limite_disco_mb=0.02)
+    varreduras = []
+    original = cache._varrer_disco
+    monkeypatch.setattr(cache, "_varrer_disco", lambda: varreduras.append(1) or original())
+
+    for numero in range(200):
+        cache.put(f"k{numero}", b"x" * 1000)
+
+    total = sum(arquivo.stat().st_size for arquivo in tmp_path.glob("*.pkl"))
+    assert total <= cache.limite_disco
+    # Uma varredura inicial e uma por limpeza em lote, não uma por put
+    assert len(varreduras) < 200 / 3
+    assert cache.get("k199") == b"x" * 1000
@@ -0,0 +1,21 @@
+import fitz
+
+from processamento.blitz import extrair_pdf
+
+
+def pdf_com_capa(caminho):
+    documento = fitz.open()
+    documento.new_page().insert_text((72, 72), "RELATORIO DE PONTO - CAPA")
+    documento.new_page().insert_text((72, 72), "NOME DO FUNCIONÁRIO: MARIA SILVA")
+    documento.save(caminho)
+    documento.close()
+
+
+def test_falhas_campos_so_nas_paginas_de_ponto(tmp_path):
+    caminho = str(tmp_path / "ponto.pdf")
+    pdf_com_capa(caminho)
+    resultado = extrair_pdf(caminho)
+    # A capa também sai sem nome e cpf, mas não é página de ponto
+    assert list(resultado.falhas_campos) == [2]
+    assert "cpf" in resultado.falhas_campos[2]
+    assert all("falhas_campos" not in funcionario for funcionario in resultado.dados_funcionarios)
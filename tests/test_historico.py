@@ -0,0 +1,39 @@
+import pandas as pd
+
+from processamento.historico import HistoricoRelatorios
+
+
+def relatorio(cpf, total, faltas=0, data="01/03/2025"):
+    consolidado = pd.DataFrame([{"pagina": 1, "nome": f"F{cpf}", "cpf": cpf, "total_trabalhado": total, "faltas": faltas}])
+    detalhe = pd.DataFrame([{"pagina": 1, "nome": f"F{cpf}", "cpf": cpf, "data": data, "Situação": "OK"}])
+    return consolidado, detalhe
+
+
+def test_regravar_o_mes_com_outro_arquivo_substitui(tmp_path):
+    historico = HistoricoRelatorios(tmp_path / "h.sqlite")
+    historico.gravar(*relatorio("1", "08:00", 1), arquivo="marco.pdf")
+    assert historico.arquivos_gravados("Blitz", "2025-03") == ["marco.pdf"]
+    historico.gravar(*relatorio("1", "09:00", 2), arquivo="marco_corrigido.pdf")
+    assert historico.arquivos_gravados("Blitz", "2025-03") == ["marco_corrigido.pdf"]
+    assert historico.evolucao("faltas")["2025-03"].tolist() == [2]
+    assert len(historico.execucoes()) == 1
+
+
+def test_evolucao_soma_horas_das_paginas_do_mes(tmp_path):
+    historico = HistoricoRelatorios(tmp_path / "h.sqlite")
+    consolidado, detalhe = relatorio("1", "08:30")
+    consolidado = pd.concat([consolidado, consolidado.assign(pagina=2, total_trabalhado="100:45")])
+    historico.gravar(consolidado, detalhe)
+    historico.gravar(*relatorio("1", "07:00", data="01/04/2025"))
+    evolucao = historico.evolucao("total_trabalhado")
+    assert evolucao.loc[0, "2025-03"] == "109:15"
+    assert evolucao.loc[0, "2025-04"] == "07:00"
+
+
+def test_lista_de_meses_vazia_nao_devolve_nada(tmp_path):
+    historico = HistoricoRelatorios(tmp_path / "h.sqlite")
+    historico.gravar(*relatorio("1", "08:00", 1))
+    assert len(historico.consolidado(meses=None)) == 1
+    assert historico.consolidado(meses=[]).empty
+    assert historico.situacoes_por_mes(meses=[]).empty
+    assert historico.evolucao("faltas", meses=[]).empty
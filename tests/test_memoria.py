@@ -0,0 +1,25 @@
+import fitz
+
+from processamento.blitz import extrair_pdf
+
+
+def pdf_de_ponto(caminho, paginas=3):
+    documento = fitz.open()
+    for n in range(paginas):
+        documento.new_page().insert_text((72, 72), f"NOME DO FUNCIONÁRIO: FUNCIONARIO {n}")
+    documento.save(caminho)
+    documento.close()
+
+
+def test_orcamento_nao_conta_a_memoria_do_servidor(tmp_path):
+    caminho = str(tmp_path / "ponto.pdf")
+    pdf_de_ponto(caminho)
+    serial = extrair_pdf(caminho)
+    # Memória que cresce no processo que pede a extração (outra sessão, no app) durante ela não conta
+    ocupado = []
+    com_orcamento = extrair_pdf(
+        caminho, memoria_max_mb=128, progresso=lambda *_: ocupado.append(b"x" * (256 * 1024 * 1024))
+    )
+    assert ocupado
+    assert com_orcamento.dados_funcionarios == serial.dados_funcionarios
+    assert com_orcamento.classificacao_paginas == serial.classificacao_paginas
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from processamento.mesclagem import COLUNA_ORIGEM, COLUNA_SOBREPOSTOS, mesclar_relatorios
+
+
+def funcionario(cpf, pagina, total="08:00", faltas=0, status="OK"):
+    return {"pagina": pagina, "nome": f"F{cpf}", "cpf": cpf, "total_trabalhado": total, "faltas": faltas,
+            "status": status}
+
+
+def consolidado(*funcionarios):
+    return pd.DataFrame(list(funcionarios))
+
+
+def test_cpf_em_uma_linha_por_arquivo_vira_uma_linha():
+    df, _, _ = mesclar_relatorios([
+        ("a.pdf", consolidado(funcionario("1", 1, "08:00", 1)), None),
+        ("b.pdf", consolidado(funcionario("1", 1, "10:30", 2, "NOK")), None),
+    ])
+    assert len(df) == 1
+    linha = df.iloc[0]
+    assert linha["total_trabalhado"] == "18:30"
+    assert linha["faltas"] == 3
+    assert linha["status"] == "NOK"
+    assert linha[COLUNA_ORIGEM] == "a.pdf, b.pdf"
+
+
+def test_paginas_do_mesmo_arquivo_sao_juntadas_antes_da_mesclagem():
+    um_arquivo = [("a.pdf", consolidado(funcionario("1", 1), funcionario("1", 2, "09:15", 1, "NOK")), None)]
+    df, _, _ = mesclar_relatorios(um_arquivo)
+    assert df[["total_trabalhado", "faltas", "status", "pagina"]].values.tolist() == [["17:15", 1, "NOK", 1]]
+    dois_arquivos = um_arquivo + [("b.pdf", consolidado(funcionario("1", 1)), None)]
+    df, _, _ = mesclar_relatorios(dois_arquivos)
+    assert len(df) == 1
+    assert df.iloc[0]["total_trabalhado"] == "25:15"
+    assert df.iloc[0][COLUNA_ORIGEM] == "a.pdf, b.pdf"
+
+
+def dias(cpf, *datas):
+    return pd.DataFrame([{"pagina": 1, "nome": f"F{cpf}", "cpf": cpf, "data": data} for data in datas])
+
+
+def test_dias_sobrepostos_saem_do_detalhe_e_ficam_marcados_no_consolidado():
+    df_consolidado, df_detalhe, descartados = mesclar_relatorios([
+        ("a.pdf", consolidado(funcionario("1", 1), funcionario("2", 2)), pd.concat([dias("1", "01/03/2025", "02/03/2025"), dias("2", "01/03/2025")])),
+        ("b.pdf", consolidado(funcionario("1", 1)), dias("1", "02/03/2025", "03/03/2025")),
+    ])
+    assert descartados == 1
+    assert len(df_detalhe) == 4
+    assert dict(zip(df_consolidado["cpf"], df_consolidado[COLUNA_SOBREPOSTOS])) == {"1": 1, "2": 0}
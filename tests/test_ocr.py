@@ -0,0 +1,31 @@
+import fitz
+
+import processamento.ocr as ocr
+from processamento.cache import CacheResultados, processar_com_cache
+from processamento.ocr import OpcoesOCR
+
+TEXTO_OCR = "NOME DO FUNCIONÁRIO: MARIA SILVA\nCPF DO FUNCIONÁRIO: 123.456.789-00"
+
+
+def pdf_escaneado(caminho, paginas=2):
+    documento = fitz.open()
+    imagem = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 40), False)
+    imagem.clear_with(200)
+    for _ in range(paginas):
+        documento.new_page().insert_image(fitz.Rect(50, 50, 300, 300), pixmap=imagem)
+    documento.save(caminho)
+    documento.close()
+
+
+def test_pdf_so_escaneado(tmp_path, monkeypatch):
+    # Só o Tesseract é trocado: triagem, extração, regras e relatórios rodam de verdade
+    monkeypatch.setattr(ocr, "ler_paginas_escaneadas", lambda fonte, numeros, opcoes: {n: TEXTO_OCR for n in numeros})
+    caminho = str(tmp_path / "escaneado.pdf")
+    pdf_escaneado(caminho)
+
+    resultado, _ = processar_com_cache(caminho, CacheResultados(), ocr=OpcoesOCR())
+
+    assert resultado["paginas_ocr"] == [1, 2]
+    assert resultado["consolidado"]["cpf"].tolist() == ["123.456.789-00"] * 2
+    assert resultado["detalhe"].empty
+    assert {"ent_1", "Situação", "correção"} <= set(resultado["detalhe"].columns)
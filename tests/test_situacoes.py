@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from processamento.blitz import contar_situacoes, montar_relatorios
+
+
+def contagem_por_transform(df_detalhe):
+    # Loop groupby/transform que contar_situacoes substituiu
+    esperado = df_detalhe.copy()
+    for sit in df_detalhe["Situação"].unique():
+        esperado[f"Qtd - {sit}"] = df_detalhe.groupby("cpf")["Situação"].transform(lambda x: (x == sit).sum())
+    return esperado
+
+
+@pytest.mark.parametrize(
+    "cpfs, situacoes",
+    [
+        (["1", "1", None], ["A", "B", "FERIAS"]),
+        ([None], ["FERIAS"]),
+        ([None, None], ["A", "B"]),
+        (["1", "2", "2"], ["A", "A", "B"]),
+    ],
+)
+def test_contar_situacoes_linhas_sem_cpf(cpfs, situacoes):
+    df_detalhe = pd.DataFrame({"cpf": cpfs, "Situação": situacoes})
+    contado, _ = contar_situacoes(df_detalhe)
+    esperado = contagem_por_transform(df_detalhe)
+    for coluna in esperado.columns:
+        if coluna.startswith("Qtd - "):
+            assert contado[coluna].astype(float).tolist() == pytest.approx(
+                esperado[coluna].astype(float).tolist(), nan_ok=True
+            ), coluna
+
+
+def test_montar_relatorios_linha_sem_cpf():
+    funcionario = {"pagina": 1, "nome": None, "cpf": None, "faltas": 0, "desconta_dsr": 0, "status": "OK"}
+    detalhe = {
+        "pagina": 1, "nome": None, "cpf": None, "data": "01/10/2025", "semana": "QUA",
+        "previsto": "08:00 - 17:00", "ent_1": "FERIAS", "sai_1": "", "ent_2": "", "sai_2": "",
+        "total_trabalhado": "", "total_noturno": "", "horas_previstas": "", "faltas": "",
+        "horas_atraso": "", "extra_50": "", "desconta_dsr": "",
+    }
+    df_consolidado, df_detalhe = montar_relatorios([funcionario], [detalhe], lista_temas=[])
+    assert len(df_detalhe) == 1
+    qtd = [coluna for coluna in df_detalhe.columns if coluna.startswith("Qtd - ")]
+    assert qtd and df_detalhe[qtd].isna().all(axis=None)
+    assert len(df_consolidado) == 1
+
+
+def test_ordem_das_colunas_do_consolidado():
+    # Ordem de aparecimento diferente da alfabética
+    df_detalhe = pd.DataFrame({"cpf": ["2", "2", "1", "1", "3"], "Situação": ["Z", "B", "Z", "A", "M"]})
+    _, df_situacoes = contar_situacoes(df_detalhe)
+    original = df_detalhe.groupby("cpf")["Situação"].value_counts().unstack(fill_value=0).reset_index()
+    pd.testing.assert_frame_equal(df_situacoes, original)
@@ -0,0 +1,66 @@
+import pytest
+
+from processamento.texto_pagina import ler_texto_pagina
+
+
+def cabecalho_original(texto):
+    # Laço do cabeçalho do parser original, sem alterações (referência de paridade)
+    funcionario = {}
+    for linha in texto.split("\n"):
+        if "NOME DO FUNCIONÁRIO:" in linha or "NOME DO FUNCIONARIO:" in linha:
+            try:
+                funcionario["nome"] = linha.split("NOME DO FUNCIONÁRIO:")[-1].split("CPF")[0].strip()
+            except:  # noqa: E722
+                funcionario["nome"] = linha.split("NOME DO FUNCIONARIO:")[-1].split("CPF")[0].strip() if "CPF" in linha else linha
+            if "CPF" in linha:
+                try:
+                    funcionario["cpf"] = linha.split("CPF DO FUNCIONÁRIO:")[-1].split("SEG")[0].strip()
+                except:  # noqa: E722
+                    funcionario["cpf"] = ""
+        elif "NÚMERO DE MATRÍCULA:" in linha or "NUMERO DE MATRICULA:" in linha:
+            parts = linha.split("NÚMERO DE MATRÍCULA:")[-1] if "NÚMERO DE MATRÍCULA:" in linha else linha.split("NUMERO DE MATRICULA:")[-1]
+            funcionario["matricula"] = parts.split("NOME DO DEPARTAMENTO")[0].strip() if "NOME DO DEPARTAMENTO" in parts else parts.strip()
+        elif "NOME DO CARGO:" in linha:
+            funcionario["cargo"] = linha.split("NOME DO CARGO:")[-1].split("QUI")[0].strip() if "NOME DO CARGO:" in linha else linha
+        elif "NOME DO CENTRO DE CUSTO:" in linha:
+            funcionario["centro_custo"] = linha.split("NOME DO CENTRO DE CUSTO:")[-1].split("DOM")[0].strip() if "NOME DO CENTRO DE CUSTO:" in linha else linha
+    return funcionario
+
+
+CABECALHOS = [
+    # Layout usual: escala da semana à direita de cada linha
+    "NOME DO FUNCIONÁRIO: MARIA SILVA CPF DO FUNCIONÁRIO: 123.456.789-00 SEG 08:00 17:00\n"
+    "NÚMERO DE MATRÍCULA: 1001 NOME DO DEPARTAMENTO: OPERACOES TER 08:00 17:00\n"
+    "NOME DO CARGO: AUXILIAR LOGISTICA QUI 08:00 17:00\n"
+    "NOME DO CENTRO DE CUSTO: SP01 DOM DESCANSO SEMANAL",
+    # Escala com texto em vez de horário
+    "NOME DO FUNCIONÁRIO: JOAO CPF DO FUNCIONÁRIO: 987.654.321-00 SEG FOLGA\n"
+    "NÚMERO DE MATRÍCULA: 2002 NOME DO DEPARTAMENTO: ARMAZEM QUA DESCANSO SEMANAL\n"
+    "NOME DO CARGO: CONFERENTE SEX 06:00 14:00 QUI DESCANSO SEMANAL\n"
+    "NOME DO CENTRO DE CUSTO: RJ02 SAB 08:00 12:00 DOM DESCANSO SEMANAL",
+    # Dias da escala que não são parada do campo ficam no valor, como no original
+    "NOME DO FUNCIONÁRIO: ANA SEX 08:00 CPF DO FUNCIONÁRIO: 111.222.333-44 TER 08:00 SEG 08:00\n"
+    "NÚMERO DE MATRÍCULA: 3003 SAB 08:00 12:00\n"
+    "NOME DO CARGO: MOTORISTA DOM DESCANSO SEMANAL QUI 08:00\n"
+    "NOME DO CENTRO DE CUSTO: MG03 SEG 08:00 DOM DESCANSO SEMANAL",
+    # Paradas dentro de palavras e rótulos repetidos
+    "NOME DO FUNCIONÁRIO: PEDRO DOMINGOS CPF DO FUNCIONÁRIO: 555.666.777-88 SEGUNDA\n"
+    "NOME DO CARGO: TECNICO QUIMICO\n"
+    "NOME DO CENTRO DE CUSTO: DOMICILIAR\n"
+    "NOME DO CARGO: AUXILIAR NOME DO CARGO: LIDER QUI 07:00",
+    # Linha com dois rótulos: vale o primeiro na ordem do original
+    "NOME DO CARGO: ANALISTA NOME DO CENTRO DE CUSTO: SP09 DOM DESCANSO SEMANAL\n"
+    "NOME DO FUNCIONÁRIO: LUCIA CPF DO FUNCIONÁRIO: 000.111.222-33 NÚMERO DE MATRÍCULA: 9 SEG 08:00",
+]
+
+
+@pytest.mark.parametrize("texto", CABECALHOS)
+def test_cabecalho_igual_ao_parser_original(texto):
+    campos = ler_texto_pagina(texto, justificativas=False).campos
+    assert campos == cabecalho_original(texto)
+
+
+def test_escala_nao_entra_no_cargo_nem_no_centro_de_custo():
+    campos = ler_texto_pagina(CABECALHOS[0], justificativas=False).campos
+    assert campos["cargo"] == "AUXILIAR LOGISTICA"
+    assert campos["centro_custo"] == "SP01"
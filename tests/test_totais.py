@@ -0,0 +1,42 @@
+import fitz
+import pytest
+
+from processamento.blitz import extrair_pdf, processar_pagina_consolidado
+from processamento.extracao import MODO_COMPLETO, MODO_TOTAIS
+
+COLUNAS = [20, 120, 180, 250, 330, 400]
+CABECALHO = ["DATA", "PREVISTO", "TOTAL TRAB.", "HORAS PREVISTAS", "EXTRA 50%"]
+ALTURA = 12
+
+
+def desenhar_tabela(pagina, topo, dias, totais):
+    linhas = [CABECALHO] + [[f"{d:02d}/01/2024 - SEG", "08:00", "08:10", "08:00", "00:10"] for d in dias] + [totais]
+    for n, linha in enumerate(linhas):
+        y = topo + n * ALTURA
+        for x, texto in zip(COLUNAS, linha):
+            pagina.insert_text((x + 2, y + 9), texto, fontsize=6)
+    for n in range(len(linhas) + 1):
+        pagina.draw_line((COLUNAS[0], topo + n * ALTURA), (COLUNAS[-1], topo + n * ALTURA))
+    for x in COLUNAS:
+        pagina.draw_line((x, topo), (x, topo + len(linhas) * ALTURA))
+
+
+def pdf_de_ponto(caminho):
+    documento = fitz.open()
+    # A última página tem a tabela mais abaixo: não bate com o modelo aprendido e sai pelas faixas do TOTAIS
+    for n, (topo, dias, extra) in enumerate([(100, [1, 2, 3], "01:30"), (100, [1, 2], "02:00"), (160, [1], "00:45")]):
+        pagina = documento.new_page()
+        pagina.insert_text((20, 60), f"NOME DO FUNCIONÁRIO: FUNCIONARIO {n}", fontsize=8)
+        desenhar_tabela(pagina, topo, dias, ["TOTAIS", "", f"{170 + n}:00", "176:00", extra])
+    documento.save(caminho)
+    documento.close()
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pymupdf"])
+def test_modo_totais_igual_a_extracao_completa(tmp_path, backend):
+    caminho = str(tmp_path / "ponto.pdf")
+    pdf_de_ponto(caminho)
+    completo = extrair_pdf(caminho, backend=backend, processar=processar_pagina_consolidado, modo=MODO_COMPLETO)
+    totais = extrair_pdf(caminho, backend=backend, processar=processar_pagina_consolidado, modo=MODO_TOTAIS)
+    assert [f["extra_50"] for f in completo.dados_funcionarios] == ["01:30", "02:00", "00:45"]
+    assert totais.dados_funcionarios == completo.dados_funcionarios
@@ -0,0 +1,32 @@
+from processamento.historico import HistoricoRelatorios
+from processamento.versoes import comparar_versoes
+
+
+def resumo(hashes, funcionarios):
+    return {"hashes": dict(enumerate(hashes, start=1)), "funcionarios": funcionarios}
+
+
+def test_versao_anterior_vem_do_banco(tmp_path):
+    caminho = tmp_path / "historico.sqlite"
+    original = resumo(["a", "b", "c"], {2: ("111", "Ana"), 3: ("222", "Bruno")})
+    outro = resumo(["x", "y"], {1: ("333", "Carla")})
+    historico = HistoricoRelatorios(caminho)
+    historico.gravar_versao(original, "marco.pdf")
+    historico.gravar_versao(outro, "outro.pdf")
+
+    # Outra instância (outra sessão): a versão guardada continua disponível
+    reenvio = resumo(["a", "b", "c2"], {2: ("111", "Ana"), 3: ("222", "Bruno")})
+    nome, anterior = HistoricoRelatorios(caminho).versao_anterior(reenvio)
+    assert nome == "marco.pdf"
+    assert anterior == original
+    alterados = comparar_versoes(anterior, reenvio)
+    assert alterados[["cpf", "situacao"]].values.tolist() == [["222", "alterado"]]
+
+
+def test_versao_identica_nao_e_anterior(tmp_path):
+    historico = HistoricoRelatorios(tmp_path / "historico.sqlite")
+    versao = resumo(["a", "b"], {1: ("111", "Ana")})
+    historico.gravar_versao(versao, "marco.pdf")
+    historico.gravar_versao(versao, "marco_copia.pdf")
+    assert historico.versao_anterior(versao) is None
+    assert historico.versao_anterior(versao, fornecedor="Outro") is None